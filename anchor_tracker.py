@@ -0,0 +1,216 @@
+"""
+SPX Prophet — Anchor Tracker Module
+Incremental 12-3 PM anchor detection from the live 1-min stream.
+Each scale in DEFAULT_SCALES keeps its forming bucket and the last 2×lookback+1
+closed buckets, so every bucket that closes confirms at most one swing under the
+same test as find_bounces_and_rejections. The best-so-far anchors always equal
+auto_detect_anchors over the bars seen, so when the window closes the
+next session's ChannelSystem is published without a fetch or a rescan.
+"""
+
+import pandas as pd
+import numpy as np
+from collections import deque
+from datetime import datetime, date, time as dtime
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from channel_builder import (AnchorPoint, ChannelSystem, build_channels, ANCHOR_WINDOW, ROLE_LABELS,
+                             DEFAULT_SCALES, SCALE_LOOKBACK, SLOPE, CT)
+from snapshot import next_trading_date
+
+AFTERNOON_START = dtime(11, 25)   # same inclusive slice as data_fetcher._afternoon_slice
+AFTERNOON_END = dtime(15, 5)
+_MIN_NS = 60_000_000_000
+_SLOT_NS = 30 * _MIN_NS
+_DAY_MIN = 1440
+
+
+def _minute(t: dtime) -> int:
+    return t.hour * 60 + t.minute
+
+
+_WIN_LO, _WIN_HI = _minute(ANCHOR_WINDOW[0]), _minute(ANCHOR_WINDOW[1])
+_START, _END = _minute(AFTERNOON_START), _minute(AFTERNOON_END)
+
+
+@dataclass
+class TrackedChannels:
+    trading_date: date
+    anchor_date: date
+    anchors: Dict[str, AnchorPoint]
+    channels: ChannelSystem
+    published_at: datetime
+    revision: int = 1
+
+
+class _ScaleTrack:
+    """One timeframe: forming bucket, last 2L+1 closed (start, close) buckets, best bounce / rejection."""
+
+    def __init__(self, minutes: int, lookback: int):
+        self.minutes = minutes
+        self.lookback = lookback
+        self.span = minutes * _MIN_NS
+        self.closed = deque(maxlen=2 * lookback + 1)
+        self.bucket = None                       # [start_ns, close]
+        self.best = {"lb": None, "hr": None}     # (price, slot_ns)
+
+    def push(self, wall_ns: int, close: float) -> None:
+        b = wall_ns // self.span * self.span
+        if self.bucket is not None and self.bucket[0] != b:
+            self._close()
+        if self.bucket is None:
+            self.bucket = [b, close]
+        else:
+            self.bucket[1] = close
+        if wall_ns + _MIN_NS >= b + self.span:
+            self._close()
+
+    def _close(self) -> None:
+        self.closed.append((self.bucket[0], self.bucket[1]))
+        self.bucket = None
+        self._confirm(self.closed, self.best)
+
+    def _confirm(self, seq, best: dict) -> None:
+        """Test the bucket lookback bars back from the newest (the only one a new bar can confirm)."""
+        L = self.lookback
+        if len(seq) < 2 * L + 1:
+            return
+        seq = list(seq)[-(2 * L + 1):]
+        t, x = seq[L]
+        before = [c for _, c in seq[:L]]
+        after = [c for _, c in seq[L + 1:]]
+        slot = t if self.minutes >= 30 else (t + _SLOT_NS // 2) // _SLOT_NS * _SLOT_NS
+        tod = (slot // _MIN_NS) % _DAY_MIN
+        if not _WIN_LO <= tod < _WIN_HI:
+            return
+        if x <= min(before) and x <= min(after) and (best["lb"] is None or x < best["lb"][0]):
+            best["lb"] = (x, slot)
+        if x >= max(before) and x >= max(after) and (best["hr"] is None or x > best["hr"][0]):
+            best["hr"] = (x, slot)
+
+    def current(self) -> dict:
+        """Bests with the forming bucket counted as a bar, as a batch scan of the same data would."""
+        if self.bucket is None:
+            return self.best
+        best = dict(self.best)
+        self._confirm(list(self.closed) + [tuple(self.bucket)], best)
+        return best
+
+
+class AnchorTracker:
+    """
+    Push closed 1-min bars in order. Bars from 11:25 AM through 3:05 PM CT feed the
+    trackers; the first bar of a new day's slice starts a fresh window. From the
+    bar that closes at 3:00 PM onward the anchors are published for the next
+    trading date (republished, with a higher revision, if a late confirmation
+    through 3:05 changes them). on_publish(TrackedChannels) is called each time.
+    """
+
+    def __init__(self, scales=DEFAULT_SCALES, slope: float = SLOPE,
+                 on_publish: Optional[Callable[[TrackedChannels], None]] = None):
+        self.scales = tuple(sorted(scales, reverse=True))
+        self.slope = slope
+        self.on_publish = on_publish
+        self.published: Optional[TrackedChannels] = None
+        self.session_date: Optional[date] = None
+        self.last_ns: Optional[int] = None
+        self.bars = 0
+        self._reset(None)
+
+    def _reset(self, d: Optional[date]) -> None:
+        self.session_date = d
+        self.tracks = [_ScaleTrack(m, SCALE_LOOKBACK.get(m, 1)) for m in self.scales]
+        self.wicks = {"hw": None, "lw": None}    # (price, slot_ns)
+        self.bars = 0
+
+    # ─── feed ───
+
+    def push(self, ts: datetime, high: float, low: float, close: float) -> Optional[TrackedChannels]:
+        ts = pd.Timestamp(ts)
+        wall = ts.tz_convert(CT).tz_localize(None).as_unit("ns").value
+        return self._push(ts.as_unit("ns").value, wall, high, low, close)
+
+    def extend(self, df: pd.DataFrame, now: Optional[datetime] = None) -> Optional[TrackedChannels]:
+        """Push the rows of a 1-min frame newer than the last bar seen (and closed by `now`, if given)."""
+        if df is None or df.empty:
+            return None
+        utc = df.index.as_unit("ns").asi8
+        start = 0 if self.last_ns is None else int(np.searchsorted(utc, self.last_ns, side="right"))
+        end = len(utc) if now is None else int(np.searchsorted(utc, pd.Timestamp(now).as_unit("ns").value - _MIN_NS, side="right"))
+        if start >= end:
+            return None
+        wall = df.index[start:end].tz_convert(CT).tz_localize(None).as_unit("ns").asi8
+        h, l, c = (df[k].to_numpy(dtype=np.float64)[start:end] for k in ("High", "Low", "Close"))
+        out = None
+        for i in range(end - start):
+            out = self._push(int(utc[start + i]), int(wall[i]), float(h[i]), float(l[i]), float(c[i])) or out
+        return out
+
+    def _push(self, utc_ns: int, wall_ns: int, high: float, low: float, close: float) -> Optional[TrackedChannels]:
+        if self.last_ns is not None and utc_ns <= self.last_ns:
+            return None
+        self.last_ns = utc_ns
+        tod = (wall_ns // _MIN_NS) % _DAY_MIN
+        if not _START <= tod <= _END:
+            return None
+        d = pd.Timestamp(wall_ns).date()
+        if d != self.session_date:
+            self._reset(d)
+        self.bars += 1
+        for track in self.tracks:
+            track.push(wall_ns, close)
+        if _WIN_LO <= tod < _WIN_HI:
+            slot = wall_ns // _SLOT_NS * _SLOT_NS
+            if self.wicks["hw"] is None or high > self.wicks["hw"][0]:
+                self.wicks["hw"] = (high, slot)
+            if self.wicks["lw"] is None or low < self.wicks["lw"][0]:
+                self.wicks["lw"] = (low, slot)
+        if tod + 1 >= _WIN_HI:
+            return self._publish(wall_ns)
+        return None
+
+    # ─── read ───
+
+    def anchors(self) -> Dict[str, AnchorPoint]:
+        """
+        Best anchors over the bars seen: bounce and rejection from the coarsest scale
+        that has both (most extreme, earliest slot on ties), wicks from the window extremes.
+        """
+        def point(role, hit):
+            return AnchorPoint(float(hit[0]), pd.Timestamp(hit[1]).tz_localize(CT), ROLE_LABELS[role])
+
+        out = {}
+        best = next((b for b in (t.current() for t in self.tracks)
+                     if b["lb"] is not None and b["hr"] is not None), None)
+        if best is not None:
+            out["lb"], out["hr"] = point("lb", best["lb"]), point("hr", best["hr"])
+        for role, hit in self.wicks.items():
+            if hit is not None:
+                out[role] = point(role, hit)
+        return out
+
+    def channels(self) -> Optional[ChannelSystem]:
+        a = self.anchors()
+        if "lb" not in a or "hr" not in a:
+            return None
+        return build_channels(a["lb"], a["hr"], a.get("hw", a["hr"]), a.get("lw", a["lb"]), slope=self.slope)
+
+    def _publish(self, wall_ns: int) -> Optional[TrackedChannels]:
+        a = self.anchors()
+        if "lb" not in a or "hr" not in a:
+            return None
+        prev = self.published
+        if prev is not None and prev.anchor_date == self.session_date:
+            if [(p.price, p.timestamp) for p in prev.anchors.values()] == [(p.price, p.timestamp) for p in a.values()]:
+                return None
+            revision = prev.revision + 1
+        else:
+            revision = 1
+        self.published = TrackedChannels(
+            trading_date=next_trading_date(self.session_date), anchor_date=self.session_date, anchors=a,
+            channels=self.channels(), published_at=pd.Timestamp(wall_ns + _MIN_NS).tz_localize(CT).to_pydatetime(),
+            revision=revision)
+        if self.on_publish is not None:
+            self.on_publish(self.published)
+        return self.published
@@ -4,117 +4,44 @@
 """
 
 import streamlit as st
+import altair as alt
 import pandas as pd
 import numpy as np
+import os
+import html
+import time
 from datetime import datetime, timedelta, date, time as dtime
 import pytz
 
-from data_fetcher import fetch_es_price, fetch_spx_price, fetch_es_1min, fetch_afternoon_1min, fetch_afternoon_30min
-from channel_builder import build_channels, auto_detect_anchors, AnchorPoint, get_channel_values_at_time, count_blocks, CT, SLOPE
-from cross_detector import get_monitor_state, check_line_proximity
+from data_fetcher import fetch_es_price, fetch_spx_price, fetch_es_1min, fetch_1min, fetch_afternoon_1min, fetch_afternoon_30min, fetch_multi_1min, fetch_multi_afternoon, fetch_anchor_table
+from channel_builder import build_channels, build_channel_systems, rank_anchor_candidates, select_anchors, ROLE_LABELS, AnchorPoint, projection_tables, get_channel_values_at_time, count_blocks, CT, SLOPE
+from cross_detector import MultiTimeframeCrossMonitor, get_monitor_states, check_line_proximity
+from instruments import INSTRUMENTS, get_instrument, futures_symbols
+from offset_estimator import OffsetEstimator
+from chart_data import build_chart_data, LINE_LABELS
+from sensitivity import sensitivity_bands
+from snapshot import load_snapshot
+from option_pricing import price_scenarios, realized_vol, years_to_close
+from touch_probability import channel_touch_estimate
+from bar_store import RingBarStore
+from fixed_point import FixedRingBarStore, fixed_channel_values, FIXED_ENV
+from trade_journal import TradeJournal, DEFAULT_ACCOUNT
+from replay import ReplaySession, SPEEDS, load_bars
+from anchor_tracker import AnchorTracker
+from volume_profile import VolumeTracker, line_confluence
+from snapshot_bus import SnapshotBusReader, BUS_ENV, STALE_AFTER
+from cache_layer import invalidate, stats_frame, total_bytes, LIVE, AFTERNOON, HISTORY, MB
+import ui_templates as ui
+from ui_templates import emit
 from trade_logic import assess_ascending_day, assess_descending_day, assess_asian_session, convert_es_to_spx, get_session_mode, PropFirmRisk, round_strike
 
 st.set_page_config(page_title="SPX Prophet", page_icon="🔮", layout="wide", initial_sidebar_state="collapsed")
+FIXED_POINT = os.environ.get(FIXED_ENV) == "1"   # int32 hundredths in the bar store, levels and zone checks
+channel_values = fixed_channel_values if FIXED_POINT else get_channel_values_at_time
 
 def inject_css():
-    st.markdown("""<style>
-    @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@300;400;500;600;700&family=Outfit:wght@300;400;500;600;700;800;900&family=Sora:wght@300;400;500;600;700;800&display=swap');
-    :root{--bg:#050a14;--bg2:rgba(12,24,48,0.6);--bg3:rgba(8,16,36,0.8);--border:rgba(0,200,255,0.08);--border2:rgba(0,200,255,0.2);--t1:#e8f0ff;--t2:#7a8baa;--t3:#4a5570;--cyan:#00c8ff;--gold:#ffd700;--green:#00e88f;--red:#ff4466;--purple:#a78bfa;--orange:#ff8c42;--teal:#00f5d4}
-    html,body,[data-testid="stAppViewContainer"],[data-testid="stApp"]{background:var(--bg)!important;color:var(--t1)!important;font-family:'Outfit',sans-serif!important}
-
-    /* Cosmic background with floating orbs */
-    [data-testid="stAppViewContainer"]::before{content:'';position:fixed;top:0;left:0;right:0;bottom:0;background:radial-gradient(ellipse 600px 400px at 15% 10%,rgba(0,245,212,0.05),transparent),radial-gradient(ellipse 500px 350px at 85% 90%,rgba(155,93,229,0.04),transparent),radial-gradient(ellipse 400px 300px at 50% 50%,rgba(0,187,249,0.03),transparent);pointer-events:none;z-index:0;animation:cosmicDrift 20s ease-in-out infinite}
-    @keyframes cosmicDrift{0%,100%{opacity:0.7}50%{opacity:1}}
-
-    [data-testid="stHeader"]{background:transparent!important}
-    [data-testid="stMainBlockContainer"]{max-width:1400px;padding-top:0.5rem!important}
-    #MainMenu,footer,[data-testid="stToolbar"]{display:none!important}
-    ::-webkit-scrollbar{width:5px}::-webkit-scrollbar-track{background:transparent}::-webkit-scrollbar-thumb{background:rgba(0,200,255,0.15);border-radius:3px}
-
-    [data-testid="collapsedControl"]{background:rgba(0,200,255,0.15)!important;border:1px solid rgba(0,200,255,0.3)!important;border-radius:8px!important}
-    [data-testid="collapsedControl"] svg{fill:var(--cyan)!important}
-
-    .stNumberInput label,.stDateInput label,.stRadio label,.stCheckbox label,.stSelectbox label{color:var(--cyan)!important;font-family:'Outfit'!important;font-weight:600!important;text-transform:uppercase!important;letter-spacing:0.06em!important;font-size:0.72rem!important}
-    input,[data-testid="stNumberInput"] input{background:rgba(0,200,255,0.03)!important;border:1px solid var(--border)!important;color:var(--t1)!important;border-radius:8px!important;font-family:'JetBrains Mono'!important}
-    input:focus{border-color:var(--cyan)!important;box-shadow:0 0 15px rgba(0,200,255,0.12)!important}
-
-    .stButton>button{background:linear-gradient(135deg,rgba(0,245,212,0.1),rgba(0,200,255,0.04))!important;border:1px solid rgba(0,245,212,0.25)!important;color:var(--teal)!important;font-family:'Outfit'!important;font-weight:600!important;border-radius:10px!important;transition:all 0.3s cubic-bezier(0.4,0,0.2,1)!important}
-    .stButton>button:hover{background:linear-gradient(135deg,rgba(0,245,212,0.2),rgba(0,200,255,0.08))!important;box-shadow:0 0 25px rgba(0,245,212,0.12),0 4px 15px rgba(0,0,0,0.3)!important;transform:translateY(-2px)!important}
-
-    .stTabs [data-baseweb="tab-list"]{gap:4px;background:var(--bg3);border-radius:12px;padding:4px;border:1px solid var(--border)}
-    .stTabs [data-baseweb="tab"]{border-radius:8px;color:var(--t2);font-family:'Outfit';font-weight:500;transition:all 0.2s}
-    .stTabs [aria-selected="true"]{background:rgba(0,245,212,0.08)!important;color:var(--teal)!important}
-
-    .streamlit-expanderHeader{background:var(--bg3)!important;border:1px solid var(--border)!important;border-radius:12px!important;color:var(--t1)!important;font-family:'Outfit'!important}
-
-    /* ═══ GLASSMORPHIC CARD SYSTEM ═══ */
-    .prophet-card{background:var(--bg2);border:1px solid var(--border);border-radius:16px;padding:1.5rem;margin-bottom:1rem;backdrop-filter:blur(24px) saturate(150%);transition:all 0.3s cubic-bezier(0.4,0,0.2,1)}
-    .prophet-card:hover{border-color:var(--border2);box-shadow:0 8px 40px rgba(0,0,0,0.35),inset 0 1px 0 rgba(255,255,255,0.03)}
-    .card-label{font-family:'Outfit';font-size:0.68rem;font-weight:700;text-transform:uppercase;letter-spacing:0.12em;color:var(--t3);margin-bottom:0.4rem}
-    .card-sub{font-family:'Outfit';font-size:0.78rem;color:var(--t2);margin-top:0.3rem}
-
-    /* ═══ EPIC ANIMATED HERO WITH PYRAMID ═══ */
-    .hero-banner{position:relative;text-align:center;padding:1.5rem 1rem;margin-bottom:0.5rem;background:linear-gradient(135deg,rgba(5,10,20,0.9),rgba(10,22,40,0.9));border:1px solid rgba(0,245,212,0.1);border-radius:20px;overflow:hidden}
-    .hero-banner::before{content:'';position:absolute;inset:0;background:radial-gradient(ellipse 80% 120% at 20% 50%,rgba(0,245,212,0.08),transparent 50%),radial-gradient(ellipse 80% 120% at 80% 50%,rgba(155,93,229,0.06),transparent 50%);animation:heroAurora 8s ease-in-out infinite;pointer-events:none}
-    @keyframes heroAurora{0%,100%{opacity:0.6;transform:translateX(0)}50%{opacity:1;transform:translateX(2%)}}
-    .hero-banner::after{content:'';position:absolute;bottom:0;left:0;right:0;height:2px;background:linear-gradient(90deg,var(--teal),var(--purple),var(--cyan));box-shadow:0 0 20px rgba(0,245,212,0.4)}
-
-    /* Animated Pyramid Logo */
-    .pyramid-wrap{position:relative;width:80px;height:80px;margin:0 auto 0.8rem;animation:pyramidFloat 4s ease-in-out infinite}
-    @keyframes pyramidFloat{0%,100%{transform:translateY(0) scale(1)}50%{transform:translateY(-5px) scale(1.03)}}
-    .pyramid-ring{position:absolute;inset:-8px;border:1.5px solid rgba(0,245,212,0.25);border-radius:50%;animation:ringRotate 15s linear infinite}
-    .pyramid-ring::before{content:'';position:absolute;top:-3px;left:50%;width:6px;height:6px;background:var(--teal);border-radius:50%;box-shadow:0 0 12px var(--teal)}
-    @keyframes ringRotate{from{transform:rotate(0deg)}to{transform:rotate(360deg)}}
-    .pyramid-ring-inner{position:absolute;inset:2px;border:1px solid rgba(155,93,229,0.3);border-radius:50%;animation:ringRotate 10s linear infinite reverse}
-    .pyramid-ring-inner::before{content:'';position:absolute;bottom:-2px;left:50%;width:4px;height:4px;background:var(--purple);border-radius:50%;box-shadow:0 0 8px var(--purple)}
-    .pyramid-body{position:absolute;top:10px;left:50%;transform:translateX(-50%);width:0;height:0;border-left:32px solid transparent;border-right:32px solid transparent;border-bottom:55px solid rgba(0,245,212,0.12);filter:drop-shadow(0 0 20px rgba(0,245,212,0.3));animation:pyramidGlow 3s ease-in-out infinite}
-    @keyframes pyramidGlow{0%,100%{filter:drop-shadow(0 0 15px rgba(0,245,212,0.2));border-bottom-color:rgba(0,245,212,0.1)}50%{filter:drop-shadow(0 0 30px rgba(0,245,212,0.5));border-bottom-color:rgba(0,245,212,0.2)}}
-    .pyramid-inner{position:absolute;top:24px;left:50%;transform:translateX(-50%);width:0;height:0;border-left:18px solid transparent;border-right:18px solid transparent;border-bottom:32px solid rgba(155,93,229,0.15);animation:pyramidGlow 3s ease-in-out infinite 0.5s}
-    .pyramid-eye{position:absolute;top:32px;left:50%;transform:translateX(-50%);width:14px;height:14px;border-radius:50%;background:radial-gradient(circle,rgba(0,245,212,0.8),rgba(0,245,212,0.2) 60%,transparent);box-shadow:0 0 15px rgba(0,245,212,0.6);animation:eyePulse 2s ease-in-out infinite}
-    @keyframes eyePulse{0%,100%{box-shadow:0 0 10px rgba(0,245,212,0.4);transform:translateX(-50%) scale(1)}50%{box-shadow:0 0 25px rgba(0,245,212,0.8);transform:translateX(-50%) scale(1.15)}}
-    .pyramid-energy{position:absolute;inset:-15px;border-radius:50%;background:radial-gradient(circle,rgba(0,245,212,0.06),transparent 70%);animation:energyPulse 4s ease-in-out infinite}
-    @keyframes energyPulse{0%,100%{transform:scale(1);opacity:0.4}50%{transform:scale(1.2);opacity:0.7}}
-
-    .hero-title{font-family:'Sora';font-size:2rem;font-weight:800;background:linear-gradient(135deg,#e8f0ff 0%,var(--teal) 40%,var(--purple) 70%,var(--cyan) 100%);-webkit-background-clip:text;-webkit-text-fill-color:transparent;letter-spacing:-0.03em;animation:titleShimmer 6s ease-in-out infinite;background-size:200% 200%}
-    @keyframes titleShimmer{0%,100%{background-position:0% 50%}50%{background-position:100% 50%}}
-    .hero-tagline{font-family:'Outfit';font-size:0.72rem;color:var(--t3);letter-spacing:0.2em;text-transform:uppercase;margin-top:0.2rem}
-
-    .status-badge{display:inline-flex;align-items:center;gap:6px;padding:4px 12px;border-radius:20px;font-family:'JetBrains Mono';font-size:0.7rem;font-weight:600}
-    .status-live{background:rgba(0,232,143,0.08);border:1px solid rgba(0,232,143,0.2);color:var(--green)}
-    .dot{width:6px;height:6px;border-radius:50%;background:var(--green);animation:dotP 2s ease-in-out infinite}
-    @keyframes dotP{0%,100%{opacity:1}50%{opacity:0.3}}
-
-    .signal-card{background:var(--bg2);border-radius:16px;padding:1.2rem 1.5rem;margin:0.8rem 0;position:relative;overflow:hidden;backdrop-filter:blur(20px)}
-    .signal-calls,.signal-long{border:1px solid rgba(0,232,143,0.15);box-shadow:0 0 25px rgba(0,232,143,0.03)}
-    .signal-calls::before,.signal-long::before{content:'';position:absolute;top:0;left:0;right:0;height:2px;background:linear-gradient(90deg,transparent,var(--green),transparent)}
-    .signal-puts,.signal-short{border:1px solid rgba(255,68,102,0.15);box-shadow:0 0 25px rgba(255,68,102,0.03)}
-    .signal-puts::before,.signal-short::before{content:'';position:absolute;top:0;left:0;right:0;height:2px;background:linear-gradient(90deg,transparent,var(--red),transparent)}
-
-    .strength-strong{background:rgba(0,232,143,0.08);color:var(--green);border:1px solid rgba(0,232,143,0.2);padding:2px 8px;border-radius:4px;font-size:0.65rem;font-weight:700;font-family:'JetBrains Mono'}
-    .strength-standard{background:rgba(0,200,255,0.08);color:var(--cyan);border:1px solid rgba(0,200,255,0.2);padding:2px 8px;border-radius:4px;font-size:0.65rem;font-weight:700;font-family:'JetBrains Mono'}
-    .strength-caution{background:rgba(255,140,66,0.08);color:var(--orange);border:1px solid rgba(255,140,66,0.2);padding:2px 8px;border-radius:4px;font-size:0.65rem;font-weight:700;font-family:'JetBrains Mono'}
-
-    .strike-call{background:rgba(0,232,143,0.08);color:var(--green);border:1px solid rgba(0,232,143,0.2);padding:3px 10px;border-radius:6px;font-family:'JetBrains Mono';font-size:0.85rem;font-weight:600}
-    .strike-put{background:rgba(255,68,102,0.08);color:var(--red);border:1px solid rgba(255,68,102,0.2);padding:3px 10px;border-radius:6px;font-family:'JetBrains Mono';font-size:0.85rem;font-weight:600}
-
-    .risk-bar{width:100%;height:6px;background:rgba(255,255,255,0.04);border-radius:3px;overflow:hidden;margin-top:0.5rem}
-    .risk-fill{height:100%;border-radius:3px;transition:width 0.5s}
-    .risk-clear{background:var(--green)}.risk-active{background:var(--cyan)}.risk-caution{background:var(--orange)}.risk-danger{background:var(--red)}
-
-    .day-asc{background:linear-gradient(135deg,rgba(0,232,143,0.06),rgba(0,232,143,0.01));border:1px solid rgba(0,232,143,0.15);padding:0.8rem 1.2rem;border-radius:12px;text-align:center}
-    .day-desc{background:linear-gradient(135deg,rgba(255,68,102,0.06),rgba(255,68,102,0.01));border:1px solid rgba(255,68,102,0.15);padding:0.8rem 1.2rem;border-radius:12px;text-align:center}
-
-    .gold-card{border-color:rgba(255,215,0,0.2)!important;box-shadow:0 0 30px rgba(255,215,0,0.06)!important;position:relative;overflow:hidden}
-    .gold-card::before{content:'';position:absolute;top:0;left:0;right:0;height:2px;background:linear-gradient(90deg,transparent,var(--gold),transparent)}
-
-    /* Distance badge */
-    .dist-badge{display:inline-block;padding:2px 8px;border-radius:4px;font-family:'JetBrains Mono';font-size:0.7rem;font-weight:600;margin-left:6px}
-    .dist-near{background:rgba(255,215,0,0.1);color:var(--gold);border:1px solid rgba(255,215,0,0.2)}
-    .dist-far{background:rgba(0,200,255,0.06);color:var(--t2);border:1px solid var(--border)}
-
-    /* Dataframe styling */
-    [data-testid="stDataFrame"]{border:1px solid var(--border)!important;border-radius:12px!important;overflow:hidden!important}
-    </style>""", unsafe_allow_html=True)
+    # Stylesheet is served from static/ and cached by the browser; reruns only send the link tag
+    emit(ui.STYLESHEET_LINK)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -122,129 +49,208 @@ def inject_css():
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def render_hero():
-    st.markdown("""<div class="hero-banner">
+    emit("""<div class="hero-banner">
     <div class="pyramid-wrap"><div class="pyramid-energy"></div><div class="pyramid-ring"></div><div class="pyramid-ring-inner"></div>
     <div class="pyramid-body"></div><div class="pyramid-inner"></div><div class="pyramid-eye"></div></div>
     <div class="hero-title">SPX PROPHET</div>
     <div class="hero-tagline">Where Structure Becomes Foresight</div>
-    </div>""", unsafe_allow_html=True)
+    </div>""")
 
 
 def render_live_bar(es_price, es_src, spx_price, spx_src, offset, session_mode):
     labels = {"asian":"ASIAN SESSION","pre_rth":"PRE-MARKET","rth":"RTH ACTIVE","afternoon":"AFTERNOON","off":"MARKET CLOSED"}
-    now_ct = datetime.now(CT)
-    st.markdown(f"""<div class="prophet-card" style="padding:1rem 1.5rem;">
-    <div style="display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:0.8rem;">
-    <span class="status-badge status-live"><span class="dot"></span>{labels.get(session_mode,'—')}</span>
-    <div style="display:flex;gap:2rem;align-items:center;flex-wrap:wrap;">
-    <div><div class="card-label">ES <span style="font-size:0.55rem;color:var(--t3);">({es_src})</span></div><div style="font-family:'JetBrains Mono';font-size:1.3rem;font-weight:700;color:var(--teal);">{es_price:,.2f}</div></div>
-    <div><div class="card-label">SPX</div><div style="font-family:'JetBrains Mono';font-size:1.3rem;font-weight:700;color:var(--t1);">{spx_price:,.2f}</div></div>
-    <div><div class="card-label">OFFSET</div><div style="font-family:'JetBrains Mono';font-size:1.3rem;font-weight:700;color:var(--purple);">{offset:+.1f}</div></div>
-    <div><div class="card-label">CT</div><div style="font-family:'JetBrains Mono';font-size:1.3rem;font-weight:700;color:var(--t2);">{now_ct.strftime("%I:%M %p")}</div></div>
-    </div></div></div>""", unsafe_allow_html=True)
+    now_ct = app_now()
+    emit(ui.LIVE_BAR.format(session=labels.get(session_mode, '—'), es_src=es_src, es=es_price, spx=spx_price,
+                            offset=offset, now=now_ct.strftime("%I:%M %p")))
 
 
 def render_scenario_card(s, trading_date=None, current_price=0):
-    is_bull = s.direction in ("CALLS", "LONG ES")
-    sig_cls = ("signal-calls" if s.direction == "CALLS" else "signal-long") if is_bull else ("signal-puts" if s.direction == "PUTS" else "signal-short")
-    c = "var(--green)" if is_bull else "var(--red)"
-    str_cls = f"strength-{s.strength.lower()}"
-    pri = "PRIMARY" if s.is_primary else "ALTERNATE"
-
-    # Distance to entry
-    dist_html = ""
-    if current_price > 0:
-        dist = abs(current_price - s.entry_level)
-        dist_cls = "dist-near" if dist < 10 else "dist-far"
-        dist_html = f'<span class="dist-badge {dist_cls}">{dist:.1f} pts away</span>'
-
-    parts = [
-        f'<div class="signal-card {sig_cls}">',
-        f'<div><span class="{str_cls}">{s.strength}</span><span style="margin-left:8px;font-size:0.7rem;color:var(--t3);">{pri}</span>{dist_html}</div>',
-        f'<div style="margin-top:0.6rem;"><span style="font-family:Sora;font-size:1.3rem;font-weight:800;color:{c};">{s.direction}</span><span style="color:var(--t3);font-size:0.85rem;margin-left:0.5rem;">at</span></div>',
-        f'<div style="font-family:JetBrains Mono;font-size:1.8rem;font-weight:700;color:{c};margin-top:0.2rem;">{s.entry_level:,.2f}</div>',
-        f'<div class="card-sub">{s.entry_label}</div>',
-        f'<div style="font-size:0.82rem;color:var(--t2);margin-top:0.4rem;">{s.rationale}</div>',
-    ]
-    if s.target_level:
-        parts.append(f'<div style="margin-top:0.4rem;"><span class="card-sub">Target: </span><span style="font-family:JetBrains Mono;color:{c};">{s.target_level:,.2f}</span><span class="card-sub"> ({s.target_label})</span></div>')
-    sl = getattr(s, 'stop_loss', None)
-    if sl:
-        parts.append(f'<div style="margin-top:0.3rem;"><span class="card-sub">Stop: </span><span style="font-family:JetBrains Mono;color:var(--red);font-weight:600;">{sl:,.2f}</span></div>')
-    tp1 = getattr(s, 'take_profit_1', None)
-    if tp1:
-        tp2, tp3 = getattr(s, 'take_profit_2', 0), getattr(s, 'take_profit_3', 0)
-        parts.append(f'<div style="display:flex;gap:1rem;margin-top:0.3rem;flex-wrap:wrap;"><div><span class="card-sub">TP1: </span><span style="font-family:JetBrains Mono;color:var(--gold);font-size:0.85rem;">{tp1:,.2f}</span></div><div><span class="card-sub">TP2: </span><span style="font-family:JetBrains Mono;color:var(--gold);font-size:0.85rem;">{tp2:,.2f}</span></div><div><span class="card-sub">TP3: </span><span style="font-family:JetBrains Mono;color:var(--gold);font-size:0.85rem;">{tp3:,.2f}</span></div></div>')
-    if s.strike and s.direction in ("CALLS", "PUTS"):
-        cp = "C" if s.direction == "CALLS" else "P"
-        scls = "strike-call" if s.direction == "CALLS" else "strike-put"
-        parts.append(f'<div style="margin-top:0.8rem;padding-top:0.6rem;border-top:1px solid var(--border);"><span class="{scls}">{s.strike}{cp}</span></div>')
-    parts.append('</div>')
-    st.markdown(''.join(parts), unsafe_allow_html=True)
+    dist = abs(current_price - s.entry_level) if current_price > 0 else None
+    emit(ui.scenario_html(s.direction, s.strength, s.is_primary, s.entry_level, s.entry_label, s.rationale,
+                          s.target_level, s.target_label, getattr(s, 'stop_loss', None),
+                          getattr(s, 'take_profit_1', None), getattr(s, 'take_profit_2', 0), getattr(s, 'take_profit_3', 0),
+                          s.strike, dist, s.premium, s.delta, s.iv, s.level_pnl, s.strike_ladder))
 
 
 def render_cross_monitor(state):
-    sc = "var(--green)" if state.current_spread > 0 else "var(--red)"
-    dp = min(100, (state.max_divergence / 10.0) * 100)
-    dc = "var(--gold)" if state.is_diverged_enough else "var(--t3)"
-    if "VALID" in state.status: scls = "color:var(--green)"
-    elif state.status == "READY": scls = "color:var(--gold)"
-    elif "INVALID" in state.status: scls = "color:var(--red)"
-    else: scls = "color:var(--t2)"
-    st.markdown(f"""<div class="prophet-card">
-    <div class="card-label">8 / 50 EMA CROSS MONITOR — ES 1-MIN</div>
-    <div style="display:grid;grid-template-columns:1fr 1fr 1fr;gap:1rem;margin-top:1rem;">
-    <div><div class="card-sub">Spread</div><div style="font-family:JetBrains Mono;font-size:1.4rem;font-weight:700;color:{sc};">{state.current_spread:+.1f}</div></div>
-    <div><div class="card-sub">Max Div</div><div style="font-family:JetBrains Mono;font-size:1.4rem;font-weight:700;color:{dc};">{state.max_divergence:.1f}</div>
-    <div class="risk-bar"><div class="risk-fill {'risk-clear' if state.is_diverged_enough else 'risk-active'}" style="width:{dp}%;"></div></div></div>
-    <div><div class="card-sub">Status</div><div style="{scls};font-family:Sora;font-size:1rem;font-weight:700;">{state.status}</div></div>
-    </div><div style="margin-top:0.8rem;padding-top:0.6rem;border-top:1px solid var(--border);"><div class="card-sub">{state.status_detail}</div></div></div>""", unsafe_allow_html=True)
+    if "VALID" in state.status: stc = "c-green"
+    elif state.status == "READY": stc = "c-gold"
+    elif "INVALID" in state.status: stc = "c-red"
+    else: stc = "c-t2"
+    emit(ui.CROSS_MONITOR.format(
+        sc="c-green" if state.current_spread > 0 else "c-red", spread=state.current_spread,
+        dc="c-gold" if state.is_diverged_enough else "c-t3", max_div=state.max_divergence,
+        fill='risk-clear' if state.is_diverged_enough else 'risk-active', pct=min(100, (state.max_divergence / 10.0) * 100),
+        stc=stc, status=state.status, detail=state.status_detail))
+    if len(state.timeframes) > 1:
+        emit(ui.cross_tf_html(state))
 
 
 def render_prop_firm(risk):
     rc = {"CLEAR":"risk-clear","ACTIVE":"risk-active","CAUTION":"risk-caution","DANGER":"risk-danger","LIMIT HIT":"risk-danger"}
-    st.markdown(f"""<div class="prophet-card">
-    <div class="card-label">THE FUTURES DESK — RISK</div>
-    <div style="display:grid;grid-template-columns:1fr 1fr 1fr;gap:1rem;margin-top:0.8rem;">
-    <div><div class="card-sub">Max</div><div style="font-family:JetBrains Mono;font-size:1rem;">{risk.max_es} ES / {risk.max_mes} MES</div></div>
-    <div><div class="card-sub">Daily Limit</div><div style="font-family:JetBrains Mono;font-size:1rem;color:var(--red);">${risk.daily_loss_limit:,.0f}</div></div>
-    <div><div class="card-sub">Risk</div><div style="font-family:JetBrains Mono;font-size:1rem;color:{'var(--green)' if risk.risk_pct < 50 else 'var(--red)'};">{risk.risk_pct:.0f}%</div>
-    <div class="risk-bar"><div class="risk-fill {rc.get(risk.risk_status,'risk-active')}" style="width:{risk.risk_pct}%;"></div></div></div></div></div>""", unsafe_allow_html=True)
+    emit(ui.PROP_FIRM.format(max_es=risk.max_es, max_mes=risk.max_mes, limit=risk.daily_loss_limit,
+                             rc="c-green" if risk.risk_pct < 50 else "c-red", pct=risk.risk_pct,
+                             fill=rc.get(risk.risk_status, 'risk-active'),
+                             pc="c-green" if risk.current_pnl >= 0 else "c-red", pnl=risk.current_pnl,
+                             trades=risk.trades_today, day_dd=risk.daily_drawdown, trail_dd=risk.trailing_drawdown))
+
+
+@st.cache_resource
+def get_journal():
+    return TradeJournal()
+
+
+@st.cache_resource
+def get_bus():
+    """One shared-memory reader per app process when a feed process is configured (PROPHET_BUS)."""
+    name = os.environ.get(BUS_ENV)
+    return SnapshotBusReader(name) if name else None
+
+
+def settle_journal(journal, es_1min, now_ct, mark_key, account):
+    """Simulator exits: walk the closed bars since the last rerun through the open sim trades' stops / targets."""
+    if es_1min.empty:
+        return
+    closed = es_1min[es_1min.index <= now_ct - timedelta(minutes=1)]
+    mark = st.session_state.get(mark_key)
+    if mark is not None:
+        new = closed[closed.index > mark]
+        for ts, hi, lo in zip(new.index, new["High"], new["Low"]):
+            journal.settle_open(float(hi), float(lo), ts, account)
+    if not closed.empty:
+        st.session_state[mark_key] = closed.index[-1]
+
+
+def fmt_level(v):
+    return "—" if v is None or v != v else f"{v:,.2f}"
+
+
+def sim_entry(journal, s, offset, now_ct, source, account):
+    """Journal a scenario as a 1-lot ES sim trade (SPX levels + offset), exiting at its stop or TP1."""
+    side = 1 if s.direction in ("CALLS", "LONG ES") else -1
+    return journal.record_fill("ES", side, 1, s.entry_level + offset, now_ct, scenario=f"{s.direction} {s.entry_label}",
+                               account=account, stop=s.stop_loss + offset, target=s.take_profit_1 + offset, source=source)
 
 
 def render_channel_card(vals, label="ES"):
-    ae = f"{vals['asc_extreme']:,.2f}" if vals.get('asc_extreme') else "—"
-    de = f"{vals['desc_extreme']:,.2f}" if vals.get('desc_extreme') else "—"
-    st.markdown(f"""<div class="prophet-card">
-    <div class="card-label">CHANNEL LEVELS — {label}</div>
-    <div style="display:grid;grid-template-columns:1fr 1fr;gap:1rem;margin-top:0.8rem;">
-    <div style="border-left:3px solid var(--green);padding-left:1rem;"><div class="card-label" style="color:var(--green);">ASCENDING</div>
-    <div style="display:flex;justify-content:space-between;margin-top:0.3rem;"><span class="card-sub">Extreme</span><span style="font-family:JetBrains Mono;color:rgba(0,232,143,0.4);font-size:0.85rem;">{ae}</span></div>
-    <div style="display:flex;justify-content:space-between;"><span class="card-sub">Ceiling</span><span style="font-family:JetBrains Mono;color:var(--green);font-size:0.95rem;font-weight:600;">{vals['asc_ceiling']:,.2f}</span></div>
-    <div style="display:flex;justify-content:space-between;"><span class="card-sub">Floor</span><span style="font-family:JetBrains Mono;color:var(--green);font-size:0.95rem;font-weight:600;">{vals['asc_floor']:,.2f}</span></div></div>
-    <div style="border-left:3px solid var(--red);padding-left:1rem;"><div class="card-label" style="color:var(--red);">DESCENDING</div>
-    <div style="display:flex;justify-content:space-between;margin-top:0.3rem;"><span class="card-sub">Ceiling</span><span style="font-family:JetBrains Mono;color:var(--red);font-size:0.95rem;font-weight:600;">{vals['desc_ceiling']:,.2f}</span></div>
-    <div style="display:flex;justify-content:space-between;"><span class="card-sub">Floor</span><span style="font-family:JetBrains Mono;color:var(--red);font-size:0.95rem;font-weight:600;">{vals['desc_floor']:,.2f}</span></div>
-    <div style="display:flex;justify-content:space-between;"><span class="card-sub">Extreme</span><span style="font-family:JetBrains Mono;color:rgba(255,68,102,0.4);font-size:0.85rem;">{de}</span></div></div>
-    </div></div>""", unsafe_allow_html=True)
-
-
-def fmt_hour(h, m):
-    if h == 0: return f"12:{m:02d} AM"
-    if h < 12: return f"{h}:{m:02d} AM"
-    if h == 12: return f"12:{m:02d} PM"
-    return f"{h-12}:{m:02d} PM"
-
-
-def make_projection_table(channels, target_date, times_list, offset=0):
-    if not times_list:
-        return pd.DataFrame()
-    rows = []
-    for label, t in times_list:
-        target_t = CT.localize(datetime.combine(target_date, t))
-        vals = get_channel_values_at_time(channels, target_t)
-        rows.append({"Time (CT)": label, "Asc Ceil": round(vals["asc_ceiling"] - offset, 2), "Asc Floor": round(vals["asc_floor"] - offset, 2), "Desc Ceil": round(vals["desc_ceiling"] - offset, 2), "Desc Floor": round(vals["desc_floor"] - offset, 2)})
-    return pd.DataFrame(rows)
+    emit(ui.levels_html(label, vals['asc_floor'], vals['asc_ceiling'], vals.get('asc_extreme'),
+                        vals['desc_floor'], vals['desc_ceiling'], vals.get('desc_extreme')))
+
+
+def render_volume(inst, levels, lines):
+    """Session / anchor-window VWAP and profile, plus which channel lines sit on a volume level."""
+    rows = [(name, lv) for name, lv in levels.items() if lv is not None]
+    if not rows:
+        return
+    hits = [(LINE_LABELS[key], name, label, level, dist)
+            for name, lv in rows for key, (label, level, dist) in line_confluence(lv, lines).items()]
+    emit(ui.volume_html(inst, tuple(rows), tuple(hits)))
+
+
+def render_watchlist_card(inst, df, channels, state, now_ct, basis):
+    price = float(df["Close"].iloc[-1]) if df is not None and not df.empty else 0.0
+    basis_txt = f"{basis.offset:+.2f} ({basis.confidence})" if basis.confidence != "NONE" else "—"
+    if channels is not None:
+        v = get_channel_values_at_time(channels, now_ct)
+        lvl = f"Asc {v['asc_floor']:,.2f} – {v['asc_ceiling']:,.2f} | Desc {v['desc_floor']:,.2f} – {v['desc_ceiling']:,.2f}"
+    else:
+        lvl = "No anchors detected"
+    emit(ui.WATCHLIST.format(key=inst.key, symbol=inst.symbol, price=price,
+                             sc="c-green" if state.current_spread > 0 else "c-red", spread=state.current_spread,
+                             status=state.status, cash=inst.cash_symbol, basis=basis_txt, levels=lvl))
+
+
+REPLAY_STARTS = {"Globex open (5 PM prior)": None, "Pre-market 8:00": dtime(8, 0), "RTH open 8:30": dtime(8, 30), "Anchor window 12:00": dtime(12, 0)}
+
+
+def app_now():
+    """Wall clock, or the replay's virtual clock while a recorded day is playing."""
+    replay = st.session_state.get("replay")
+    return replay.now() if replay is not None else datetime.now(CT)
+
+
+def start_replay():
+    path = st.session_state["replay_path"].strip()
+    try:
+        bars = load_bars(path)
+    except (OSError, ValueError) as e:
+        st.session_state["replay_error"] = f"Could not load {path}: {e}"
+        return
+    if bars.empty:
+        st.session_state["replay_error"] = f"No bars in {path}"
+        return
+    d = st.session_state["replay_date"]
+    st.session_state["replay"] = ReplaySession(bars, d, SPEEDS[st.session_state["replay_speed"]],
+                                               REPLAY_STARTS[st.session_state["replay_start"]],
+                                               basis=st.session_state["offset_input"])
+    st.session_state["trading_date"] = d
+    for k in ("replay_store", "replay_offset", "replay_tracker", "replay_cross", "replay_volume", "replay_journal_bar", "replay_error", "mc_cache"):
+        st.session_state.pop(k, None)
+
+
+def stop_replay():
+    for k in ("replay", "replay_store", "replay_offset", "replay_tracker", "replay_cross", "replay_volume", "replay_journal_bar", "mc_cache"):
+        st.session_state.pop(k, None)
+    st.session_state["trading_date"] = datetime.now(CT).date()
+
+
+def set_replay_speed():
+    replay = st.session_state.get("replay")
+    if replay is not None:
+        replay.clock.set_speed(SPEEDS[st.session_state["replay_speed"]])
+
+
+def apply_anchor(key, price, ts):
+    st.session_state[key] = float(price)
+    st.session_state[f"{key}_h"] = ts.hour
+    st.session_state[f"{key}_m"] = ts.minute
+
+
+def pick_candidate(key):
+    """Selectbox callback: load an alternative candidate into the anchor inputs without refetching."""
+    row = st.session_state["anchor_candidates"][key].iloc[st.session_state[f"pick_{key}"]]
+    apply_anchor(key, row["price"], row["timestamp"])
+
+
+def fmt_candidate(row):
+    return f"{row['price']:,.2f} @ {row['timestamp'].strftime('%I:%M %p')} · {row['scales']} · {row['agreement']:.0%}"
+
+
+def offset_table(df, offset):
+    """ES projection table → SPX by subtracting the basis from every level column."""
+    if df.empty or not offset:
+        return df
+    out = df.copy()
+    cols = [c for c in out.columns if c != "Time (CT)"]
+    out[cols] = (out[cols] - offset).round(2)
+    return out
+
+
+def render_channel_chart(data, label):
+    if data["price"].empty:
+        emit(ui.NOTE_CARD.format(label="", text="No bars to chart yet."))
+        return
+    colors = alt.Scale(domain=["Price", "Asc Extreme", "Asc Ceiling", "Asc Floor", "Desc Ceiling", "Desc Floor", "Desc Extreme"],
+                       range=["#00f5d4", "rgba(0,232,143,0.4)", "#00e88f", "#00e88f", "#ff4466", "#ff4466", "rgba(255,68,102,0.4)"])
+    series = pd.concat([data["price"], data["lines"]], ignore_index=True)
+    chart = alt.Chart(series).mark_line(strokeWidth=1.2).encode(
+        x=alt.X("time:T", title=None), y=alt.Y("value:Q", title=label, scale=alt.Scale(zero=False)),
+        color=alt.Color("series:N", scale=colors, legend=alt.Legend(orient="bottom", title=None)))
+    if not data["anchors"].empty:
+        chart += alt.Chart(data["anchors"]).mark_point(shape="diamond", size=80, filled=True, color="#ffd700").encode(
+            x="time:T", y="value:Q", tooltip=["label", alt.Tooltip("value:Q", format=",.2f")])
+    if not data["crosses"].empty:
+        chart += alt.Chart(data["crosses"]).mark_point(shape="triangle", size=60, filled=True).encode(
+            x="time:T", y="value:Q",
+            color=alt.Color("cross_type:N", scale=alt.Scale(domain=["bullish", "bearish"], range=["#00e88f", "#ff4466"]), legend=None),
+            opacity=alt.condition("datum.is_valid", alt.value(1.0), alt.value(0.35)),
+            tooltip=["cross_type", "is_valid", alt.Tooltip("time:T", format="%I:%M %p")])
+    if not data["volume"].empty:
+        chart += alt.Chart(data["volume"]).mark_rule(strokeDash=[4, 3], strokeWidth=1).encode(
+            y="value:Q",
+            color=alt.Color("kind:N", scale=alt.Scale(domain=["vwap", "poc", "va"], range=["#ffd700", "#b388ff", "rgba(179,136,255,0.4)"]), legend=None),
+            tooltip=["label", alt.Tooltip("value:Q", format=",.2f")])
+    st.altair_chart(chart.properties(height=460).interactive(), use_container_width=True)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -252,40 +258,113 @@ def make_projection_table(channels, target_date, times_list, offset=0):
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def main():
+    ui.begin_rerun()
     inject_css()
     render_hero()
 
-    # Session state defaults
-    defs = {"lb":0.0,"lb_h":13,"lb_m":30,"hr":0.0,"hr_h":14,"hr_m":0,"hw":0.0,"hw_h":13,"hw_m":0,"lw":0.0,"lw_h":14,"lw_m":30,"offset_input":45.0,"auto_detected":False,"sim_price":0.0,"sim_es":0.0}
+    # Session state defaults (CT calendar date, as the scheduler uses, not the server's local one)
+    wall_date = datetime.now(CT).date()
+    defs = {"lb":0.0,"lb_h":13,"lb_m":30,"hr":0.0,"hr_h":14,"hr_m":0,"hw":0.0,"hw_h":13,"hw_m":0,"lw":0.0,"lw_h":14,"lw_m":30,"offset_input":45.0,"auto_detected":False,"sim_price":0.0,"sim_es":0.0,"trading_date":wall_date}
     for k, v in defs.items():
         if k not in st.session_state:
             st.session_state[k] = v
 
+    # ─── SNAPSHOT RESTORE (once per session, no network) ───
+    if "snapshot" not in st.session_state:
+        snap = load_snapshot(wall_date)
+        st.session_state["snapshot"] = snap
+        if snap is not None and st.session_state["lb"] == 0:
+            for key, ap in snap.anchors.items():
+                apply_anchor(key, ap.price, ap.timestamp)
+            st.session_state["anchor_date"] = snap.anchor_date.isoformat()
+            if not snap.candidates["lb"].empty:
+                st.session_state["anchor_candidates"] = snap.candidates
+    snap = st.session_state["snapshot"]
+
+    # ─── LIVE BARS (ring buffer: only new bars are appended each rerun) ───
+    # A replay gets its own store and estimator so the live ones resume untouched on STOP.
+    replay = st.session_state.get("replay")
+    store_key, est_key, trk_key, cross_key, vol_key = (
+        ("replay_store", "replay_offset", "replay_tracker", "replay_cross", "replay_volume") if replay is not None else
+        ("bar_store", "offset_estimator", "anchor_tracker", "cross_monitor", "volume_tracker"))
+    # With a feed process publishing, bars / prices / offset / crosses come from shared memory instead.
+    bus = get_bus() if replay is None else None
+    feed = bus.read(max_age=STALE_AFTER) if bus is not None else None
+    if feed is not None:
+        es_1min = feed.bars
+    else:
+        if store_key not in st.session_state:
+            st.session_state[store_key] = FixedRingBarStore() if FIXED_POINT else RingBarStore()
+        bar_store = st.session_state[store_key]
+        bar_store.extend_frame(replay.es_1min() if replay is not None else fetch_es_1min())
+        es_1min = bar_store.to_frame() if len(bar_store) else pd.DataFrame()
+
+    # ─── LIVE ANCHORS (tracked through 12-3 PM, published for the next session at 3:00) ───
+    if trk_key not in st.session_state:
+        st.session_state[trk_key] = AnchorTracker()
+    tracker = st.session_state[trk_key]
+    tracker.extend(es_1min, now=app_now())
+    tracked = tracker.published
+    if (tracked is not None and tracked.trading_date == st.session_state["trading_date"]
+            and (st.session_state["lb"] == 0 or st.session_state.get("anchor_source") == "tracker")
+            and st.session_state.get("tracked_rev") != (tracked.trading_date, tracked.revision)):
+        for key, ap in tracked.anchors.items():
+            apply_anchor(key, ap.price, ap.timestamp)
+        st.session_state["anchor_date"] = tracked.anchor_date.isoformat()
+        st.session_state["anchor_source"] = "tracker"
+        st.session_state["tracked_rev"] = (tracked.trading_date, tracked.revision)
+
+    # ─── VOLUME (session VWAP / profile and each day's 12-3 PM window, O(1) per new bar) ───
+    if vol_key not in st.session_state:
+        st.session_state[vol_key] = VolumeTracker()
+    volume = st.session_state[vol_key]
+    volume.extend(es_1min, now=app_now())
+
+    # ─── OFFSET ESTIMATE (incremental across reruns) ───
+    if feed is not None:
+        offset_est = feed.offset
+    else:
+        if est_key not in st.session_state:
+            st.session_state[est_key] = OffsetEstimator()
+        st.session_state[est_key].update_frames(es_1min, replay.spx_1min() if replay is not None else fetch_1min("^GSPC"))
+        offset_est = st.session_state[est_key].estimate()
+
     # ─── COMMAND CENTER ───
     with st.expander("⚙️ COMMAND CENTER", expanded=True):
-        trading_date = st.date_input("TRADING DATE", value=date.today())
+        trading_date = st.date_input("TRADING DATE", key="trading_date")
         day_type = st.radio("DAY TYPE", ["ASCENDING", "DESCENDING"], horizontal=True)
         day_type_lower = day_type.lower()
-        manual_offset = st.number_input("ES - SPX OFFSET", format="%.2f", key="offset_input")
+        has_est = offset_est.confidence != "NONE"
+        auto_offset = st.checkbox("AUTO OFFSET", value=True, disabled=not has_est)
+        if auto_offset and has_est:
+            st.session_state["offset_input"] = offset_est.offset
+        manual_offset = st.number_input("ES - SPX OFFSET", format="%.2f", key="offset_input", disabled=auto_offset and has_est)
+        if has_est:
+            st.caption(f"Estimated {offset_est.offset:+.2f} · {offset_est.confidence} confidence · {offset_est.samples} RTH bars · ±{offset_est.dispersion:.2f}")
         st.markdown("---")
 
         auto_col1, auto_col2 = st.columns([1, 1])
         with auto_col1:
             if st.button("🔍 AUTO-DETECT", use_container_width=True):
                 with st.spinner("Fetching..."):
-                    df_1m, used_date = fetch_afternoon_1min(trading_date)
-                    df_30m, used_date_30 = fetch_afternoon_30min(trading_date)
-                    actual_date = used_date or used_date_30
+                    df_30m = pd.DataFrame()
+                    if replay is not None:
+                        df_1m, actual_date = replay.afternoon(trading_date)
+                    else:
+                        df_1m, used_date = fetch_afternoon_1min(trading_date)
+                        df_30m, used_date_30 = fetch_afternoon_30min(trading_date)
+                        actual_date = used_date or used_date_30
                     if not df_1m.empty or not df_30m.empty:
-                        detected = auto_detect_anchors(df_1m, df_30m)
-                        if detected:
-                            for key, ap in [("lb", detected['lb']), ("hr", detected['hr']), ("hw", detected['hw']), ("lw", detected['lw'])]:
-                                st.session_state[key] = ap.price
-                                st.session_state[f"{key}_h"] = ap.timestamp.hour
-                                st.session_state[f"{key}_m"] = ap.timestamp.minute
+                        candidates = rank_anchor_candidates(df_1m, df_30m)
+                        if not candidates["lb"].empty and not candidates["hr"].empty:
+                            st.session_state["anchor_candidates"] = candidates
+                            for key, ap in select_anchors(candidates).items():
+                                apply_anchor(key, ap.price, ap.timestamp)
+                                st.session_state[f"pick_{key}"] = 0
                             if actual_date:
                                 st.session_state["anchor_date"] = actual_date.isoformat()
                             st.session_state["auto_detected"] = True
+                            st.session_state["anchor_source"] = "auto"
                             st.success(f"Detected from {actual_date.strftime('%b %d') if actual_date else 'data'}")
                             st.rerun()
                         else:
@@ -293,14 +372,29 @@ def main():
                     else:
                         st.warning("No data available.")
         with auto_col2:
-            if st.button("🔄 REFRESH", use_container_width=True):
-                st.cache_data.clear()
+            if st.button("🔄 REFRESH", use_container_width=True, help="Refetch live prices and 1-min bars"):
+                invalidate(LIVE)
                 st.rerun()
 
         if st.session_state.get("auto_detected"):
             st.info("Auto-detected. Verify and adjust if needed.")
-
-        st.markdown('<div class="card-label" style="margin:0.5rem 0;">12-3 PM ANCHORS (ES)</div>', unsafe_allow_html=True)
+        elif st.session_state.get("anchor_source") == "tracker" and tracked is not None:
+            st.info(f"Anchors tracked live from {tracked.anchor_date:%b %d} 12-3 PM (published {tracked.published_at:%I:%M %p CT}, rev {tracked.revision}).")
+        elif snap is not None:
+            st.info(f"Restored snapshot for {snap.trading_date:%b %d} (built {snap.created:%b %d %I:%M %p CT}).")
+
+        emit(ui.LABEL.format(cls="section-sm", text="12-3 PM ANCHORS (ES)"))
+
+        candidates = st.session_state.get("anchor_candidates")
+        if candidates:
+            pick_cols = st.columns(4)
+            for col, key in zip(pick_cols, ROLE_LABELS):
+                table = candidates[key]
+                with col:
+                    if not table.empty:
+                        st.selectbox(ROLE_LABELS[key], range(len(table)), key=f"pick_{key}",
+                                     format_func=lambda i, t=table: fmt_candidate(t.iloc[i]),
+                                     on_change=pick_candidate, args=(key,))
 
         for label, key in [("Lowest Bounce", "lb"), ("Highest Rejection", "hr"), ("Highest Wick", "hw"), ("Lowest Wick", "lw")]:
             c1, c2, c3 = st.columns([3, 1, 1])
@@ -308,7 +402,24 @@ def main():
             with c2: st.number_input(f"{key.upper()} Hr", min_value=12, max_value=15, key=f"{key}_h")
             with c3: st.number_input(f"{key.upper()} Min", min_value=0, max_value=59, key=f"{key}_m")
 
-        auto_refresh = st.checkbox("Auto-refresh (30s)", value=False)
+        watchlist = st.multiselect("WATCHLIST", [k for k in INSTRUMENTS if k != "ES"], default=[])
+        iv_pct = st.number_input("IMPLIED VOL % (0 = realized 1m vol)", min_value=0.0, max_value=150.0, value=0.0, step=1.0, key="iv_pct")
+        auto_refresh = st.checkbox("Auto-refresh (30s)", value=False, disabled=replay is not None)
+
+    # ─── REPLAY (recorded day on a virtual clock) ───
+    with st.expander("⏯️ REPLAY", expanded=replay is not None):
+        st.text_input("BARS (archive dir or CSV)", value="bar_archive", key="replay_path")
+        r1, r2, r3 = st.columns([2, 2, 1])
+        with r1: st.date_input("REPLAY DATE", value=wall_date - timedelta(days=1), key="replay_date")
+        with r2: st.selectbox("START", list(REPLAY_STARTS), key="replay_start")
+        with r3: st.selectbox("SPEED", list(SPEEDS), index=2, key="replay_speed", on_change=set_replay_speed)
+        b1, b2 = st.columns(2)
+        with b1: st.button("▶ START", use_container_width=True, on_click=start_replay)
+        with b2: st.button("■ STOP", use_container_width=True, on_click=stop_replay, disabled=replay is None)
+        if st.session_state.get("replay_error"):
+            st.warning(st.session_state["replay_error"])
+        if replay is not None:
+            st.caption(replay.status())
 
     # ─── FETCH DATA ───
     man_lb, man_hr = st.session_state["lb"], st.session_state["hr"]
@@ -319,10 +430,16 @@ def main():
     man_lw_h, man_lw_m = st.session_state["lw_h"], st.session_state["lw_m"]
     offset = st.session_state["offset_input"]
 
-    es_price, es_src = fetch_es_price()
-    spx_price, spx_src = fetch_spx_price()
-    session_mode = get_session_mode()
-    es_1min = fetch_es_1min()
+    if replay is not None:
+        es_price, es_src = replay.es_price()
+        spx_price, spx_src = replay.spx_price()
+    elif feed is not None:
+        es_price, es_src = feed.es, feed.es_src
+        spx_price, spx_src = feed.spx, feed.spx_src
+    else:
+        es_price, es_src = fetch_es_price()
+        spx_price, spx_src = fetch_spx_price()
+    session_mode = get_session_mode(app_now())
 
     render_live_bar(es_price, es_src, spx_price, spx_src, offset, session_mode)
 
@@ -352,101 +469,133 @@ def main():
             st.error(f"Channel error: {e}")
 
     if channels is None:
-        st.markdown('<div class="prophet-card" style="text-align:center;padding:2.5rem;"><div style="font-size:2.5rem;margin-bottom:0.5rem;">📝</div><div style="font-family:Sora;color:var(--gold);font-size:1.1rem;font-weight:700;">ENTER CHANNEL ANCHORS</div><div class="card-sub" style="margin-top:0.5rem;">Enter Lowest Bounce and Highest Rejection above to generate projections.</div></div>', unsafe_allow_html=True)
+        emit(ui.EMPTY_CARD)
         return
 
     # ─── DAY TYPE INDICATOR ───
     if day_type_lower == "ascending":
-        st.markdown('<div class="day-asc"><div class="card-label" style="color:rgba(0,232,143,0.5);">TODAY\'S CHANNEL</div><div style="font-family:Sora;font-size:1.4rem;font-weight:800;color:var(--green);">▲ ASCENDING DAY</div></div>', unsafe_allow_html=True)
+        emit(ui.DAY_ASC)
     else:
-        st.markdown('<div class="day-desc"><div class="card-label" style="color:rgba(255,68,102,0.5);">TODAY\'S CHANNEL</div><div style="font-family:Sora;font-size:1.4rem;font-weight:800;color:var(--red);">▼ DESCENDING DAY</div></div>', unsafe_allow_html=True)
-
-    now_ct = datetime.now(CT)
-    es_vals = get_channel_values_at_time(channels, now_ct)
-    asian_date = anchor_date
+        emit(ui.DAY_DESC)
+
+    now_ct = app_now()
+    today = now_ct.date()
+    journal = get_journal()
+    account = st.session_state.get("journal_account", DEFAULT_ACCOUNT)
+    settle_journal(journal, es_1min, now_ct, "replay_journal_bar" if replay is not None else "journal_bar", account)
+    es_vals = channel_values(channels, now_ct)
+    vol_levels = {"Session": volume.session(trading_date), "12-3 PM": volume.anchor_window(anchor_date)}
+    nine_am = CT.localize(datetime.combine(trading_date, dtime(9, 0)))
+    if snap is not None and snap.matches(trading_date, channels.anchor_points):
+        tables, v9 = snap.tables, snap.nine_am
+    else:
+        tables = projection_tables(channels, trading_date, anchor_date)
+        v9 = channel_values(channels, nine_am)
 
     # ─── TABS ───
-    tab_asian, tab_rth, tab_proj = st.tabs(["🌏 ASIAN", "📈 RTH", "📊 PROJECTIONS"])
+    tab_asian, tab_rth, tab_proj, tab_chart = st.tabs(["🌏 ASIAN", "📈 RTH", "📊 PROJECTIONS", "📉 CHART"])
 
     # ═══ ASIAN ═══
     with tab_asian:
-        asian_times = [(fmt_hour(h, m), dtime(h, m)) for h in range(17, 22) for m in (0, 30) if not (h == 21 and m == 30)]
-        st.dataframe(make_projection_table(channels, asian_date, asian_times), use_container_width=True, hide_index=True)
+        st.dataframe(tables["asian"], use_container_width=True, hide_index=True)
         render_channel_card(es_vals, "ES NOW")
 
-        is_hist = trading_date != date.today()
+        is_hist = trading_date != today
         if is_hist:
-            st.markdown('<div class="card-label">SIMULATE ES PRICE</div>', unsafe_allow_html=True)
+            emit(ui.LABEL.format(cls="", text="SIMULATE ES PRICE"))
             asian_price = st.number_input("ES Price", format="%.2f", key="sim_es", label_visibility="collapsed")
         else:
             asian_price = es_price
 
         if asian_price > 0:
-            assessment = assess_asian_session(asian_price, es_vals)
-            st.markdown(f'<div class="prophet-card"><div class="card-label">POSITION — ES @ {asian_price:,.2f}</div><div style="font-family:Sora;font-size:1.1rem;font-weight:700;color:var(--teal);margin-top:0.5rem;">{assessment.zone_label}</div><div class="card-sub">Nearest: {assessment.nearest_line} ({assessment.nearest_distance:.2f} pts)</div></div>', unsafe_allow_html=True)
+            assessment = assess_asian_session(asian_price, es_vals, fixed=FIXED_POINT)
+            emit(ui.POSITION.format(inst="ES", price=asian_price, zone=assessment.zone_label, nearest=assessment.nearest_line, dist=assessment.nearest_distance))
+            render_volume("ES", vol_levels, es_vals)
             for s in assessment.scenarios:
                 render_scenario_card(s, current_price=asian_price)
-            render_prop_firm(PropFirmRisk())
+            render_prop_firm(journal.risk(today, account, template=PropFirmRisk()))
 
     # ═══ RTH ═══
     with tab_rth:
-        nine_am = CT.localize(datetime.combine(trading_date, dtime(9, 0)))
-        v9 = get_channel_values_at_time(channels, nine_am)
         s9 = convert_es_to_spx(v9, offset)
-        ae_9 = f"{s9['asc_extreme']:,.2f}" if s9.get('asc_extreme') else "—"
-        de_9 = f"{s9['desc_extreme']:,.2f}" if s9.get('desc_extreme') else "—"
-
-        st.markdown(
-            f'<div class="prophet-card gold-card">'
-            f'<div style="display:flex;justify-content:space-between;align-items:center;">'
-            f'<div class="card-label" style="color:var(--gold);font-size:0.8rem;">9:00 AM CT — ENTRY LEVELS (SPX)</div>'
-            f'<span class="status-badge" style="background:rgba(255,215,0,0.08);border:1px solid rgba(255,215,0,0.2);color:var(--gold);">INSTITUTIONAL OPEN</span></div>'
-            f'<div style="display:grid;grid-template-columns:1fr 1fr;gap:1.5rem;margin-top:1rem;">'
-            f'<div style="border-left:3px solid var(--green);padding-left:1rem;"><div class="card-label" style="color:var(--green);">ASCENDING</div>'
-            f'<div style="display:flex;justify-content:space-between;margin-top:0.3rem;"><span class="card-sub">Extreme</span><span style="font-family:JetBrains Mono;color:rgba(0,232,143,0.4);font-size:0.85rem;">{ae_9}</span></div>'
-            f'<div style="display:flex;justify-content:space-between;"><span class="card-sub">Ceiling</span><span style="font-family:JetBrains Mono;color:var(--green);font-size:1.1rem;font-weight:700;">{s9["asc_ceiling"]:,.2f}</span></div>'
-            f'<div style="display:flex;justify-content:space-between;"><span class="card-sub">Floor</span><span style="font-family:JetBrains Mono;color:var(--green);font-size:1.1rem;font-weight:700;">{s9["asc_floor"]:,.2f}</span></div></div>'
-            f'<div style="border-left:3px solid var(--red);padding-left:1rem;"><div class="card-label" style="color:var(--red);">DESCENDING</div>'
-            f'<div style="display:flex;justify-content:space-between;margin-top:0.3rem;"><span class="card-sub">Ceiling</span><span style="font-family:JetBrains Mono;color:var(--red);font-size:1.1rem;font-weight:700;">{s9["desc_ceiling"]:,.2f}</span></div>'
-            f'<div style="display:flex;justify-content:space-between;"><span class="card-sub">Floor</span><span style="font-family:JetBrains Mono;color:var(--red);font-size:1.1rem;font-weight:700;">{s9["desc_floor"]:,.2f}</span></div>'
-            f'<div style="display:flex;justify-content:space-between;"><span class="card-sub">Extreme</span><span style="font-family:JetBrains Mono;color:rgba(255,68,102,0.4);font-size:0.85rem;">{de_9}</span></div></div>'
-            f'</div></div>', unsafe_allow_html=True)
-
-        is_historical = trading_date != date.today()
+        emit(ui.nine_am_html(s9['asc_floor'], s9['asc_ceiling'], s9.get('asc_extreme'),
+                             s9['desc_floor'], s9['desc_ceiling'], s9.get('desc_extreme')))
+
+        with st.expander("🎯 9 AM SENSITIVITY"):
+            sc1, sc2, sc3 = st.columns(3)
+            with sc1: sens_pts = st.number_input("Anchor price ± (pts)", min_value=0.0, max_value=10.0, value=1.0, step=0.25, key="sens_pts")
+            with sc2: sens_blocks = st.number_input("Anchor time ± (blocks)", min_value=0, max_value=4, value=1, key="sens_blocks")
+            with sc3: sens_slope = st.number_input("Slope ±", min_value=0.0, max_value=0.2, value=0.0, step=0.01, format="%.2f", key="sens_slope")
+            bands = sensitivity_bands(channels, [nine_am], price_offsets=(-sens_pts, 0.0, sens_pts),
+                                      block_offsets=range(-sens_blocks, sens_blocks + 1), slope_offsets=(-sens_slope, 0.0, sens_slope))
+            emit(ui.bands_html(tuple((LINE_LABELS[k], lo, mid, hi) for k, (lo, mid, hi) in bands.at(0, offset).items())))
+
+        is_historical = trading_date != today
         if is_historical:
-            st.markdown('<div class="card-label" style="margin-top:0.5rem;">SIMULATE: SPX at 9 AM</div>', unsafe_allow_html=True)
+            emit(ui.LABEL.format(cls="section-top", text="SIMULATE: SPX at 9 AM"))
             price_rth = st.number_input("SPX at 9 AM", format="%.2f", key="sim_price", label_visibility="collapsed")
         else:
             price_rth = spx_price if spx_price > 0 else (es_price - offset if es_price > 0 else 0)
 
         if price_rth > 0:
-            rth_assess = assess_ascending_day(price_rth, s9) if day_type_lower == "ascending" else assess_descending_day(price_rth, s9)
-            st.markdown(f'<div class="prophet-card"><div class="card-label">POSITION — SPX @ {price_rth:,.2f}</div><div style="font-family:Sora;font-size:1.1rem;font-weight:700;color:var(--teal);margin-top:0.5rem;">{rth_assess.zone_label}</div><div class="card-sub">Nearest: {rth_assess.nearest_line} ({rth_assess.nearest_distance:.2f} pts)</div></div>', unsafe_allow_html=True)
+            rth_assess = assess_ascending_day(price_rth, s9, fixed=FIXED_POINT) if day_type_lower == "ascending" else assess_descending_day(price_rth, s9, fixed=FIXED_POINT)
+            emit(ui.POSITION.format(inst="SPX", price=price_rth, zone=rth_assess.zone_label, nearest=rth_assess.nearest_line, dist=rth_assess.nearest_distance))
+            render_volume("SPX", {k: lv.shifted(offset) if lv is not None else None for k, lv in vol_levels.items()}, s9)
+            iv = iv_pct / 100.0 if iv_pct > 0 else realized_vol(es_1min)
+            if iv:
+                entry_time = max(now_ct, nine_am) if trading_date == today else nine_am
+                price_scenarios(rth_assess.scenarios, years_to_close(entry_time, trading_date), iv)
+            with st.expander("🎲 PROBABILITY OF TOUCH"):
+                mc_paths = st.select_slider("Paths", [5_000, 10_000, 20_000, 50_000], value=20_000, key="mc_paths")
+                if st.checkbox("Simulate", key="mc_on"):
+                    sim_now = max(now_ct, nine_am) if trading_date == today else nine_am
+                    mc_key = (sim_now.strftime("%Y%m%d%H%M"), day_type_lower, round(price_rth, 2), round(offset, 2),
+                              tuple(round(ap.price, 2) for ap in channels.anchor_points), mc_paths)
+                    cached = st.session_state.get("mc_cache")
+                    if cached is None or cached[0] != mc_key:
+                        est = channel_touch_estimate(channels, es_1min, price_rth + offset, sim_now, rth_assess.scenarios,
+                                                     n_paths=mc_paths, workers=min(4, max(1, (os.cpu_count() or 2) - 1)),
+                                                     entry_offset=offset)
+                        st.session_state["mc_cache"] = (mc_key, est, {(s.direction, s.entry_label): s.touch_prob for s in rth_assess.scenarios})
+                    else:
+                        est = cached[1]
+                        for s in rth_assess.scenarios:
+                            s.touch_prob = cached[2].get((s.direction, s.entry_label))
+                    emit(ui.touch_html(est, {k: (v - offset if v is not None else None) for k, v in v9.items()},
+                                       LINE_LABELS, rth_assess.scenarios))
             for s in rth_assess.scenarios:
                 render_scenario_card(s, trading_date, current_price=price_rth)
+            primary = next((s for s in rth_assess.scenarios if s.is_primary and s.stop_loss and s.take_profit_1), None)
+            if primary is not None and st.button(f"📝 SIM TRADE — {primary.direction} @ {primary.entry_level:,.2f} (1 ES)", key="sim_trade"):
+                tid = sim_entry(journal, primary, offset, now_ct, "replay" if replay is not None else "sim", account)
+                st.success(f"Sim trade #{tid} journaled; exits at stop or TP1.")
 
-        rth_times = [("8:30", dtime(8,30)), ("★ 9:00", dtime(9,0)), ("9:30", dtime(9,30)), ("10:00", dtime(10,0)), ("10:30", dtime(10,30)), ("11:00", dtime(11,0)), ("11:30", dtime(11,30)), ("12:00", dtime(12,0)), ("12:30", dtime(12,30)), ("1:00", dtime(13,0))]
-        st.markdown('<div class="card-label" style="margin-top:1rem;">RTH PROJECTIONS — SPX</div>', unsafe_allow_html=True)
-        st.dataframe(make_projection_table(channels, trading_date, rth_times, offset), use_container_width=True, hide_index=True)
+        emit(ui.LABEL.format(cls="section-top-lg", text="RTH PROJECTIONS — SPX"))
+        st.dataframe(offset_table(tables["rth"], offset), use_container_width=True, hide_index=True)
 
     # ═══ PROJECTIONS ═══
     with tab_proj:
-        st.markdown('<div class="card-label">FULL ES PROJECTION TABLE</div>', unsafe_allow_html=True)
-        eve_times = [(fmt_hour(h, m), dtime(h, m)) for h in range(17, 24) for m in (0, 30)]
-        morn_times = [(fmt_hour(h, m), dtime(h, m)) for h in range(0, 14) for m in (0, 30)]
-        eve_df = make_projection_table(channels, asian_date, eve_times)
-        morn_df = make_projection_table(channels, trading_date, morn_times)
-        full_df = pd.concat([eve_df, morn_df], ignore_index=True) if not eve_df.empty else morn_df
-        st.dataframe(full_df, use_container_width=True, hide_index=True, height=600)
-
-        v9w = get_channel_values_at_time(channels, CT.localize(datetime.combine(trading_date, dtime(9, 0))))
-        aw, dw = abs(v9w['asc_ceiling'] - v9w['asc_floor']), abs(v9w['desc_ceiling'] - v9w['desc_floor'])
-        st.markdown(f'<div class="prophet-card"><div class="card-label">CHANNEL WIDTHS AT 9 AM</div><div style="display:flex;gap:2rem;margin-top:0.5rem;"><div><span class="card-sub">Ascending: </span><span style="font-family:JetBrains Mono;color:var(--green);font-weight:600;">{aw:.2f} pts</span></div><div><span class="card-sub">Descending: </span><span style="font-family:JetBrains Mono;color:var(--red);font-weight:600;">{dw:.2f} pts</span></div></div></div>', unsafe_allow_html=True)
-
-    # ─── CROSS MONITOR ───
-    st.markdown('<div class="card-label" style="margin:1.5rem 0 0.5rem;">ENTRY CONFIRMATION</div>', unsafe_allow_html=True)
+        emit(ui.LABEL.format(cls="", text="FULL ES PROJECTION TABLE"))
+        st.dataframe(tables["full"], use_container_width=True, hide_index=True, height=600)
+
+        aw, dw = abs(v9['asc_ceiling'] - v9['asc_floor']), abs(v9['desc_ceiling'] - v9['desc_floor'])
+        emit(ui.WIDTHS.format(aw=aw, dw=dw))
+
+    # ═══ CHART ═══
+    with tab_chart:
+        chart_view = st.radio("VIEW", ["ES", "SPX"], horizontal=True, key="chart_view")
+        chart_offset = offset if chart_view == "SPX" else 0.0
+        render_channel_chart(build_chart_data(es_1min, channels, chart_offset, volume=vol_levels), chart_view)
+
+    # ─── CROSS MONITOR (1/5/15m from the one 1-min stream, closed bars only) ───
+    emit(ui.LABEL.format(cls="section", text="ENTRY CONFIRMATION"))
+    if cross_key not in st.session_state:
+        st.session_state[cross_key] = MultiTimeframeCrossMonitor()
+    cross_monitor = st.session_state[cross_key]
+    if feed is None:
+        cross_monitor.extend(es_1min, now=now_ct)
     if not es_1min.empty:
-        cs = get_monitor_state(es_1min)
+        cs = feed.cross_state() if feed is not None else cross_monitor.state()
         if es_price > 0:
             nearby = check_line_proximity(es_price, es_vals, 5.0)
             if nearby and "CROSS" in cs.status:
@@ -455,27 +604,100 @@ def main():
         if cs.recent_crosses:
             with st.expander("📋 Cross History"):
                 for cx in reversed(cs.recent_crosses):
-                    v = "✅" if cx.is_valid else "❌"
-                    d = "▲" if cx.cross_type == "bullish" else "▼"
-                    col = "var(--green)" if cx.cross_type == "bullish" else "var(--red)"
-                    st.markdown(f'<div style="padding:0.4rem 0;border-bottom:1px solid var(--border);font-family:JetBrains Mono;font-size:0.78rem;"><span style="color:{col};">{d}</span> {cx.timestamp.strftime("%I:%M %p")} | Div: {cx.divergence:.1f} | {cx.nearest_hour} | {v}</div>', unsafe_allow_html=True)
+                    bull = cx.cross_type == "bullish"
+                    emit(ui.CROSS_ROW.format(c="c-green" if bull else "c-red", arrow="▲" if bull else "▼",
+                                             time=cx.timestamp.strftime("%I:%M %p"), div=cx.divergence,
+                                             hour=cx.nearest_hour, mark="✅" if cx.is_valid else "❌"))
     else:
-        st.markdown('<div class="prophet-card"><div class="card-label">8/50 CROSS MONITOR</div><div class="card-sub">Waiting for ES 1-min data...</div></div>', unsafe_allow_html=True)
+        emit(ui.NOTE_CARD.format(label='<div class="card-label">8/50 CROSS MONITOR</div>', text="Waiting for ES 1-min data..."))
+
+    # ─── TRADE JOURNAL ───
+    with st.expander("📒 TRADE JOURNAL"):
+        st.text_input("ACCOUNT", value=DEFAULT_ACCOUNT, key="journal_account")
+        with st.form("journal_fill", clear_on_submit=True):
+            f1, f2, f3, f4 = st.columns([1, 1, 1, 2])
+            with f1: j_inst = st.selectbox("INSTRUMENT", ["ES", "MES", "SPX"], help="SPX = option premium (×100)")
+            with f2: j_side = st.radio("SIDE", ["LONG", "SHORT"], horizontal=True)
+            with f3: j_qty = st.number_input("QTY", min_value=1, value=1)
+            with f4: j_price = st.number_input("FILL PRICE", min_value=0.0, format="%.2f")
+            f5, f6, f7 = st.columns([2, 1, 1])
+            with f5: j_scn = st.text_input("SCENARIO")
+            with f6: j_stop = st.number_input("STOP (0 = none)", min_value=0.0, format="%.2f")
+            with f7: j_tgt = st.number_input("TARGET (0 = none)", min_value=0.0, format="%.2f")
+            if st.form_submit_button("RECORD FILL") and j_price > 0:
+                journal.record_fill(j_inst, 1 if j_side == "LONG" else -1, j_qty, j_price, now_ct, scenario=j_scn,
+                                    account=account, stop=j_stop or None, target=j_tgt or None)
+        for row in journal.open_trades(account).itertuples():
+            emit(ui.JOURNAL_ROW.format(c="c-green" if row.side > 0 else "c-red", side="▲" if row.side > 0 else "▼",
+                                       id=row.id, qty=row.qty, instrument=html.escape(row.instrument), entry=row.entry_price,
+                                       scenario=html.escape(row.scenario or "—"), stop=fmt_level(row.stop), target=fmt_level(row.target),
+                                       source=html.escape(row.source)))
+            x1, x2 = st.columns([3, 1])
+            with x1: exit_px = st.number_input(f"Exit #{row.id}", min_value=0.0, format="%.2f", key=f"exit_px_{row.id}", label_visibility="collapsed")
+            with x2:
+                if st.button("CLOSE", key=f"exit_{row.id}", use_container_width=True) and exit_px > 0:
+                    journal.record_exit(row.id, exit_px, now_ct)
+                    st.rerun()
+        stats = journal.scenario_stats(account)
+        if not stats.empty:
+            st.dataframe(stats, use_container_width=True, hide_index=True)
+
+    # ─── WATCHLIST ───
+    if watchlist:
+        insts = [get_instrument(k) for k in watchlist]
+        symbols = futures_symbols(watchlist)
+        cash = tuple(sorted({i.cash_symbol for i in insts}))
+        frames = fetch_multi_1min(symbols + cash)          # one batched download: futures + their cash indices
+        systems = build_channel_systems(fetch_multi_afternoon(trading_date, symbols), {i.symbol: i.slope for i in insts})
+        states = get_monitor_states({sym: frames[sym] for sym in symbols}, {i.symbol: i.divergence_threshold for i in insts})
+        emit(ui.LABEL.format(cls="section", text="WATCHLIST"))
+        for inst in insts:
+            basis = st.session_state.setdefault(f"basis_{inst.key}", OffsetEstimator())
+            basis.update_frames(frames[inst.symbol], frames[inst.cash_symbol])
+            render_watchlist_card(inst, frames.get(inst.symbol), systems.get(inst.symbol), states[inst.symbol], now_ct,
+                                  basis.estimate())
+
+    # ─── DATA CACHE ───
+    with st.expander("🗄️ Data Cache"):
+        emit(ui.DEBUG_NOTE.format(text=f"{total_bytes() / MB:,.1f} MB cached across all sessions"))
+        st.dataframe(stats_frame(), use_container_width=True, hide_index=True)
+        c1, c2, c3 = st.columns(3)
+        for col, group in ((c1, LIVE), (c2, AFTERNOON), (c3, HISTORY)):
+            with col:
+                if st.button(f"CLEAR {group.upper()}", key=f"cache_clear_{group}", use_container_width=True):
+                    invalidate(group)
+                    st.rerun()
 
     # ─── DEBUG ───
     with st.expander("🔧 Anchor Debug"):
         for ap in channels.anchor_points:
-            st.markdown(f'<div style="padding:0.3rem 0;font-family:JetBrains Mono;font-size:0.8rem;"><span style="color:var(--teal);">{ap.label}</span> | {ap.price:,.2f} | {ap.timestamp.strftime("%b %d %Y, %I:%M %p CT")}</div>', unsafe_allow_html=True)
+            emit(ui.DEBUG_ROW.format(label=ap.label, price=ap.price, when=ap.timestamp.strftime("%b %d %Y, %I:%M %p CT")))
         test_t = CT.localize(datetime.combine(trading_date, dtime(9, 0)))
         tb = count_blocks(channels.anchor_points[0].timestamp, test_t)
-        st.markdown(f'<div style="color:var(--gold);font-family:JetBrains Mono;font-size:0.75rem;">Blocks to 9 AM = {tb:.0f} | Δ = {SLOPE*tb:.2f} pts</div>', unsafe_allow_html=True)
+        emit(ui.DEBUG_NOTE.format(text=f"Blocks to 9 AM = {tb:.0f} | Δ = {SLOPE*tb:.2f} pts"))
+        if st.checkbox("Anchor history (prior week)", key="anchor_history"):
+            hist = fetch_anchor_table(trading_date - timedelta(days=7), trading_date)
+            if hist.empty:
+                emit(ui.DEBUG_NOTE.format(text="No history available."))
+            else:
+                st.dataframe(hist, use_container_width=True)
+        p = ui.last_payload()
+        emit(ui.DEBUG_NOTE.format(text=f"Last rerun HTML payload = {p['bytes']:,} bytes in {p['blocks']} blocks"))
 
-    st.markdown('<div style="text-align:center;padding:1.5rem 0 1rem;margin-top:1.5rem;border-top:1px solid var(--border);"><div style="font-family:Sora;font-size:0.7rem;color:var(--t3);letter-spacing:0.1em;">SPX PROPHET — NEXT GEN | BUILT FOR PRECISION</div></div>', unsafe_allow_html=True)
+    emit(ui.FOOTER)
 
-    if auto_refresh:
-        import time
-        time.sleep(30)
-        st.rerun()
+    if auto_refresh and replay is None:
+        ui.rerun_after(30)
 
-if __name__ == "__main__":
+
+def run():
+    """One rerun; while a replay is playing, time it, step the virtual clock and schedule the next."""
+    t0 = time.perf_counter()
     main()
+    replay = st.session_state.get("replay")
+    if replay is not None and replay.running:
+        replay.advance(time.perf_counter() - t0)
+        ui.rerun_after(replay.refresh_seconds)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,180 @@
+"""
+SPX Prophet — Bar Archive Module
+Multi-year 1-min bar storage: one memory-mapped .npy file per column plus a
+per-date offset index, so any day or date range slices out zero-copy.
+
+    python bar_archive.py import ES_2019_2024.csv archive/ES --tz America/New_York
+"""
+
+import json
+import os
+import argparse
+import pandas as pd
+import numpy as np
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+import pytz
+
+from data_fetcher import OHLCV, EPOCH_ORDINAL, anchor_table, _prep_1min
+from cross_scanner import scan_crosses
+
+CT = pytz.timezone("America/Chicago")
+ARCHIVE_VERSION = 1
+COLUMN_FILES = {"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+TS_CANDIDATES = ("timestamp", "datetime", "date_time", "time", "date")
+NS_PER_DAY = 86_400_000_000_000
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# IMPORT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _read_vendor_file(path: str, source_tz: str) -> pd.DataFrame:
+    """Read one CSV/Parquet file into a UTC-indexed OHLCV frame."""
+    if path.lower().endswith((".parquet", ".pq")):
+        chunks = [pd.read_parquet(path)]
+    else:
+        chunks = pd.read_csv(path, chunksize=1_000_000)
+
+    out = []
+    for raw in chunks:
+        cols = {c.lower().strip(): c for c in raw.columns}
+        ts_col = next((cols[c] for c in TS_CANDIDATES if c in cols), None)
+        if ts_col is None:
+            raise ValueError(f"{path}: no timestamp column (expected one of {TS_CANDIDATES})")
+        missing = [c for c in OHLCV if c.lower() not in cols]
+        if missing:
+            raise ValueError(f"{path}: missing columns {missing}")
+        ts = pd.DatetimeIndex(pd.to_datetime(raw[ts_col]))
+        if ts.tz is None:
+            # Repeated fall-back hour: infer from ordering, else drop the ambiguous rows
+            try:
+                ts = ts.tz_localize(source_tz, ambiguous="infer", nonexistent="shift_forward")
+            except ValueError:
+                ts = ts.tz_localize(source_tz, ambiguous="NaT", nonexistent="shift_forward")
+        frame = pd.DataFrame({c: raw[cols[c.lower()]].to_numpy(dtype=np.float64) for c in OHLCV},
+                             index=ts.tz_convert("UTC"))
+        out.append(frame[frame.index.notna()])
+    return pd.concat(out) if out else pd.DataFrame(columns=OHLCV)
+
+
+def import_bars(paths: Iterable[str], archive_dir: str, symbol: str = "ES=F",
+                source_tz: str = "UTC") -> "BarArchive":
+    """
+    Ingest vendor minute files into archive_dir, merging with any existing archive.
+    Rows are sorted, duplicate timestamps keep the last value, then every column is
+    written as its own .npy together with the CT date → row offset index.
+    """
+    frames = [_read_vendor_file(p, source_tz) for p in paths]
+    if os.path.exists(os.path.join(archive_dir, "meta.json")):
+        frames.insert(0, BarArchive(archive_dir).frame().tz_convert("UTC"))
+    df = pd.concat(frames)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+
+    os.makedirs(archive_dir, exist_ok=True)
+    ts_ns = df.index.as_unit("ns").asi8
+    np.save(os.path.join(archive_dir, "ts.npy"), ts_ns)
+    for col, name in COLUMN_FILES.items():
+        np.save(os.path.join(archive_dir, f"{name}.npy"), df[col].to_numpy(dtype=np.float64))
+
+    local = df.index.tz_convert(CT).tz_localize(None).as_unit("ns").asi8
+    days = local // NS_PER_DAY
+    cuts = np.flatnonzero(np.diff(days)) + 1
+    np.save(os.path.join(archive_dir, "days.npy"), days[np.concatenate(([0], cuts))].astype(np.int32) if len(days) else np.empty(0, np.int32))
+    np.save(os.path.join(archive_dir, "offsets.npy"), np.concatenate(([0], cuts, [len(days)])).astype(np.int64) if len(days) else np.zeros(1, np.int64))
+
+    with open(os.path.join(archive_dir, "meta.json"), "w") as f:
+        json.dump({"version": ARCHIVE_VERSION, "symbol": symbol, "rows": int(len(df)),
+                   "first": str(df.index[0]) if len(df) else None,
+                   "last": str(df.index[-1]) if len(df) else None}, f, indent=2)
+    return BarArchive(archive_dir)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# READ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class BarArchive:
+    """Read-only, memory-mapped view over an imported archive."""
+
+    def __init__(self, archive_dir: str):
+        with open(os.path.join(archive_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version {self.meta.get('version')}")
+        self.path = archive_dir
+        self.symbol = self.meta["symbol"]
+        load = lambda name: np.load(os.path.join(archive_dir, f"{name}.npy"), mmap_mode="r")
+        self.ts = load("ts")
+        self.columns = {col: load(name) for col, name in COLUMN_FILES.items()}
+        self.days = np.asarray(load("days"))           # small: one entry per date
+        self.offsets = np.asarray(load("offsets"))
+
+    def __len__(self) -> int:
+        return int(self.meta["rows"])
+
+    def dates(self) -> list:
+        return [date.fromordinal(EPOCH_ORDINAL + int(d)) for d in self.days]
+
+    def row_range(self, start: date, end: Optional[date] = None) -> Tuple[int, int]:
+        """[start, stop) rows covering CT dates start..end inclusive (binary search on the index)."""
+        end = end or start
+        lo = np.searchsorted(self.days, start.toordinal() - EPOCH_ORDINAL, side="left")
+        hi = np.searchsorted(self.days, end.toordinal() - EPOCH_ORDINAL, side="right")
+        return int(self.offsets[lo]), int(self.offsets[hi])
+
+    def arrays(self, start: date, end: Optional[date] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy memmap slices: {"ts": int64 ns UTC, "Open": ..., "Volume": ...}."""
+        a, b = self.row_range(start, end)
+        out = {"ts": self.ts[a:b]}
+        out.update({col: arr[a:b] for col, arr in self.columns.items()})
+        return out
+
+    def frame(self, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """OHLCV DataFrame in CT for a date range (whole archive if no dates given)."""
+        if start is None:
+            a, b = 0, len(self)
+        else:
+            a, b = self.row_range(start, end)
+        idx = pd.DatetimeIndex(self.ts[a:b].astype("datetime64[ns]")).tz_localize("UTC").tz_convert(CT)
+        return pd.DataFrame({col: np.asarray(arr[a:b]) for col, arr in self.columns.items()}, index=idx)
+
+    def ema_frame(self, start: date, end: Optional[date] = None) -> pd.DataFrame:
+        """1-min frame with EMA_8 / EMA_50 / Spread, ready for the cross logic."""
+        return _prep_1min(self.frame(start, end))
+
+    def anchors(self, start: date, end: date) -> pd.DataFrame:
+        """auto_detect_anchors for every weekday in [start, end] (1m + resampled 30m)."""
+        df_1m = self.frame(start - timedelta(days=7), end)
+        df_30m = df_1m.resample("30min").agg({"Open": "first", "High": "max", "Low": "min",
+                                               "Close": "last", "Volume": "sum"}).dropna(subset=["Close"])
+        return anchor_table(df_1m, df_30m, pd.bdate_range(start, end))
+
+    def crosses(self, start: date, end: date, **kwargs) -> pd.DataFrame:
+        """Vectorized 8/50 cross scan over a date range."""
+        return scan_crosses(self.ema_frame(start, end), **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPX Prophet bar archive")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="ingest vendor CSV/Parquet minute files")
+    imp.add_argument("files", nargs="+")
+    imp.add_argument("archive_dir")
+    imp.add_argument("--symbol", default="ES=F")
+    imp.add_argument("--tz", default="UTC", help="timezone of naive vendor timestamps")
+    info = sub.add_parser("info", help="summarize an archive")
+    info.add_argument("archive_dir")
+    args = parser.parse_args()
+
+    if args.cmd == "import":
+        arc = import_bars(args.files, args.archive_dir, args.symbol, args.tz)
+    else:
+        arc = BarArchive(args.archive_dir)
+    ds = arc.dates()
+    print(f"{arc.symbol}: {len(arc):,} bars, {len(ds)} dates"
+          + (f" ({ds[0]} → {ds[-1]})" if ds else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+SPX Prophet — Bar Normalizer Module
+One normalization stage for every fetched or loaded OHLCV frame: CT index,
+sorted, de-duplicated, reindexed to the instrument's session minute grid
+with an explicit gap-fill policy, and tagged with integer session columns
+(session_date, phase, filled) so consumers slice arrays instead of
+re-deriving dates row by row.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import date
+import pytz
+
+CT = pytz.timezone("America/Chicago")
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+TAG_COLUMNS = ["session_date", "phase", "filled"]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Session grids (CT). GLOBEX: Sun 17:00 → Fri 16:00 with the 16:00-17:00 halt;
+# RTH: cash index hours 8:30-15:00 on weekdays.
+GLOBEX, RTH = "globex", "rth"
+
+# Gap-fill policy for minutes missing from the grid.
+FILL_NONE = "none"   # dedupe / drop off-session / tag only; no rows added
+FILL_FLAT = "flat"   # O=H=L=C=previous close, Volume 0, filled=1
+MAX_GAP_BARS = 5     # longer runs of missing bars (outages, holidays) stay missing
+
+# Phase codes (get_session_mode's buckets).
+PHASES = ("off", "asian", "pre_rth", "rth", "afternoon")
+PHASE_OFF, PHASE_ASIAN, PHASE_PRE_RTH, PHASE_RTH, PHASE_AFTERNOON = range(len(PHASES))
+
+_MIN_NS = 60_000_000_000
+
+
+def session_for(symbol: str) -> str:
+    """Cash indices (^GSPC, ^NDX, ...) trade RTH only; futures trade the Globex grid."""
+    return RTH if symbol.startswith("^") else GLOBEX
+
+
+def session_day(d: date) -> int:
+    """date → the integer stored in the session_date column."""
+    return d.toordinal() - EPOCH_ORDINAL
+
+
+def day_from_int(n: int) -> date:
+    return date.fromordinal(EPOCH_ORDINAL + int(n))
+
+
+def _wall(utc_ns: np.ndarray) -> tuple:
+    """UTC ns → (CT calendar day since epoch, CT minute of day, weekday Mon=0)."""
+    wall_min = pd.DatetimeIndex(utc_ns).tz_localize("UTC").tz_convert(CT).tz_localize(None).asi8 // _MIN_NS
+    day, mod = np.divmod(wall_min, 1440)
+    return day, mod, (day + 3) % 7          # 1970-01-01 was a Thursday
+
+
+def in_session(day: np.ndarray, mod: np.ndarray, wd: np.ndarray, session: str = GLOBEX) -> np.ndarray:
+    if session == RTH:
+        return (wd < 5) & (mod >= 510) & (mod < 900)
+    halt = (wd == 5) | ((wd == 6) & (mod < 1020)) | ((wd == 4) & (mod >= 960)) | ((wd < 4) & (mod >= 960) & (mod < 1020))
+    return ~halt
+
+
+def phase_codes(mod: np.ndarray) -> np.ndarray:
+    """Vectorized get_session_mode: minute of day → PHASES index."""
+    return np.select(
+        [(mod >= 1020) & (mod < 1260), (mod >= 300) & (mod < 510), (mod >= 510) & (mod < 780), (mod >= 780) & (mod < 900)],
+        [PHASE_ASIAN, PHASE_PRE_RTH, PHASE_RTH, PHASE_AFTERNOON], PHASE_OFF).astype(np.int8)
+
+
+def phase_code(mod: int) -> int:
+    """phase_codes for one bar (no arrays), for per-bar appends."""
+    if 1020 <= mod < 1260:
+        return PHASE_ASIAN
+    if 300 <= mod < 510:
+        return PHASE_PRE_RTH
+    if 510 <= mod < 780:
+        return PHASE_RTH
+    if 780 <= mod < 900:
+        return PHASE_AFTERNOON
+    return PHASE_OFF
+
+
+def session_date(day: int, mod: int, session: str = GLOBEX) -> int:
+    """session_dates for one bar (no arrays), for per-bar appends."""
+    if session == RTH:
+        return day
+    d = day + (mod >= 1020)
+    dwd = (d + 3) % 7
+    return d + (2 if dwd == 5 else 1 if dwd == 6 else 0)
+
+
+def session_dates(day: np.ndarray, mod: np.ndarray, wd: np.ndarray, session: str = GLOBEX) -> np.ndarray:
+    """Trading date each bar belongs to: Globex bars from 17:00 count toward the next weekday."""
+    if session == RTH:
+        return day.astype(np.int32)
+    d = day + (mod >= 1020)
+    dwd = (d + 3) % 7
+    d = d + np.where(dwd == 5, 2, np.where(dwd == 6, 1, 0))
+    return d.astype(np.int32)
+
+
+def _short_runs(missing: np.ndarray, max_run: int) -> np.ndarray:
+    """True on missing points that belong to a run of at most max_run consecutive missing points."""
+    if not missing.any():
+        return missing
+    edges = np.diff(np.r_[0, missing.astype(np.int8), 0])
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    run_len = np.repeat(ends - starts, ends - starts)      # each missing point's run length, in order
+    keep = np.zeros(len(missing), dtype=bool)
+    keep[missing] = run_len <= max_run
+    return keep
+
+
+def normalize_bars(df: pd.DataFrame, session: str = GLOBEX, interval_minutes: int = 1,
+                   fill: str = FILL_FLAT, max_gap: int = MAX_GAP_BARS) -> pd.DataFrame:
+    """
+    Clean one OHLCV frame:
+      1. drop NaN closes, index to CT, stable sort, keep the LAST copy of a duplicated
+         timestamp (the vendor's latest revision of that bar)
+      2. drop bars outside the session grid (halt / weekend prints)
+      3. FILL_FLAT: add flat bars for missing grid points in runs of ≤ max_gap bars
+      4. tag session_date (int days since epoch), phase (PHASES code), filled (0/1)
+    Returns OHLCV + TAG_COLUMNS (extra vendor columns are dropped).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV + TAG_COLUMNS)
+    df = df.dropna(subset=["Close"])
+    if df.empty:
+        return pd.DataFrame(columns=OHLCV + TAG_COLUMNS)
+    idx = df.index.tz_convert(CT) if df.index.tz is not None else df.index.tz_localize(CT)
+    utc = idx.as_unit("ns").asi8
+    order = np.argsort(utc, kind="stable")
+    utc = utc[order]
+    keep = np.r_[utc[1:] != utc[:-1], True]               # last of each duplicate run
+    rows = order[keep]
+    utc = utc[keep]
+    cols = {c: df[c].to_numpy(dtype=np.float64)[rows] if c in df.columns else np.zeros(len(rows)) for c in OHLCV}
+
+    day, mod, wd = _wall(utc)
+    on = in_session(day, mod, wd, session)
+    utc = utc[on]
+    cols = {c: v[on] for c, v in cols.items()}
+    filled = (df["filled"].to_numpy(dtype=np.int8)[rows][on] if "filled" in df.columns
+              else np.zeros(len(utc), dtype=np.int8))
+
+    if fill == FILL_FLAT and len(utc) > 1:
+        step = interval_minutes * _MIN_NS
+        grid = np.arange(utc[0], utc[-1] + 1, step, dtype=np.int64)
+        gday, gmod, gwd = _wall(grid)
+        pos = np.searchsorted(utc, grid)
+        present = (pos < len(utc)) & (utc[np.minimum(pos, len(utc) - 1)] == grid)
+        sess = in_session(gday, gmod, gwd, session)
+        # runs are counted along the session grid, so a halt or weekend doesn't split or extend a gap
+        g = grid[sess]
+        missing = ~present[sess]
+        add = g[_short_runs(missing, max_gap)]
+        if len(add):
+            prev = np.searchsorted(utc, add, side="right") - 1
+            close = cols["Close"][prev]
+            utc = np.concatenate([utc, add])
+            order = np.argsort(utc, kind="stable")
+            utc = utc[order]
+            for c in ("Open", "High", "Low", "Close"):
+                cols[c] = np.concatenate([cols[c], close])[order]
+            cols["Volume"] = np.concatenate([cols["Volume"], np.zeros(len(add))])[order]
+            filled = np.concatenate([filled, np.ones(len(add), dtype=np.int8)])[order]
+
+    day, mod, wd = _wall(utc)
+    out = pd.DataFrame(cols, index=pd.DatetimeIndex(utc).tz_localize("UTC").tz_convert(CT), columns=OHLCV)
+    out["session_date"] = session_dates(day, mod, wd, session)
+    out["phase"] = phase_codes(mod)
+    out["filled"] = filled
+    return out
+
+
+def partition_sessions(df: pd.DataFrame) -> dict:
+    """{trading date: (start, stop)} row ranges from the session_date column (one np.diff)."""
+    if df.empty:
+        return {}
+    days = df["session_date"].to_numpy()
+    cuts = np.flatnonzero(np.diff(days)) + 1
+    starts = np.r_[0, cuts]
+    stops = np.r_[cuts, len(days)]
+    return {day_from_int(days[a]): (int(a), int(b)) for a, b in zip(starts, stops)}
@@ -0,0 +1,150 @@
+"""
+SPX Prophet — Bar Store Module
+Preallocated ring buffer for live 1-min bars with incremental EMA columns.
+Every slot is written twice (i and i + capacity) so the last K bars are
+always one contiguous, zero-copy slice. The bar_normalizer tag columns
+(session_date, phase, filled) ride along, so to_frame() is a normalized frame.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+import pytz
+
+from bar_normalizer import TAG_COLUMNS, GLOBEX, _wall, session_dates, phase_codes, session_date, phase_code
+
+CT = pytz.timezone("America/Chicago")
+BARS_PER_SESSION = 1380          # 23h Globex session
+COLUMNS = ("Open", "High", "Low", "Close", "Volume", "EMA_8", "EMA_50", "Spread", *TAG_COLUMNS)
+_O, _H, _L, _C, _V, _E8, _E50, _SP, _SD, _PH, _FL = range(len(COLUMNS))
+TAG_DTYPES = {"session_date": np.int32, "phase": np.int8, "filled": np.int8}   # normalize_bars' dtypes
+A8, A50 = 2.0 / 9.0, 2.0 / 51.0
+_MIN_NS = 60_000_000_000
+_HOUR_NS = 60 * _MIN_NS
+
+
+def bar_tags(ts_ns: np.ndarray, session: str = GLOBEX) -> tuple:
+    """(session_date, phase, filled) for bars that arrive untagged; none of them is a fill."""
+    day, mod, wd = _wall(ts_ns)
+    return session_dates(day, mod, wd, session), phase_codes(mod), np.zeros(len(ts_ns), dtype=np.int8)
+
+
+def frame_from_arrays(ts: np.ndarray, data: np.ndarray) -> pd.DataFrame:
+    """CT-indexed COLUMNS frame over (columns × n) values, tag columns back in normalize_bars' int dtypes."""
+    idx = pd.DatetimeIndex(ts.astype("datetime64[ns]")).tz_localize("UTC").tz_convert(CT)
+    return pd.DataFrame(data.T, index=idx, columns=list(COLUMNS), copy=False).astype(TAG_DTYPES)
+
+
+class RingBarStore:
+    """
+    Fixed-capacity OHLCV + indicator store. append() is O(1) and never allocates;
+    memory is capacity × columns × 2 regardless of how long the server runs.
+    A bar with the same timestamp as the newest one replaces it (the forming bar).
+    ts / data may be preallocated (2 × capacity) arrays, e.g. views on a shared-memory segment.
+    """
+
+    def __init__(self, sessions: int = 2, bars_per_session: int = BARS_PER_SESSION, dtype=np.float64,
+                 ts: Optional[np.ndarray] = None, data: Optional[np.ndarray] = None):
+        self.capacity = sessions * bars_per_session
+        self._ts = np.zeros(2 * self.capacity, dtype=np.int64) if ts is None else ts
+        self._data = np.zeros((len(COLUMNS), 2 * self.capacity), dtype=dtype) if data is None else data
+        self._head = 0        # next write slot in [0, capacity)
+        self._size = 0
+        self._utc_hour = None   # UTC hour whose CT offset is cached (DST only changes on the hour)
+        self._ct_offset = 0
+        self.col_index = {c: i for i, c in enumerate(COLUMNS)}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self._ts[self._head - 1 + self.capacity]) if self._size else None
+
+    def _write(self, slot: int, ts_ns: int, o: float, h: float, l: float, c: float, v: float,
+               tags: tuple, prev_slot: Optional[int]) -> None:
+        if prev_slot is None:
+            e8 = e50 = c
+        else:
+            e8 = self._data[_E8, prev_slot] + A8 * (c - self._data[_E8, prev_slot])
+            e50 = self._data[_E50, prev_slot] + A50 * (c - self._data[_E50, prev_slot])
+        for s in (slot, slot + self.capacity):
+            self._ts[s] = ts_ns
+            self._data[:, s] = (o, h, l, c, v, e8, e50, e8 - e50, *tags)
+
+    def append(self, ts_ns: int, o: float, h: float, l: float, c: float, v: float = 0.0,
+               tags: Optional[tuple] = None) -> None:
+        """
+        Add a closed (or forming) bar; EMA_8 / EMA_50 / Spread follow ewm(adjust=False).
+        tags is (session_date, phase, filled) as normalize_bars writes them; derived from ts_ns when omitted.
+        """
+        cap = self.capacity
+        if self._size and ts_ns < self.last_ts:
+            return
+        if tags is None:
+            tags = self._tags(ts_ns)
+        if self._size and ts_ns == self.last_ts:
+            slot = (self._head - 1) % cap
+            prev = (slot - 1) % cap if self._size > 1 else None
+            self._write(slot, ts_ns, o, h, l, c, v, tags, prev)
+            return
+        prev = (self._head - 1) % cap if self._size else None
+        self._write(self._head, ts_ns, o, h, l, c, v, tags, prev)
+        self._head = (self._head + 1) % cap
+        self._size = min(self._size + 1, cap)
+
+    def _tags(self, ts_ns: int) -> tuple:
+        """bar_tags for one bar with scalar arithmetic; the CT offset is looked up once per UTC hour."""
+        hour = ts_ns // _HOUR_NS
+        if hour != self._utc_hour:
+            utc = datetime.fromtimestamp(hour * 3600, timezone.utc)
+            self._utc_hour, self._ct_offset = hour, int(utc.astimezone(CT).utcoffset().total_seconds()) * 1_000_000_000
+        day, mod = divmod((ts_ns + self._ct_offset) // _MIN_NS, 1440)
+        return session_date(day, mod), phase_code(mod), 0
+
+    def extend_frame(self, df: pd.DataFrame) -> int:
+        """
+        Append rows of a fetched OHLCV frame that are not older than the newest stored bar.
+        A normalize_bars frame keeps its tags; an untagged one is tagged on the Globex grid.
+        """
+        if df.empty:
+            return 0
+        ts = df.index.as_unit("ns").asi8
+        start = 0 if not self._size else int(np.searchsorted(ts, self.last_ts, side="left"))
+        o, h, l, c, v = (df[k].to_numpy(dtype=np.float64) for k in ("Open", "High", "Low", "Close", "Volume"))
+        if all(k in df.columns for k in TAG_COLUMNS):
+            sd, ph, fl = (df[k].to_numpy() for k in TAG_COLUMNS)
+        else:
+            sd, ph, fl = bar_tags(ts)
+        for i in range(start, len(ts)):
+            self.append(int(ts[i]), o[i], h[i], l[i], c[i], v[i], (int(sd[i]), int(ph[i]), int(fl[i])))
+        return len(ts) - start
+
+    # ─── zero-copy reads ───
+
+    def _window(self, k: Optional[int]) -> slice:
+        k = self._size if k is None else min(k, self._size)
+        end = self._head + self.capacity
+        return slice(end - k, end)
+
+    def view(self, k: Optional[int] = None) -> np.ndarray:
+        """(columns × k) contiguous view of the last k bars, oldest first."""
+        return self._data[:, self._window(k)]
+
+    def column(self, name: str, k: Optional[int] = None) -> np.ndarray:
+        return self._data[self.col_index[name], self._window(k)]
+
+    def timestamps(self, k: Optional[int] = None) -> np.ndarray:
+        return self._ts[self._window(k)]
+
+    def arrays(self, k: Optional[int] = None, names: Sequence[str] = COLUMNS) -> Dict[str, np.ndarray]:
+        w = self._window(k)
+        out = {"ts": self._ts[w]}
+        out.update({n: self._data[self.col_index[n], w] for n in names})
+        return out
+
+    def to_frame(self, k: Optional[int] = None) -> pd.DataFrame:
+        """DataFrame over the last k bars in CT with the normalizer tags (what the UI and batch helpers expect)."""
+        w = self._window(k)
+        return frame_from_arrays(self._ts[w], self._data[:, w])
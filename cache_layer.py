@@ -0,0 +1,182 @@
+"""
+SPX Prophet — Cache Layer Module
+Process-wide memoization for the data fetchers, in place of st.cache_data:
+each function gets a TTL, a max entry count and a byte budget with LRU
+eviction, belongs to a named group ("live", "afternoon", "history") that can
+be invalidated on its own, and keeps hit / miss / eviction counters. Values
+are stored pickled (as st.cache_data does), so callers always get a private
+copy and the byte accounting is exact.
+"""
+
+import inspect
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+LIVE, AFTERNOON, HISTORY = "live", "afternoon", "history"
+MB = 1 << 20
+
+
+@dataclass
+class CacheStats:
+    function: str
+    group: str
+    ttl: float
+    entries: int
+    max_entries: int
+    bytes: int
+    max_bytes: int
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0       # LRU, over max_entries or max_bytes
+    expirations: int = 0     # past ttl on lookup
+    oversize: int = 0        # results bigger than max_bytes (returned, never stored)
+    invalidations: int = 0   # entries dropped by clear() / invalidate()
+
+    @property
+    def hit_rate(self) -> float:
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+
+class BoundedCache:
+    """
+    One function's cache. Keys are the bound call arguments with defaults filled
+    in (so f("ES=F") and f(symbol="ES=F") share an entry; they must be hashable);
+    a miss computes under a per-key lock so concurrent sessions asking for the
+    same cold key share one fetch instead of each hitting the network.
+    """
+
+    def __init__(self, fn: Callable, group: str, ttl: float, max_entries: int, max_bytes: int):
+        self.fn = fn
+        self._sig = inspect.signature(fn)
+        self.name = fn.__name__
+        self.group = group
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()   # key → (expires, blob)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[tuple, threading.Lock] = {}
+        self._stats = CacheStats(self.name, group, ttl, 0, max_entries, 0, max_bytes)
+
+    def _lookup(self, key: tuple, now: float) -> Optional[bytes]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            expires, blob = hit
+            if now >= expires:
+                self._drop(key)
+                self._stats.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return blob
+
+    def _drop(self, key: tuple) -> None:
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def _store(self, key: tuple, blob: bytes, now: float) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if len(blob) > self.max_bytes:
+                self._stats.oversize += 1
+                return
+            self._entries[key] = (now + self.ttl, blob)
+            self._bytes += len(blob)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def __call__(self, *args, **kwargs):
+        bound = self._sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.values())
+        blob = self._lookup(key, time.monotonic())
+        if blob is not None:
+            return pickle.loads(blob)
+        with self._lock:
+            gate = self._inflight.setdefault(key, threading.Lock())
+        with gate:
+            blob = self._lookup(key, time.monotonic())       # filled while we waited
+            if blob is not None:
+                return pickle.loads(blob)
+            with self._lock:
+                self._stats.misses += 1
+            try:
+                value = self.fn(*args, **kwargs)
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                self._store(key, blob, time.monotonic())
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return pickle.loads(blob)
+
+    def clear(self) -> int:
+        with self._lock:
+            n = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self._stats.invalidations += n
+        return n
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            s = CacheStats(**vars(self._stats))
+            s.entries, s.bytes = len(self._entries), self._bytes
+        return s
+
+
+_REGISTRY: Dict[str, BoundedCache] = {}
+
+
+def bounded_cache(group: str, ttl: float, max_entries: int, max_bytes: int) -> Callable:
+    """
+    Decorator: @bounded_cache(LIVE, ttl=30, max_entries=16, max_bytes=32 * MB).
+    The wrapper keeps the function's name and docstring and gains .clear() / .stats().
+    """
+    def wrap(fn: Callable) -> Callable:
+        cache = BoundedCache(fn, group, ttl, max_entries, max_bytes)
+        _REGISTRY[cache.name] = cache
+
+        @wraps(fn)
+        def cached(*args, **kwargs):
+            return cache(*args, **kwargs)
+        cached.clear = cache.clear
+        cached.stats = cache.stats
+        cached.cache = cache
+        return cached
+    return wrap
+
+
+def invalidate(*groups: str) -> int:
+    """Drop every entry in the given groups (all groups when none given). Returns the entries dropped."""
+    return sum(c.clear() for c in _REGISTRY.values() if not groups or c.group in groups)
+
+
+def cache_stats() -> List[CacheStats]:
+    return [c.stats() for c in _REGISTRY.values()]
+
+
+def stats_frame() -> pd.DataFrame:
+    """One row per cached function, for st.dataframe."""
+    rows = [{"function": s.function, "group": s.group, "entries": f"{s.entries}/{s.max_entries}",
+             "MB": round(s.bytes / MB, 2), "budget MB": round(s.max_bytes / MB, 1),
+             "hits": s.hits, "misses": s.misses, "hit %": round(100 * s.hit_rate, 1),
+             "evicted": s.evictions, "expired": s.expirations, "oversize": s.oversize}
+            for s in cache_stats()]
+    return pd.DataFrame(rows)
+
+
+def total_bytes() -> int:
+    return sum(s.bytes for s in cache_stats())
@@ -6,13 +6,21 @@ Projects lines at ±0.52 per 30-minute block.
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta, time as dtime, date
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Dict, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
 import pytz
 
 CT = pytz.timezone("America/Chicago")
 SLOPE = 0.52  # Points per 30-minute block
+SCALES = (30, 15, 5, 1)                          # candidate timeframes in minutes, coarsest first
+DEFAULT_SCALES = (30, 1)                         # auto_detect_anchors' chain: 30m swings, else 1m
+SCALE_LOOKBACK = {30: 1, 15: 1, 5: 2, 1: 5}      # bars either side that make a swing
+ANCHOR_WINDOW = (dtime(12, 0), dtime(15, 0))
+ROLE_LABELS = {"lb": "Lowest Bounce", "hr": "Highest Rejection", "hw": "Highest Wick", "lw": "Lowest Wick"}
+CANDIDATE_COLUMNS = ["price", "timestamp", "detected_at", "scale", "scales", "scale_score", "agreement"]
 
 
 @dataclass
@@ -32,6 +40,9 @@ class ProjectedLine:
         blocks = count_blocks(self.anchor.timestamp, target_time)
         return self.anchor.price + (self.slope * blocks)
 
+    def values_at(self, times) -> np.ndarray:
+        return self.anchor.price + self.slope * count_blocks_array(self.anchor.timestamp, times)
+
 
 @dataclass
 class Channel:
@@ -95,6 +106,60 @@ def count_blocks(t0: datetime, t1: datetime) -> float:
     return blocks
 
 
+def count_blocks_array(t0: datetime, times) -> np.ndarray:
+    """
+    Vectorized count_blocks(t0, t) for every t in times, same block walk.
+    Forward: block starts t0 + 30k are laid out once; a cumulative sum of the
+    non-skip mask gives full blocks, plus the partial last block if its start is live.
+    Backward (t < t0) walks start at each t, so those use a (times x blocks) grid.
+    """
+    if t0.tzinfo is None:
+        t0 = CT.localize(t0)
+    times = pd.DatetimeIndex(times)
+    if times.tz is None:
+        times = times.tz_localize(CT)
+    out = np.zeros(len(times), dtype=np.float64)
+    if len(times) == 0:
+        return out
+
+    block_ns = 30 * 60 * 1_000_000_000
+    t0_ns = pd.Timestamp(t0).as_unit("ns").value
+    t_ns = times.as_unit("ns").asi8
+    elapsed = t_ns - t0_ns
+    fwd = elapsed >= 0
+
+    if fwd.any():
+        full = elapsed[fwd] // block_ns
+        rem_min = (elapsed[fwd] - full * block_ns) / 60e9
+        live = ~_skip_mask(t0_ns + np.arange(int(full.max()) + 1, dtype=np.int64) * block_ns)
+        cum = np.concatenate(([0.0], np.cumsum(live, dtype=np.float64)))
+        out[fwd] = cum[full] + np.where(live[full], rem_min / 30.0, 0.0)
+
+    back = np.flatnonzero(~fwd)
+    if back.size:
+        span = -elapsed[back]
+        full = span // block_ns
+        rem_min = (span - full * block_ns) / 60e9
+        k = np.arange(int(full.max()) + 1, dtype=np.int64)
+        if back.size * k.size <= 4_000_000:
+            live = ~_skip_mask((t_ns[back][:, None] + k[None, :] * block_ns).ravel()).reshape(back.size, k.size)
+            whole = (live & (k[None, :] < full[:, None])).sum(axis=1).astype(np.float64)
+            part = np.where(live[np.arange(back.size), full], rem_min / 30.0, 0.0)
+            out[back] = -(whole + part)
+        else:
+            for i in back:
+                out[i] = count_blocks(t0, times[i].to_pydatetime())
+    return out
+
+
+def _skip_mask(ts_ns: np.ndarray) -> np.ndarray:
+    """Vectorized _is_skip_time over UTC epoch nanoseconds."""
+    ts = pd.DatetimeIndex(ts_ns).tz_localize("UTC").tz_convert(CT)
+    wd = np.asarray(ts.weekday)
+    h = np.asarray(ts.hour)
+    return (wd == 5) | ((wd == 6) & (h < 17)) | ((wd == 4) & (h >= 16)) | ((wd < 4) & (h == 16))
+
+
 def _is_skip_time(dt: datetime) -> bool:
     """Check if timestamp is in maintenance or weekend gap."""
     dt = dt.astimezone(CT)
@@ -147,27 +212,275 @@ def find_extreme_wicks(df: pd.DataFrame) -> Tuple[AnchorPoint, AnchorPoint]:
     return highest, lowest
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# MULTI-TIMEFRAME ANCHOR CANDIDATES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_ROLE_SPEC = {"lb": ("Close", 1.0), "hr": ("Close", -1.0), "hw": ("High", -1.0), "lw": ("Low", 1.0)}  # column, sign (+1: lower wins)
+
+
+def _swing_mask(x: np.ndarray, lookback: int, lowest: bool) -> np.ndarray:
+    """find_bounces_and_rejections' test for every bar at once (ties count as swings)."""
+    n = len(x)
+    mask = np.zeros(n, dtype=bool)
+    if n < lookback * 2 + 1:
+        return mask
+    win = sliding_window_view(x, lookback)
+    ext = win.min(axis=1) if lowest else win.max(axis=1)
+    i = np.arange(lookback, n - lookback)
+    before, after = ext[i - lookback], ext[i + 1]
+    mask[i] = (x[i] <= before) & (x[i] <= after) if lowest else (x[i] >= before) & (x[i] >= after)
+    return mask
+
+
+_MIN_NS = 60_000_000_000
+
+
+def _bucket_ohlc(t: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, minutes: int) -> tuple:
+    """Resample wall-clock ns bars to `minutes` buckets (H max, L min, C last); empty buckets are skipped."""
+    b = t // (minutes * _MIN_NS)
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    ends = np.r_[starts[1:], len(t)] - 1
+    return b[starts] * minutes * _MIN_NS, np.maximum.reduceat(high, starts), np.minimum.reduceat(low, starts), close[ends]
+
+
+class _Pick(NamedTuple):
+    price: float
+    timestamp: pd.Timestamp     # anchor time shown / projected from
+    detected_at: pd.Timestamp   # start of the bar that made the swing
+    minutes: int
+
+
+def _wall_ns(df: pd.DataFrame) -> np.ndarray:
+    idx = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    return idx.as_unit("ns").asi8
+
+
+def _default_picks(df_1min: pd.DataFrame, df_30min: pd.DataFrame, window=ANCHOR_WINDOW) -> Optional[Dict[str, _Pick]]:
+    """
+    The default anchors: 30m swings (lookback 1) when the window holds both a bounce
+    and a rejection, else 1m swings (lookback 5) with times rounded to the nearest
+    30 min; lowest bounce / highest rejection, earliest on ties. The 30m bars are
+    df_30min when given, else df_1min bucketed. Wicks are the window extremes,
+    stamped with their 30m bar. None without a bounce and rejection.
+    """
+    base = df_1min if not df_1min.empty else df_30min
+    if base.empty:
+        return None
+    tz = base.index.tz
+    lo = window[0].hour * 60 + window[0].minute
+    hi = window[1].hour * 60 + window[1].minute
+    half, slot = 15 * _MIN_NS, 30 * _MIN_NS
+
+    def stamp(ns):
+        return pd.Timestamp(int(ns)).tz_localize(tz)
+
+    if not df_1min.empty and df_30min.empty and len(df_1min) > 1 and np.diff(_wall_ns(df_1min)).min() >= slot:
+        df_1min, df_30min = df_30min, df_1min   # a 30-min frame passed as the only frame
+    chain = []
+    if not df_30min.empty:
+        chain.append((30, _wall_ns(df_30min), df_30min["Close"].to_numpy(dtype=np.float64)))
+    if not df_1min.empty:
+        t = _wall_ns(df_1min)
+        c = df_1min["Close"].to_numpy(dtype=np.float64)
+        if df_30min.empty:
+            b = t // slot
+            starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+            chain.append((30, b[starts] * slot, c[np.r_[starts[1:], len(t)] - 1]))
+        chain.append((1, t, c))
+
+    for m, t, c in chain:   # DEFAULT_SCALES, coarsest first
+        nearest = t if m >= 30 else (t + half) // slot * slot
+        tod = (nearest // _MIN_NS) % 1440
+        ok = (tod >= lo) & (tod < hi)
+        lookback = SCALE_LOOKBACK[m]
+        lows = np.flatnonzero(_swing_mask(c, lookback, lowest=True) & ok)
+        highs = np.flatnonzero(_swing_mask(c, lookback, lowest=False) & ok)
+        if len(lows) and len(highs):
+            i, j = lows[np.argmin(c[lows])], highs[np.argmax(c[highs])]
+            out = {"lb": _Pick(float(c[i]), stamp(nearest[i]), stamp(t[i]), m),
+                   "hr": _Pick(float(c[j]), stamp(nearest[j]), stamp(t[j]), m)}
+            break
+    else:
+        return None
+
+    src = df_30min if not df_30min.empty else df_1min
+    t = _wall_ns(src)
+    tod = (t // _MIN_NS) % 1440
+    in_win = np.flatnonzero((tod >= lo) & (tod < hi))
+    if not len(in_win):
+        in_win = np.arange(len(t))
+    for role, col, pick in (("hw", "High", np.argmax), ("lw", "Low", np.argmin)):
+        x = src[col].to_numpy(dtype=np.float64)
+        i = in_win[pick(x[in_win])]
+        out[role] = _Pick(float(x[i]), stamp(t[i] // slot * slot), stamp(t[i]), 30)
+    return out
+
+
+def rank_anchor_candidates(df: pd.DataFrame, df_30min: Optional[pd.DataFrame] = None,
+                           scales=SCALES, window=ANCHOR_WINDOW) -> Dict[str, pd.DataFrame]:
+    """
+    Ranked anchor candidates per role ("lb", "hr", "hw", "lw") from one intraday frame.
+    Row 0 is always auto_detect_anchors' pick (the 30m → 1m chain, using df_30min
+    for the 30m scale when given); the rows after it are alternatives.
+    The frame is bucketed to every scale at or above its own bar size; swings
+    (Close for bounces/rejections, High/Low for wicks) are found on the full frame
+    and kept when they fall in the 12:00-2:59 PM window. Candidates from different
+    scales that land in the same 30-min slot merge into one row:
+      price / scale   value at the coarsest scale that saw it
+      timestamp       the 30-min slot (bounces round to nearest, wicks to the containing bar)
+      detected_at     bar start at the finest scale that saw it
+      scale_score     coarsest scale that saw it / coarsest scale scanned
+      agreement       fraction of scanned scales that saw it
+    Alternative bounces/rejections rank coarsest scale first, then price; wicks rank
+    by price. Without a default bounce and rejection every table is empty, as
+    auto_detect_anchors then returns None.
+    """
+    empty = {role: pd.DataFrame(columns=CANDIDATE_COLUMNS) for role in _ROLE_SPEC}
+    if df.empty and df_30min is not None:
+        df, df_30min = df_30min, None
+    if df.empty:
+        return empty
+    default = _default_picks(df, df_30min if df_30min is not None else pd.DataFrame(), window)
+    if default is None:
+        return empty
+    tz = df.index.tz
+    loc = (df.index.tz_localize(None) if tz is not None else df.index).as_unit("ns").asi8
+    step = int(np.diff(loc).min()) if len(loc) > 1 else _MIN_NS
+    base = max(1, int(round(step / _MIN_NS)))
+    used = sorted((m for m in scales if m >= base), reverse=True) or [base]
+    lo = window[0].hour * 60 + window[0].minute
+    hi = window[1].hour * 60 + window[1].minute
+    half, slot = 15 * _MIN_NS, 30 * _MIN_NS
+    src = {c: df[c].to_numpy(dtype=np.float64) for c in ("High", "Low", "Close")}
+
+    cols = {k: [] for k in ("role", "slot", "price", "detected", "minutes")}
+    for m in used:
+        if m == base:
+            t, h, l, c = loc, src["High"], src["Low"], src["Close"]
+        else:
+            t, h, l, c = _bucket_ohlc(loc, src["High"], src["Low"], src["Close"], m)
+        tod = (t // _MIN_NS) % 1440
+        in_bar = (tod >= lo) & (tod < hi)
+        nearest = t if m >= 30 else (t + half) // slot * slot
+        near_tod = (nearest // _MIN_NS) % 1440
+        in_near = (near_tod >= lo) & (near_tod < hi)
+        series = {"Close": c, "High": h, "Low": l}
+        for r, (role, (col, sign)) in enumerate(_ROLE_SPEC.items()):
+            x = series[col]
+            mask = _swing_mask(x, SCALE_LOOKBACK.get(m, 1), lowest=sign > 0)
+            if role in ("hw", "lw"):
+                mask &= in_bar
+                if in_bar.any():
+                    mask[np.flatnonzero(in_bar)[np.argmin(sign * x[in_bar])]] = True
+                slots = t // slot * slot
+            else:
+                mask &= in_near
+                slots = nearest
+            n = int(mask.sum())
+            cols["role"].append(np.full(n, r))
+            cols["slot"].append(slots[mask])
+            cols["price"].append(x[mask])
+            cols["detected"].append(t[mask])
+            cols["minutes"].append(np.full(n, m))
+    role, slots, price, detected, minutes = (np.concatenate(cols[k]) for k in ("role", "slot", "price", "detected", "minutes"))
+    sign = np.array([s for _, s in _ROLE_SPEC.values()])[role]
+    key = sign * price
+
+    # one row per (role, slot): coarsest scale's most extreme swing, finest scale's bar time
+    order = np.lexsort((detected, key, -minutes, slots, role))
+    new_grp = np.r_[True, (role[order][1:] != role[order][:-1]) | (slots[order][1:] != slots[order][:-1])]
+    gid = np.cumsum(new_grp) - 1
+    first = order[new_grp]
+    new_scale = new_grp | np.r_[True, minutes[order][1:] != minutes[order][:-1]]
+    n_scales = np.bincount(gid, weights=new_scale)
+    fine = np.lexsort((detected, key, minutes, slots, role))
+    fine_first = fine[np.r_[True, (role[fine][1:] != role[fine][:-1]) | (slots[fine][1:] != slots[fine][:-1])]]
+    g_role, g_key, g_min, g_slot = role[first], key[first], minutes[first], slots[first]
+    g_det = detected[fine_first]
+    bounds = np.r_[np.flatnonzero(new_grp), len(order)]
+    sorted_min = minutes[order]
+
+    def stamp(ns):
+        return pd.DatetimeIndex(ns.astype("datetime64[ns]")).tz_localize(tz)
+
+    def scales_in(g):
+        return np.unique(sorted_min[bounds[g]:bounds[g + 1]])[::-1]
+
+    out = {}
+    for r, role_key in enumerate(_ROLE_SPEC):
+        idx = np.flatnonzero(g_role == r)
+        if role_key in ("hw", "lw"):
+            idx = idx[np.lexsort((g_slot[idx], -n_scales[idx], g_key[idx]))]
+        else:
+            idx = idx[np.lexsort((g_slot[idx], g_key[idx], -g_min[idx]))]
+        alt = pd.DataFrame({
+            "price": price[first][idx],
+            "timestamp": stamp(g_slot[idx]),
+            "detected_at": stamp(g_det[idx]),
+            "scale": [f"{v}m" for v in g_min[idx]],
+            "scales": ["/".join(f"{v}m" for v in scales_in(g)) for g in idx],
+            "scale_score": g_min[idx] / used[0],
+            "agreement": n_scales[idx] / len(used),
+        }, columns=CANDIDATE_COLUMNS)
+        # row 0: the default pick, with the scales that saw a swing in its 30-min slot
+        pick = default[role_key]
+        slot_ns = pd.Timestamp(pick.timestamp).tz_localize(None).floor("30min").as_unit("ns").value
+        slot_ts = stamp(np.array([slot_ns]))[0]
+        same = idx[g_slot[idx] == slot_ns]
+        seen = sorted(set(scales_in(same[0])) | {pick.minutes}, reverse=True) if len(same) else [pick.minutes]
+        top = pd.DataFrame({
+            "price": [pick.price], "timestamp": [pick.timestamp], "detected_at": [pick.detected_at],
+            "scale": [f"{pick.minutes}m"], "scales": ["/".join(f"{v}m" for v in seen)],
+            "scale_score": [min(pick.minutes / used[0], 1.0)], "agreement": [min(len(seen), len(used)) / len(used)],
+        }, columns=CANDIDATE_COLUMNS)
+        alt = alt[~((alt["price"] == pick.price) & (alt["timestamp"] == slot_ts))]
+        out[role_key] = pd.concat([top, alt], ignore_index=True)
+    return out
+
+
+def select_anchors(candidates: Dict[str, pd.DataFrame], picks: Optional[Dict[str, int]] = None,
+                   fallback: Optional[pd.DataFrame] = None) -> dict:
+    """
+    AnchorPoints from a rank_anchor_candidates table: row picks[role] per role (default 0).
+    Wick roles with no candidate in the window fall back to the extremes of `fallback`.
+    """
+    picks = picks or {}
+    out = {}
+    for role, table in candidates.items():
+        if table.empty:
+            continue
+        row = table.iloc[min(picks.get(role, 0), len(table) - 1)]
+        out[role] = AnchorPoint(float(row["price"]), row["timestamp"], ROLE_LABELS[role])
+    if ("hw" not in out or "lw" not in out) and fallback is not None and not fallback.empty:
+        hw, lw = find_extreme_wicks(fallback)
+        out.setdefault("hw", hw)
+        out.setdefault("lw", lw)
+    return out
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CHANNEL BUILDING
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def build_channels(lb: AnchorPoint, hr: AnchorPoint, hw: AnchorPoint, lw: AnchorPoint) -> ChannelSystem:
+def build_channels(lb: AnchorPoint, hr: AnchorPoint, hw: AnchorPoint, lw: AnchorPoint, slope: float = SLOPE) -> ChannelSystem:
     """
     Build channel system from 4 anchor points.
     Ascending: floor from LB (+0.52), ceiling from HR (+0.52), extreme from HW (+0.52)
     Descending: ceiling from HR (-0.52), floor from LB (-0.52), extreme from LW (-0.52)
+    `slope` defaults to the ES value; other instruments pass their own.
     """
     ascending = Channel(
-        floor=ProjectedLine(lb, "ascending", SLOPE),
-        ceiling=ProjectedLine(hr, "ascending", SLOPE),
+        floor=ProjectedLine(lb, "ascending", slope),
+        ceiling=ProjectedLine(hr, "ascending", slope),
         channel_type="ascending",
-        extreme_line=ProjectedLine(hw, "ascending", SLOPE)
+        extreme_line=ProjectedLine(hw, "ascending", slope)
     )
     descending = Channel(
-        ceiling=ProjectedLine(hr, "descending", -SLOPE),
-        floor=ProjectedLine(lb, "descending", -SLOPE),
+        ceiling=ProjectedLine(hr, "descending", -slope),
+        floor=ProjectedLine(lb, "descending", -slope),
         channel_type="descending",
-        extreme_line=ProjectedLine(lw, "descending", -SLOPE)
+        extreme_line=ProjectedLine(lw, "descending", -slope)
     )
     return ChannelSystem(
         ascending=ascending,
@@ -180,64 +493,64 @@ def build_channels(lb: AnchorPoint, hr: AnchorPoint, hw: AnchorPoint, lw: Anchor
 def auto_detect_anchors(df_1min: pd.DataFrame, df_30min: pd.DataFrame) -> Optional[dict]:
     """
     Auto-detect the 4 anchor points from afternoon data.
-    Uses full data window for pattern detection but only selects anchors from 12:00-2:59 PM CT.
-    """
-    detected = None
-    noon = dtime(12, 0)
-    three_pm = dtime(15, 0)
-
-    # Try 30-min data first (preferred — matches line chart)
-    if not df_30min.empty and len(df_30min) >= 3:
-        bounces, rejections = find_bounces_and_rejections(df_30min, lookback=1)
-        # Filter to only 12:00-2:59 PM
-        bounces = [b for b in bounces if noon <= b.timestamp.time() < three_pm]
-        rejections = [r for r in rejections if noon <= r.timestamp.time() < three_pm]
-        if bounces and rejections:
-            detected = (bounces, rejections)
-
-    # Fallback to 1-min data, round timestamps to nearest 30-min
-    if detected is None and not df_1min.empty:
-        bounces, rejections = find_bounces_and_rejections(df_1min, lookback=5)
-        # Round timestamps and filter to 12:00-2:59 PM
-        for b in bounces:
-            b.timestamp = _round_to_30min(b.timestamp)
-        for r in rejections:
-            r.timestamp = _round_to_30min(r.timestamp)
-        bounces = [b for b in bounces if noon <= b.timestamp.time() < three_pm]
-        rejections = [r for r in rejections if noon <= r.timestamp.time() < three_pm]
-        if bounces and rejections:
-            detected = (bounces, rejections)
-
-    if detected is None:
+    Uses full data window for pattern detection but only selects anchors from 12:00-2:59 PM CT:
+    30-min swings when there are both, else 1-min swings rounded to the nearest 30 min.
+    rank_anchor_candidates lists the other timeframes' candidates behind this pick.
+    """
+    picks = _default_picks(df_1min, df_30min)
+    if picks is None:
         return None
+    return {role: AnchorPoint(p.price, p.timestamp, ROLE_LABELS[role]) for role, p in picks.items()}
 
-    bounces, rejections = detected
-    lb = min(bounces, key=lambda b: b.price)
-    lb.label = "Lowest Bounce"
-    hr = max(rejections, key=lambda r: r.price)
-    hr.label = "Highest Rejection"
-
-    # Wicks — filter to 12:00-2:59 PM only
-    wick_source = df_30min if not df_30min.empty else df_1min
-    wick_filtered = wick_source.between_time(noon, dtime(14, 59))
-    if wick_filtered.empty:
-        wick_filtered = wick_source
-    hw, lw = find_extreme_wicks(wick_filtered)
-
-    return {'lb': lb, 'hr': hr, 'hw': hw, 'lw': lw}
-
-
-def _round_to_30min(ts: datetime) -> datetime:
-    """Round a timestamp to the nearest 30-minute mark."""
-    minute = ts.minute
-    if minute < 15:
-        rounded_min = 0
-    elif minute < 45:
-        rounded_min = 30
-    else:
-        rounded_min = 0
-        ts = ts + timedelta(hours=1)
-    return ts.replace(minute=rounded_min, second=0, microsecond=0)
+
+def build_channel_systems(afternoon_data: Dict[str, tuple], slopes: Dict[str, float]) -> Dict[str, Optional[ChannelSystem]]:
+    """
+    Auto-detect anchors and build a ChannelSystem for every symbol in parallel.
+    afternoon_data: {symbol: (df_1min, df_30min, ...)} as from fetch_multi_afternoon.
+    slopes: {symbol: points per block}. Symbols without detectable anchors map to None.
+    """
+    def _build(item):
+        sym, data = item
+        df_1m, df_30m = data[0], data[1]
+        if df_1m.empty and df_30m.empty:
+            return sym, None
+        detected = auto_detect_anchors(df_1m, df_30m)
+        if not detected:
+            return sym, None
+        return sym, build_channels(detected['lb'], detected['hr'], detected['hw'], detected['lw'],
+                                   slope=slopes.get(sym, SLOPE))
+
+    if not afternoon_data:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(afternoon_data)) as pool:
+        return dict(pool.map(_build, afternoon_data.items()))
+
+
+def project_channel_values(channels: ChannelSystem, times) -> dict:
+    """
+    All six line values at every time in one vectorized pass.
+    Same keys as get_channel_values_at_time; values are arrays (extremes may be None).
+    Block counts are shared between lines projected from the same anchor.
+    """
+    lines = {
+        "asc_floor": channels.ascending.floor,
+        "asc_ceiling": channels.ascending.ceiling,
+        "asc_extreme": channels.ascending.extreme_line,
+        "desc_ceiling": channels.descending.ceiling,
+        "desc_floor": channels.descending.floor,
+        "desc_extreme": channels.descending.extreme_line,
+    }
+    blocks = {}
+    out = {}
+    for key, line in lines.items():
+        if line is None:
+            out[key] = None
+            continue
+        ts = line.anchor.timestamp
+        if ts not in blocks:
+            blocks[ts] = count_blocks_array(ts, times)
+        out[key] = line.anchor.price + line.slope * blocks[ts]
+    return out
 
 
 def get_channel_values_at_time(channels: ChannelSystem, t: datetime) -> dict:
@@ -250,3 +563,45 @@ def get_channel_values_at_time(channels: ChannelSystem, t: datetime) -> dict:
         "desc_floor": channels.descending.floor_at(t),
         "desc_extreme": channels.descending.extreme_at(t),
     }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PROJECTION TABLES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def fmt_hour(h, m):
+    if h == 0: return f"12:{m:02d} AM"
+    if h < 12: return f"{h}:{m:02d} AM"
+    if h == 12: return f"12:{m:02d} PM"
+    return f"{h-12}:{m:02d} PM"
+
+
+ASIAN_TIMES = [(fmt_hour(h, m), dtime(h, m)) for h in range(17, 22) for m in (0, 30) if not (h == 21 and m == 30)]
+RTH_TIMES = [("8:30", dtime(8, 30)), ("★ 9:00", dtime(9, 0)), ("9:30", dtime(9, 30)), ("10:00", dtime(10, 0)),
+             ("10:30", dtime(10, 30)), ("11:00", dtime(11, 0)), ("11:30", dtime(11, 30)), ("12:00", dtime(12, 0)),
+             ("12:30", dtime(12, 30)), ("1:00", dtime(13, 0))]
+EVENING_TIMES = [(fmt_hour(h, m), dtime(h, m)) for h in range(17, 24) for m in (0, 30)]
+MORNING_TIMES = [(fmt_hour(h, m), dtime(h, m)) for h in range(0, 14) for m in (0, 30)]
+
+
+def make_projection_table(channels: ChannelSystem, target_date: date, times_list, offset: float = 0) -> pd.DataFrame:
+    if not times_list:
+        return pd.DataFrame()
+    times = pd.DatetimeIndex([CT.localize(datetime.combine(target_date, t)) for _, t in times_list])
+    vals = project_channel_values(channels, times)
+    return pd.DataFrame({
+        "Time (CT)": [label for label, _ in times_list],
+        "Asc Ceil": np.round(vals["asc_ceiling"] - offset, 2), "Asc Floor": np.round(vals["asc_floor"] - offset, 2),
+        "Desc Ceil": np.round(vals["desc_ceiling"] - offset, 2), "Desc Floor": np.round(vals["desc_floor"] - offset, 2),
+    })
+
+
+def projection_tables(channels: ChannelSystem, trading_date: date, anchor_date: date) -> Dict[str, pd.DataFrame]:
+    """The dashboard's ES tables: Asian session (anchor-day evening), RTH, and the full evening + morning grid."""
+    eve = make_projection_table(channels, anchor_date, EVENING_TIMES)
+    morn = make_projection_table(channels, trading_date, MORNING_TIMES)
+    return {
+        "asian": make_projection_table(channels, anchor_date, ASIAN_TIMES),
+        "rth": make_projection_table(channels, trading_date, RTH_TIMES),
+        "full": pd.concat([eve, morn], ignore_index=True) if not eve.empty else morn,
+    }
@@ -0,0 +1,94 @@
+"""
+SPX Prophet — Chart Data Module
+Server-side data prep for the channel-overlay price chart:
+LTTB downsampling, one vectorized line projection, anchor and cross markers,
+volume-profile levels.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+from channel_builder import ChannelSystem, project_channel_values
+from cross_scanner import scan_crosses
+
+MAX_POINTS = 2000
+LINE_LABELS = {
+    "asc_extreme": "Asc Extreme", "asc_ceiling": "Asc Ceiling", "asc_floor": "Asc Floor",
+    "desc_ceiling": "Desc Ceiling", "desc_floor": "Desc Floor", "desc_extreme": "Desc Extreme",
+}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. Returns the kept indices (sorted),
+    always including the first and last point, so spikes and turns survive.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)   # n_out - 2 interior buckets
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nlo, nhi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[b + 1] = a
+    return keep
+
+
+def build_chart_data(df: pd.DataFrame, channels: Optional[ChannelSystem], offset: float = 0.0,
+                     max_points: int = MAX_POINTS, volume: Optional[Dict[str, object]] = None) -> dict:
+    """
+    Long-format frames for the overlay chart, all in the display instrument
+    (ES when offset=0, SPX when offset is the ES − SPX basis).
+      price:   downsampled Close
+      lines:   every channel line at the kept timestamps (one projection call)
+      anchors: the 4 anchor points
+      crosses: 8/50 crosses found by the vectorized scanner
+      volume:  VWAP / POC / value-area levels for each {name: VolumeLevels} given
+    """
+    empty = {"price": pd.DataFrame(), "lines": pd.DataFrame(), "anchors": pd.DataFrame(), "crosses": pd.DataFrame(),
+             "volume": pd.DataFrame()}
+    if df.empty:
+        return empty
+
+    close = df["Close"].to_numpy(dtype=np.float64)
+    ts_ns = df.index.as_unit("ns").asi8
+    keep = lttb(ts_ns, close, max_points)
+    times = df.index[keep]
+    out = {"price": pd.DataFrame({"time": times, "value": close[keep] - offset, "series": "Price"})}
+
+    lines, anchors = [], pd.DataFrame()
+    if channels is not None:
+        for key, vals in project_channel_values(channels, times).items():
+            if vals is not None:
+                lines.append(pd.DataFrame({"time": times, "value": vals - offset, "series": LINE_LABELS[key]}))
+        anchors = pd.DataFrame([{"time": ap.timestamp, "value": ap.price - offset, "label": ap.label}
+                                for ap in channels.anchor_points])
+    out["lines"] = pd.concat(lines, ignore_index=True) if lines else pd.DataFrame()
+    out["anchors"] = anchors
+
+    crosses = scan_crosses(df) if "EMA_8" in df.columns else pd.DataFrame()
+    if not crosses.empty:
+        crosses = pd.DataFrame({"time": crosses["timestamp"], "value": crosses["price_at_cross"] - offset,
+                                "cross_type": crosses["cross_type"], "is_valid": crosses["is_valid"]})
+    out["crosses"] = crosses
+
+    rows = []
+    for name, lv in (volume or {}).items():
+        if lv is None:
+            continue
+        rows += [{"value": lv.vwap - offset, "label": f"{name} VWAP", "kind": "vwap"},
+                 {"value": lv.poc - offset, "label": f"{name} POC", "kind": "poc"},
+                 {"value": lv.vah - offset, "label": f"{name} VAH", "kind": "va"},
+                 {"value": lv.val - offset, "label": f"{name} VAL", "kind": "va"}]
+    out["volume"] = pd.DataFrame(rows)
+    return out
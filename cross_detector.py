@@ -1,18 +1,22 @@
 """
 SPX Prophet — Cross Detector Module
-Monitors 8 EMA / 50 EMA crossovers on ES 1-minute chart.
+Monitors 8 EMA / 50 EMA crossovers on ES 1-minute chart, and on 5/15-minute
+bars resampled from the same stream.
 """
 
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pytz
 
 CT = pytz.timezone("America/Chicago")
 DIVERGENCE_THRESHOLD = 10.0
 HOUR_BOUNDARY_MINUTES = 10
+TIMEFRAMES = (1, 5, 15)   # minutes
 
 
 @dataclass
@@ -41,9 +45,38 @@ class CrossMonitorState:
     status_detail: str
     last_cross: Optional[CrossEvent] = None
     recent_crosses: List[CrossEvent] = field(default_factory=list)
+    timeframe: str = "1m"
+    timeframes: Dict[str, "CrossMonitorState"] = field(default_factory=dict)   # {"5m": state, ...} on the 1m state
+    alignment: str = ""                                                        # BULLISH / BEARISH / MIXED across timeframes
 
 
-def detect_crosses(df: pd.DataFrame, lookback_hours: int = 4) -> List[CrossEvent]:
+def _make_cross_event(ts, spread: float, max_div: float, price: float, ema8: float, ema50: float,
+                      threshold: float = DIVERGENCE_THRESHOLD) -> CrossEvent:
+    """Classify a cross at ts: direction, divergence and hour-boundary timing."""
+    cross_type = "bullish" if spread > 0 else "bearish"
+    minute = ts.minute
+    is_near_hour = minute <= HOUR_BOUNDARY_MINUTES or minute >= (60 - HOUR_BOUNDARY_MINUTES)
+
+    if minute <= HOUR_BOUNDARY_MINUTES:
+        nearest_hour = ts.strftime("%I:00 %p")
+    else:
+        nearest_hour = (ts + timedelta(hours=1)).strftime("%I:00 %p")
+
+    return CrossEvent(
+        timestamp=ts,
+        cross_type=cross_type,
+        divergence=max_div,
+        price_at_cross=price,
+        ema_8=ema8,
+        ema_50=ema50,
+        is_valid_divergence=max_div >= threshold,
+        is_valid_timing=is_near_hour,
+        is_valid=(max_div >= threshold) and is_near_hour,
+        nearest_hour=nearest_hour
+    )
+
+
+def detect_crosses(df: pd.DataFrame, lookback_hours: int = 4, threshold: float = DIVERGENCE_THRESHOLD) -> List[CrossEvent]:
     """Detect all 8/50 EMA crosses in recent data."""
     if df.empty or "EMA_8" not in df.columns:
         return []
@@ -65,35 +98,15 @@ def detect_crosses(df: pd.DataFrame, lookback_hours: int = 4) -> List[CrossEvent
             max_div_value = abs(current_spread)
 
         if prev_spread * current_spread < 0:
-            ts = recent.index[i]
-            cross_type = "bullish" if current_spread > 0 else "bearish"
-            minute = ts.minute
-            is_near_hour = minute <= HOUR_BOUNDARY_MINUTES or minute >= (60 - HOUR_BOUNDARY_MINUTES)
-
-            if minute <= HOUR_BOUNDARY_MINUTES:
-                nearest_hour = ts.strftime("%I:00 %p")
-            else:
-                nearest_hour = (ts + timedelta(hours=1)).strftime("%I:00 %p")
-
-            cross = CrossEvent(
-                timestamp=ts,
-                cross_type=cross_type,
-                divergence=max_div_value,
-                price_at_cross=float(recent["Close"].iloc[i]),
-                ema_8=float(recent["EMA_8"].iloc[i]),
-                ema_50=float(recent["EMA_50"].iloc[i]),
-                is_valid_divergence=max_div_value >= DIVERGENCE_THRESHOLD,
-                is_valid_timing=is_near_hour,
-                is_valid=(max_div_value >= DIVERGENCE_THRESHOLD) and is_near_hour,
-                nearest_hour=nearest_hour
-            )
-            crosses.append(cross)
+            crosses.append(_make_cross_event(
+                recent.index[i], current_spread, max_div_value, float(recent["Close"].iloc[i]),
+                float(recent["EMA_8"].iloc[i]), float(recent["EMA_50"].iloc[i]), threshold))
             max_div_value = 0.0
 
     return crosses
 
 
-def get_monitor_state(df: pd.DataFrame) -> CrossMonitorState:
+def get_monitor_state(df: pd.DataFrame, threshold: float = DIVERGENCE_THRESHOLD) -> CrossMonitorState:
     """Get current state of the 8/50 cross monitor."""
     if df.empty or "EMA_8" not in df.columns:
         return CrossMonitorState(0, 0, 0, 0, 0, False, "NO DATA", "Waiting for ES 1-min data...")
@@ -102,7 +115,7 @@ def get_monitor_state(df: pd.DataFrame) -> CrossMonitorState:
     ema50 = float(df["EMA_50"].iloc[-1])
     spread = ema8 - ema50
     price = float(df["Close"].iloc[-1])
-    crosses = detect_crosses(df)
+    crosses = detect_crosses(df, threshold=threshold)
 
     # Max divergence since last cross
     if crosses:
@@ -111,10 +124,17 @@ def get_monitor_state(df: pd.DataFrame) -> CrossMonitorState:
     else:
         max_div = float((df["EMA_8"] - df["EMA_50"]).abs().max())
 
-    is_diverged = max_div >= DIVERGENCE_THRESHOLD
+    return _build_state(df.index[-1], ema8, ema50, price, max_div, crosses, threshold)
+
+
+def _build_state(now_ts, ema8: float, ema50: float, price: float, max_div: float,
+                 crosses: List[CrossEvent], threshold: float = DIVERGENCE_THRESHOLD) -> CrossMonitorState:
+    """Status text and flags from the latest EMAs, divergence and recent crosses."""
+    spread = ema8 - ema50
+    is_diverged = max_div >= threshold
 
     # Status
-    if crosses and (df.index[-1] - crosses[-1].timestamp).total_seconds() < 300:
+    if crosses and (now_ts - crosses[-1].timestamp).total_seconds() < 300:
         cx = crosses[-1]
         if cx.is_valid:
             status = "CROSS — VALID"
@@ -151,6 +171,82 @@ def get_monitor_state(df: pd.DataFrame) -> CrossMonitorState:
     )
 
 
+def get_monitor_states(frames: Dict[str, pd.DataFrame], thresholds: Dict[str, float]) -> Dict[str, CrossMonitorState]:
+    """Build the cross monitor state for every symbol in parallel."""
+    if not frames:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(frames)) as pool:
+        futures = {sym: pool.submit(get_monitor_state, df, thresholds.get(sym, DIVERGENCE_THRESHOLD))
+                   for sym, df in frames.items()}
+        return {sym: fut.result() for sym, fut in futures.items()}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STREAMING MONITOR (push one closed bar at a time)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StreamingCrossMonitor:
+    """
+    Incremental 8/50 EMA cross monitor: O(1) work per closed bar.
+    EMAs match ewm(span, adjust=False) seeded with the first close; cross,
+    divergence and timing rules are the ones detect_crosses applies.
+    """
+
+    def __init__(self, threshold: float = DIVERGENCE_THRESHOLD, lookback_hours: int = 4, max_crosses: int = 50):
+        self.threshold = threshold
+        self.lookback = timedelta(hours=lookback_hours)
+        self.a8, self.a50 = 2.0 / 9.0, 2.0 / 51.0
+        self.ema8: Optional[float] = None
+        self.ema50: Optional[float] = None
+        self.price = 0.0
+        self.last_ts: Optional[datetime] = None
+        self.max_div_value = 0.0        # running max |spread| for the next cross (detect_crosses)
+        self.max_since_cross = 0.0      # max |spread| on bars strictly after the last cross
+        self.bars_since_cross = 0
+        self.crosses = deque(maxlen=max_crosses)
+        self.bars = 0
+
+    def update(self, ts: datetime, close: float) -> Optional[CrossEvent]:
+        """Feed one closed bar. Returns the CrossEvent if this bar crossed."""
+        if self.last_ts is not None and ts <= self.last_ts:
+            return None  # duplicate or out-of-order bar
+        close = float(close)
+        if self.ema8 is None:
+            self.ema8 = self.ema50 = close
+            self.price, self.last_ts, self.bars = close, ts, 1
+            return None
+        prev_spread = self.ema8 - self.ema50
+        self.ema8 += self.a8 * (close - self.ema8)
+        self.ema50 += self.a50 * (close - self.ema50)
+        self.price, self.last_ts = close, ts
+        self.bars += 1
+
+        spread = self.ema8 - self.ema50
+        mag = abs(spread)
+        if mag > self.max_div_value:
+            self.max_div_value = mag
+
+        if prev_spread * spread < 0:
+            cx = _make_cross_event(ts, spread, self.max_div_value, close, self.ema8, self.ema50, self.threshold)
+            self.crosses.append(cx)
+            self.max_div_value = 0.0
+            self.max_since_cross, self.bars_since_cross = 0.0, 0
+            return cx
+        self.max_since_cross = max(self.max_since_cross, mag)
+        self.bars_since_cross += 1
+        return None
+
+    def state(self) -> CrossMonitorState:
+        if self.ema8 is None:
+            return CrossMonitorState(0, 0, 0, 0, 0, False, "NO DATA", "Waiting for ES 1-min data...")
+        while self.crosses and self.last_ts - self.crosses[0].timestamp > self.lookback:
+            self.crosses.popleft()
+        recent = list(self.crosses)
+        spread = self.ema8 - self.ema50
+        max_div = self.max_since_cross if self.bars_since_cross else abs(spread)
+        return _build_state(self.last_ts, self.ema8, self.ema50, self.price, max_div, recent, self.threshold)
+
+
 def check_line_proximity(price: float, channel_values: dict, threshold: float = 3.0) -> Optional[str]:
     """Check if price is near any projected channel line."""
     lines = {k: v for k, v in channel_values.items() if v is not None}
@@ -160,3 +256,98 @@ def check_line_proximity(price: float, channel_values: dict, threshold: float =
     if abs(price - lines[nearest]) <= threshold:
         return nearest
     return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MULTI-TIMEFRAME (one 1-min stream → 1/5/15-min monitors)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class StreamingResampler:
+    """
+    Folds closed 1-min closes into `minutes` bars on CT wall-clock boundaries.
+    A bar closes when its last minute arrives or the next bucket starts (gaps);
+    it is stamped with its start, as a yfinance interval bar would be.
+    """
+
+    def __init__(self, minutes: int):
+        self.minutes = minutes
+        self.start: Optional[datetime] = None
+        self.close = 0.0
+
+    def update(self, ts: datetime, close: float, minute_of_day: Optional[int] = None) -> List[tuple]:
+        """Feed one closed 1-min bar; returns the (start, close) bars that closed (0, 1 or 2)."""
+        if minute_of_day is None:
+            local = ts.astimezone(CT)
+            minute_of_day = local.hour * 60 + local.minute
+        into = minute_of_day % self.minutes
+        b = ts - timedelta(minutes=into)
+        out = []
+        if self.start is not None and b != self.start:
+            out.append((self.start, self.close))
+        self.start, self.close = b, float(close)
+        if into == self.minutes - 1:
+            out.append((self.start, self.close))
+            self.start = None
+        return out
+
+
+class MultiTimeframeCrossMonitor:
+    """
+    One StreamingCrossMonitor per timeframe fed from a single 1-min stream:
+    a resampler step plus an EMA step per timeframe per bar. Higher timeframes
+    only see closed bars; the forming bucket does not move their EMAs.
+    """
+
+    def __init__(self, timeframes=TIMEFRAMES, threshold: float = DIVERGENCE_THRESHOLD, lookback_hours: int = 4):
+        self.timeframes = tuple(timeframes)
+        self.monitors = {m: StreamingCrossMonitor(threshold, lookback_hours) for m in self.timeframes}
+        self.resamplers = {m: StreamingResampler(m) for m in self.timeframes if m > 1}
+        self.last_ts: Optional[datetime] = None
+
+    def update(self, ts: datetime, close: float) -> Dict[str, CrossEvent]:
+        """Feed one closed 1-min bar. Returns {timeframe: CrossEvent} for every timeframe that crossed."""
+        self.last_ts = ts
+        local = ts.astimezone(CT)
+        minute_of_day = local.hour * 60 + local.minute
+        crossed = {}
+        for m, mon in self.monitors.items():
+            bars = [(ts, close)] if m == 1 else self.resamplers[m].update(ts, close, minute_of_day)
+            for bar_ts, bar_close in bars:
+                cx = mon.update(bar_ts, bar_close)
+                if cx is not None:
+                    crossed[f"{m}m"] = cx
+        return crossed
+
+    def extend(self, df: pd.DataFrame, now: Optional[datetime] = None) -> Dict[str, CrossEvent]:
+        """Feed the rows of a 1-min frame newer than the last bar seen (and closed by `now`, if given)."""
+        if df is None or df.empty:
+            return {}
+        new = df if self.last_ts is None else df[df.index > self.last_ts]
+        if now is not None:
+            new = new[new.index <= now - timedelta(minutes=1)]
+        crossed = {}
+        for ts, close in zip(new.index, new["Close"].to_numpy(dtype=np.float64)):
+            crossed.update(self.update(ts, close))
+        return crossed
+
+    def state(self) -> CrossMonitorState:
+        """The base timeframe's state, with every timeframe's state and their alignment attached."""
+        states = {}
+        for m, mon in self.monitors.items():
+            s = mon.state()
+            s.timeframe = f"{m}m"
+            states[s.timeframe] = s
+        live = [s for s in states.values() if s.status != "NO DATA"]
+        bull = sum(s.current_spread > 0 for s in live)
+        if not live:
+            alignment = "NO DATA"
+        elif bull == len(live):
+            alignment = f"BULLISH {bull}/{len(states)}"
+        elif bull == 0:
+            alignment = f"BEARISH {len(live)}/{len(states)}"
+        else:
+            alignment = f"MIXED {bull}↑ {len(live) - bull}↓"
+        base = states[f"{self.timeframes[0]}m"]
+        base.timeframes = states
+        base.alignment = alignment
+        return base
@@ -0,0 +1,71 @@
+"""
+SPX Prophet — Cross Scanner Module
+Vectorized batch version of detect_crosses for months of 1-min data.
+Same cross, divergence and timing rules; results come back as a columnar table.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import timedelta, time as dtime
+from typing import Optional
+
+from cross_detector import DIVERGENCE_THRESHOLD, HOUR_BOUNDARY_MINUTES
+
+HOUR_LABELS = np.array([dtime(h).strftime("%I:00 %p") for h in range(24)])
+COLUMNS = ["timestamp", "cross_type", "divergence", "price_at_cross", "ema_8", "ema_50",
+           "is_valid_divergence", "is_valid_timing", "is_valid", "nearest_hour"]
+
+
+def scan_crosses(df: pd.DataFrame, lookback_hours: Optional[float] = None,
+                 threshold: float = DIVERGENCE_THRESHOLD) -> pd.DataFrame:
+    """
+    Find every 8/50 EMA cross in df (needs EMA_8, EMA_50 and Close columns).
+    lookback_hours=None scans the whole frame; pass 4 to mirror detect_crosses exactly.
+
+    - crosses: strict sign change of EMA_8 − EMA_50 between consecutive bars
+    - divergence: max |spread| over the bars after the previous cross up to and
+      including this one (first segment starts at the second bar), via np.maximum.reduceat
+    - timing: minute <= 10 or >= 50, nearest hour rounds up past :10
+    """
+    if df.empty or "EMA_8" not in df.columns:
+        return pd.DataFrame(columns=COLUMNS)
+
+    if lookback_hours is not None:
+        cutoff = df.index[-1] - timedelta(hours=lookback_hours)
+        df = df[df.index >= cutoff]
+    if len(df) < 2:
+        return pd.DataFrame(columns=COLUMNS)
+
+    ema8 = df["EMA_8"].to_numpy(dtype=np.float64)
+    ema50 = df["EMA_50"].to_numpy(dtype=np.float64)
+    spread = ema8 - ema50
+
+    # NaN never compares greater than the running max, so it contributes nothing
+    mag = np.nan_to_num(np.abs(spread), nan=0.0)
+    idx = np.flatnonzero(spread[:-1] * spread[1:] < 0) + 1
+    if idx.size == 0:
+        return pd.DataFrame(columns=COLUMNS)
+
+    starts = np.concatenate(([1], idx[:-1] + 1))
+    divergence = np.maximum.reduceat(mag[:idx[-1] + 1], starts)
+
+    ts = df.index[idx]
+    minute = np.asarray(ts.minute)
+    early = minute <= HOUR_BOUNDARY_MINUTES
+    is_timing = early | (minute >= 60 - HOUR_BOUNDARY_MINUTES)
+    rounded = ts.where(early, ts + pd.Timedelta(hours=1))
+    is_div = divergence >= threshold
+
+    return pd.DataFrame({
+        "timestamp": ts,
+        "cross_type": np.where(spread[idx] > 0, "bullish", "bearish"),
+        "divergence": divergence,
+        "price_at_cross": df["Close"].to_numpy(dtype=np.float64)[idx],
+        "ema_8": ema8[idx],
+        "ema_50": ema50[idx],
+        "is_valid_divergence": is_div,
+        "is_valid_timing": is_timing,
+        "is_valid": is_div & is_timing,
+        "nearest_hour": HOUR_LABELS[np.asarray(rounded.hour)],
+    })
+
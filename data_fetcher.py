@@ -8,24 +8,29 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, time as dtime, date
 import pytz
-import streamlit as st
+
+from channel_builder import auto_detect_anchors
+from bar_normalizer import normalize_bars, partition_sessions, session_for, GLOBEX
+from cache_layer import bounded_cache, LIVE, AFTERNOON, HISTORY, MB
 
 CT = pytz.timezone("America/Chicago")
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PRICE FETCHING (TT → YF → 0)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data(ttl=30)
-def fetch_es_price() -> tuple:
-    """Returns (price, source)."""
+@bounded_cache(LIVE, ttl=30, max_entries=64, max_bytes=1 * MB)
+def fetch_price(symbol: str) -> tuple:
+    """Returns (price, source) for any yfinance symbol."""
     try:
-        es = yf.Ticker("ES=F")
-        data = es.history(period="2d", interval="1m")
+        tk = yf.Ticker(symbol)
+        data = tk.history(period="2d", interval="1m")
         if not data.empty:
             return float(data["Close"].iloc[-1]), "yfinance"
-        data = es.history(period="5d")
+        data = tk.history(period="5d")
         if not data.empty:
             return float(data["Close"].iloc[-1]), "yfinance"
     except Exception:
@@ -33,109 +38,230 @@ def fetch_es_price() -> tuple:
     return 0.0, "none"
 
 
-@st.cache_data(ttl=30)
+def fetch_es_price() -> tuple:
+    """Returns (price, source)."""
+    return fetch_price("ES=F")
+
+
 def fetch_spx_price() -> tuple:
     """Returns (price, source)."""
-    try:
-        spx = yf.Ticker("^GSPC")
-        data = spx.history(period="2d", interval="1m")
-        if not data.empty:
-            return float(data["Close"].iloc[-1]), "yfinance"
-        data = spx.history(period="5d")
-        if not data.empty:
-            return float(data["Close"].iloc[-1]), "yfinance"
-    except Exception:
-        pass
-    return 0.0, "none"
+    return fetch_price("^GSPC")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# 1-MIN ES DATA (for 8/50 EMA cross detection)
+# 1-MIN DATA (for 8/50 EMA cross detection)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data(ttl=30)
-def fetch_es_1min() -> pd.DataFrame:
-    """Fetch ES 1-min bars with EMAs calculated."""
+def _prep_1min(df: pd.DataFrame, session: str = GLOBEX) -> pd.DataFrame:
+    """Normalize (CT, deduped, gap-filled, session-tagged) and add the 8/50 EMA columns."""
+    df = normalize_bars(df, session)
+    if df.empty:
+        return pd.DataFrame()
+    df["EMA_8"] = df["Close"].ewm(span=8, adjust=False).mean()
+    df["EMA_50"] = df["Close"].ewm(span=50, adjust=False).mean()
+    df["Spread"] = df["EMA_8"] - df["EMA_50"]
+    return df
+
+
+@bounded_cache(LIVE, ttl=30, max_entries=16, max_bytes=32 * MB)
+def fetch_1min(symbol: str = "ES=F") -> pd.DataFrame:
+    """Fetch 1-min bars for one symbol with EMAs calculated."""
     try:
-        es = yf.Ticker("ES=F")
-        df = es.history(period="2d", interval="1m")
+        df = yf.Ticker(symbol).history(period="2d", interval="1m")
         if df.empty:
             return pd.DataFrame()
-        df.index = df.index.tz_convert(CT)
-        df = df[["Open", "High", "Low", "Close", "Volume"]]
-        df["EMA_8"] = df["Close"].ewm(span=8, adjust=False).mean()
-        df["EMA_50"] = df["Close"].ewm(span=50, adjust=False).mean()
-        df["Spread"] = df["EMA_8"] - df["EMA_50"]
-        return df
+        return _prep_1min(df, session_for(symbol))
     except Exception:
         return pd.DataFrame()
 
 
+def fetch_es_1min() -> pd.DataFrame:
+    """Fetch ES 1-min bars with EMAs calculated."""
+    return fetch_1min("ES=F")
+
+
+def _download_batch(symbols: tuple, period: str, interval: str) -> dict:
+    """One yf.download call for all symbols → {symbol: raw OHLCV frame}."""
+    raw = yf.download(list(symbols), period=period, interval=interval, group_by="ticker",
+                      auto_adjust=False, progress=False, threads=True)
+    if raw is None or raw.empty:
+        return {}
+    out = {}
+    for sym in symbols:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if sym not in raw.columns.get_level_values(0):
+                continue
+            df = raw[sym]
+        else:
+            df = raw
+        df = df.dropna(subset=["Close"])
+        if not df.empty:
+            out[sym] = df
+    return out
+
+
+@bounded_cache(LIVE, ttl=30, max_entries=8, max_bytes=64 * MB)
+def fetch_multi_1min(symbols: tuple) -> dict:
+    """
+    Fetch 1-min bars for several symbols in a single batched download.
+    Returns {symbol: DataFrame with EMAs}; missing symbols map to an empty frame.
+    """
+    try:
+        frames = _download_batch(symbols, "2d", "1m")
+    except Exception:
+        frames = {}
+    return {sym: _prep_1min(frames[sym], session_for(sym)) if sym in frames else pd.DataFrame() for sym in symbols}
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # AFTERNOON DATA (for auto-detection of bounces/rejections)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data(ttl=300)
-def fetch_afternoon_1min(trading_date: date) -> tuple:
+def partition_by_date(df: pd.DataFrame) -> dict:
+    """
+    Map each date in a time-sorted frame to its (start, stop) row range.
+    Normalized frames use their session_date column (Globex evenings count toward
+    the next day; afternoons are unaffected); raw frames fall back to CT calendar dates.
+    One vectorized pass — no per-row date objects.
     """
-    Fetch 1-min ES data for the day BEFORE trading_date, 12-3 PM CT.
+    if df.empty:
+        return {}
+    if "session_date" in df.columns:
+        return partition_sessions(df)
+    days = df.index.tz_localize(None).values.astype("datetime64[D]").astype(np.int64)
+    cuts = np.flatnonzero(np.diff(days)) + 1
+    starts = np.concatenate(([0], cuts))
+    stops = np.concatenate((cuts, [len(days)]))
+    return {date.fromordinal(EPOCH_ORDINAL + int(days[a])): (int(a), int(b)) for a, b in zip(starts, stops)}
+
+
+def _afternoon_slice(df: pd.DataFrame, trading_date: date, day_index: dict = None) -> tuple:
+    """
+    Slice 11:25 AM - 3:05 PM CT of the trading day BEFORE trading_date out of a
+    multi-day frame, walking back up to 3 weekdays for holidays.
+    Pass a precomputed partition_by_date index when slicing many dates.
     Returns (DataFrame, actual_date_used) or (empty_df, None).
     """
-    try:
-        es = yf.Ticker("ES=F")
-        df = es.history(period="7d", interval="1m")
-        if df.empty:
-            return pd.DataFrame(), None
-        df.index = df.index.tz_convert(CT)
+    if day_index is None:
+        day_index = partition_by_date(df)
+    prior = trading_date - timedelta(days=1)
+    while prior.weekday() >= 5:
+        prior -= timedelta(days=1)
 
-        # Find prior trading day
-        prior = trading_date - timedelta(days=1)
+    for attempt in range(3):
+        rows = day_index.get(prior)
+        day_data = df.iloc[rows[0]:rows[1]] if rows else df.iloc[0:0]
+        if not day_data.empty:
+            afternoon = day_data.between_time(dtime(11, 25), dtime(15, 5))
+            if not afternoon.empty:
+                return afternoon[OHLCV], prior
+        prior -= timedelta(days=1)
         while prior.weekday() >= 5:
             prior -= timedelta(days=1)
 
-        for attempt in range(3):
-            day_data = df[df.index.date == prior]
-            if not day_data.empty:
-                afternoon = day_data.between_time(dtime(11, 25), dtime(15, 5))
-                if not afternoon.empty:
-                    return afternoon[["Open", "High", "Low", "Close", "Volume"]], prior
-            prior -= timedelta(days=1)
-            while prior.weekday() >= 5:
-                prior -= timedelta(days=1)
+    return pd.DataFrame(), None
 
-        return pd.DataFrame(), None
+
+@bounded_cache(AFTERNOON, ttl=300, max_entries=32, max_bytes=8 * MB)
+def fetch_afternoon_1min(trading_date: date, symbol: str = "ES=F") -> tuple:
+    """
+    Fetch 1-min data for the day BEFORE trading_date, 12-3 PM CT.
+    Returns (DataFrame, actual_date_used) or (empty_df, None).
+    """
+    try:
+        df = yf.Ticker(symbol).history(period="7d", interval="1m")
+        if df.empty:
+            return pd.DataFrame(), None
+        return _afternoon_slice(normalize_bars(df, session_for(symbol)), trading_date)
     except Exception:
         return pd.DataFrame(), None
 
 
-@st.cache_data(ttl=300)
-def fetch_afternoon_30min(trading_date: date) -> tuple:
+@bounded_cache(AFTERNOON, ttl=300, max_entries=32, max_bytes=2 * MB)
+def fetch_afternoon_30min(trading_date: date, symbol: str = "ES=F") -> tuple:
     """
-    Fetch 30-min ES data for the day BEFORE trading_date, 11:30 AM - 3:05 PM CT.
+    Fetch 30-min data for the day BEFORE trading_date, 11:30 AM - 3:05 PM CT.
     Includes 11:30 for context before 12:00 and 3:00 for context after 2:30.
     Returns (DataFrame, actual_date_used).
     """
     try:
-        es = yf.Ticker("ES=F")
-        df = es.history(period="7d", interval="30m")
+        df = yf.Ticker(symbol).history(period="7d", interval="30m")
         if df.empty:
             return pd.DataFrame(), None
-        df.index = df.index.tz_convert(CT)
+        return _afternoon_slice(normalize_bars(df, session_for(symbol), interval_minutes=30), trading_date)
+    except Exception:
+        return pd.DataFrame(), None
 
-        prior = trading_date - timedelta(days=1)
-        while prior.weekday() >= 5:
-            prior -= timedelta(days=1)
 
-        for attempt in range(3):
-            day_data = df[df.index.date == prior]
-            if not day_data.empty:
-                afternoon = day_data.between_time(dtime(11, 25), dtime(15, 5))
-                if not afternoon.empty:
-                    return afternoon[["Open", "High", "Low", "Close", "Volume"]], prior
-            prior -= timedelta(days=1)
-            while prior.weekday() >= 5:
-                prior -= timedelta(days=1)
+@bounded_cache(AFTERNOON, ttl=300, max_entries=16, max_bytes=32 * MB)
+def fetch_multi_afternoon(trading_date: date, symbols: tuple) -> dict:
+    """
+    Batched afternoon fetch for several symbols: one 1-min and one 30-min download.
+    Returns {symbol: (df_1min, df_30min, actual_date_used)}.
+    """
+    out = {}
+    try:
+        frames_1m = _download_batch(symbols, "7d", "1m")
+        frames_30m = _download_batch(symbols, "7d", "30m")
+    except Exception:
+        frames_1m, frames_30m = {}, {}
+    for sym in symbols:
+        df_1m, d_1m, df_30m, d_30m = pd.DataFrame(), None, pd.DataFrame(), None
+        if sym in frames_1m:
+            df_1m, d_1m = _afternoon_slice(normalize_bars(frames_1m[sym], session_for(sym)), trading_date)
+        if sym in frames_30m:
+            df_30m, d_30m = _afternoon_slice(normalize_bars(frames_30m[sym], session_for(sym), interval_minutes=30),
+                                             trading_date)
+        out[sym] = (df_1m, df_30m, d_1m or d_30m)
+    return out
 
-        return pd.DataFrame(), None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BULK ANCHOR DETECTION (one history load → many dates)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@bounded_cache(HISTORY, ttl=300, max_entries=8, max_bytes=128 * MB)
+def fetch_history(symbol: str = "ES=F", interval: str = "1m", period: str = "7d") -> pd.DataFrame:
+    """Normalized OHLCV history in CT. yfinance serves ~7d of 1m and ~60d of 30m."""
+    try:
+        df = yf.Ticker(symbol).history(period=period, interval=interval)
+        if df.empty:
+            return pd.DataFrame()
+        return normalize_bars(df, session_for(symbol), interval_minutes=int(pd.Timedelta(interval).total_seconds() // 60))
     except Exception:
-        return pd.DataFrame(), None
+        return pd.DataFrame()
+
+
+def anchor_table(df_1min: pd.DataFrame, df_30min: pd.DataFrame, trading_dates) -> pd.DataFrame:
+    """
+    Run auto_detect_anchors for every trading date against already-loaded history.
+    Both frames are partitioned by date once; each date is then an O(1) slice.
+    Returns a frame indexed by trading_date with anchor_date and price/time per anchor.
+    """
+    idx_1m = partition_by_date(df_1min)
+    idx_30m = partition_by_date(df_30min)
+    rows = []
+    for td in trading_dates:
+        td = pd.Timestamp(td).date()
+        a1, d1 = _afternoon_slice(df_1min, td, idx_1m) if idx_1m else (pd.DataFrame(), None)
+        a30, d30 = _afternoon_slice(df_30min, td, idx_30m) if idx_30m else (pd.DataFrame(), None)
+        if a1.empty and a30.empty:
+            continue
+        detected = auto_detect_anchors(a1, a30)
+        if not detected:
+            continue
+        row = {"trading_date": td, "anchor_date": d1 or d30}
+        for key in ("lb", "hr", "hw", "lw"):
+            row[key] = detected[key].price
+            row[f"{key}_time"] = detected[key].timestamp
+        rows.append(row)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).set_index("trading_date")
+
+
+def fetch_anchor_table(start: date, end: date, symbol: str = "ES=F") -> pd.DataFrame:
+    """Anchors for every weekday in [start, end] from a single 1m + 30m history load."""
+    df_1m = fetch_history(symbol, "1m", "7d")
+    df_30m = fetch_history(symbol, "30m", "60d")
+    return anchor_table(df_1m, df_30m, pd.bdate_range(start, end))
@@ -0,0 +1,109 @@
+"""
+SPX Prophet — Fixed Point Module
+Opt-in integer representation: prices, channel levels and offsets as int32
+hundredths of a point. ES ticks (0.25 = 25) and the 0.52 slope (52 per block)
+are exact, so level comparisons and extreme ties carry no float noise, and
+bar columns take half the memory of float64.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+from bar_store import RingBarStore, BARS_PER_SESSION, COLUMNS, TAG_DTYPES, A8, A50, frame_from_arrays
+from channel_builder import ChannelSystem, count_blocks_array
+
+SCALE = 100                      # fixed units per point
+TICK = 25                        # ES minimum tick (0.25) in fixed units
+FIXED_DTYPE = np.int32           # ±21.4M points of headroom
+FIXED_ENV = "PROPHET_FIXED_POINT"   # app.py opts in when this is "1"
+_SCALED = np.array([c != "Volume" and c not in TAG_DTYPES for c in COLUMNS])   # Volume and tags stay plain counts
+
+
+def to_fixed(x):
+    """Points → hundredths (round half to even). Scalars give int, arrays int32; None stays None."""
+    if x is None:
+        return None
+    if np.ndim(x) == 0:
+        return int(round(float(x) * SCALE))
+    return np.rint(np.asarray(x, dtype=np.float64) * SCALE).astype(FIXED_DTYPE)
+
+
+def from_fixed(q):
+    if q is None:
+        return None
+    if np.ndim(q) == 0:
+        return int(q) / SCALE
+    return np.asarray(q, dtype=np.float64) / SCALE
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAR STORE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class FixedRingBarStore(RingBarStore):
+    """
+    RingBarStore with int32 columns: prices / EMAs / spread in hundredths, Volume
+    as a count. The EMA recursion runs on the exact float state of the last two
+    bars (what a forming-bar replace needs), so rounding never accumulates.
+    view(), column() and arrays() return fixed units; to_frame() returns points.
+    """
+
+    def __init__(self, sessions: int = 2, bars_per_session: int = BARS_PER_SESSION):
+        super().__init__(sessions, bars_per_session, dtype=FIXED_DTYPE)
+        self._ema = {}           # slot → (ema8, ema50) float, newest two slots only
+
+    def _write(self, slot: int, ts_ns: int, o: float, h: float, l: float, c: float, v: float,
+               tags: tuple, prev_slot: Optional[int]) -> None:
+        if prev_slot is None:
+            e8 = e50 = c
+        else:
+            p8, p50 = self._ema[prev_slot]
+            e8, e50 = p8 + A8 * (c - p8), p50 + A50 * (c - p50)
+        self._ema[slot] = (e8, e50)
+        if len(self._ema) > 2:
+            del self._ema[next(iter(self._ema))]
+        row = np.rint(np.array((o, h, l, c, v, e8, e50, e8 - e50, *tags)) * np.where(_SCALED, SCALE, 1))
+        for s in (slot, slot + self.capacity):
+            self._ts[s] = ts_ns
+            self._data[:, s] = row
+
+    def to_frame(self, k: Optional[int] = None) -> pd.DataFrame:
+        w = self._window(k)
+        return frame_from_arrays(self._ts[w], self._data[:, w] / np.where(_SCALED, SCALE, 1)[:, None])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHANNEL PROJECTIONS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def project_channel_fixed(channels: ChannelSystem, times) -> Dict[str, Optional[np.ndarray]]:
+    """
+    project_channel_values in hundredths: anchor + slope × blocks, with anchor and
+    slope quantized first so whole blocks are exact integer steps.
+    """
+    lines = {
+        "asc_floor": channels.ascending.floor,
+        "asc_ceiling": channels.ascending.ceiling,
+        "asc_extreme": channels.ascending.extreme_line,
+        "desc_ceiling": channels.descending.ceiling,
+        "desc_floor": channels.descending.floor,
+        "desc_extreme": channels.descending.extreme_line,
+    }
+    blocks = {}
+    out = {}
+    for key, line in lines.items():
+        if line is None:
+            out[key] = None
+            continue
+        ts = line.anchor.timestamp
+        if ts not in blocks:
+            blocks[ts] = count_blocks_array(ts, times)
+        step = to_fixed(line.slope) * blocks[ts]
+        out[key] = (to_fixed(line.anchor.price) + np.rint(step)).astype(FIXED_DTYPE)
+    return out
+
+
+def fixed_channel_values(channels: ChannelSystem, t) -> Dict[str, Optional[float]]:
+    """get_channel_values_at_time through project_channel_fixed: every level lands exactly on a hundredth."""
+    return {k: (from_fixed(v[0]) if v is not None else None) for k, v in project_channel_fixed(channels, [t]).items()}
@@ -0,0 +1,43 @@
+"""
+SPX Prophet — Instruments Module
+Contract specs for the index futures the pipeline can follow.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class Instrument:
+    key: str                      # short name used in the UI ("ES", "NQ", ...)
+    symbol: str                   # yfinance futures ticker
+    cash_symbol: str              # cash index the offset is measured against
+    tick_size: float
+    point_value: float            # $ per index point per contract
+    slope: float                  # channel points per 30-minute block
+    divergence_threshold: float   # min 8/50 EMA spread for a valid cross
+
+
+# Slopes / thresholds for NQ and RTY are the ES values scaled by index level.
+INSTRUMENTS: Dict[str, Instrument] = {
+    "ES": Instrument("ES", "ES=F", "^GSPC", 0.25, 50.0, 0.52, 10.0),
+    "MES": Instrument("MES", "MES=F", "^GSPC", 0.25, 5.0, 0.52, 10.0),
+    "NQ": Instrument("NQ", "NQ=F", "^NDX", 0.25, 20.0, 1.90, 36.0),
+    "RTY": Instrument("RTY", "RTY=F", "^RUT", 0.10, 50.0, 0.20, 4.0),
+}
+
+
+def get_instrument(key: str) -> Instrument:
+    """Look up an instrument by key ("ES") or yfinance symbol ("ES=F")."""
+    key = key.upper()
+    if key in INSTRUMENTS:
+        return INSTRUMENTS[key]
+    for inst in INSTRUMENTS.values():
+        if inst.symbol == key:
+            return inst
+    raise KeyError(f"Unknown instrument: {key}")
+
+
+def futures_symbols(keys: List[str]) -> tuple:
+    """yfinance tickers for a list of instrument keys (hashable for caching)."""
+    return tuple(get_instrument(k).symbol for k in keys)
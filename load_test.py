@@ -0,0 +1,248 @@
+"""
+SPX Prophet — Load Test Harness
+Drives N simulated dashboard sessions through app.py with Streamlit's AppTest,
+against offline replay bars instead of yfinance, and reports rerun latency,
+CPU, memory and upstream fetch counts per session count.
+
+    python load_test.py --sessions 1 4 8 16 --reruns 10 --bars archive/ES
+    python load_test.py --sessions 1 2 4 --synthetic
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pytz
+import yfinance as yf
+from streamlit.testing.v1 import AppTest
+
+from replay import load_bars
+from cache_layer import invalidate, total_bytes, MB
+import ui_templates
+
+CT = pytz.timezone("America/Chicago")
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PERIOD_DAYS = {"1d": 1, "2d": 2, "5d": 5, "7d": 7, "60d": 60}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# OFFLINE REPLAY DATA (stands in for yfinance)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def synthetic_bars(days: int = 10, end: Optional[date] = None, seed: int = 7) -> pd.DataFrame:
+    """Deterministic random-walk 1-min ES bars over the last `days` weekdays."""
+    end = end or date.today()
+    rng = np.random.default_rng(seed)
+    frames = []
+    for d in pd.bdate_range(end=end, periods=days):
+        idx = pd.date_range(CT.localize(pd.Timestamp(d - timedelta(days=1)).replace(hour=17).to_pydatetime()),
+                            periods=1380, freq="1min")
+        frames.append(pd.DataFrame(index=idx))
+    idx = pd.DatetimeIndex(pd.concat(frames).index)
+    close = 5800 + np.cumsum(rng.normal(0, 0.8, len(idx)))
+    spread = np.abs(rng.normal(0, 0.6, len(idx)))
+    return pd.DataFrame({"Open": close + rng.normal(0, 0.25, len(idx)), "High": close + spread,
+                         "Low": close - spread, "Close": close,
+                         "Volume": rng.integers(50, 2000, len(idx)).astype(float)}, index=idx)
+
+
+class ReplayYFinance:
+    """
+    Serves Ticker().history() and download() from recorded bars and counts
+    every upstream call by kind. Non-ES symbols replay the ES bars shifted by
+    a fixed basis so SPX / watchlist paths stay populated.
+    """
+
+    BASIS = {"^GSPC": -45.0, "MES=F": 0.0}
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars.tz_convert("UTC")
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+
+    def _frame(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        days = PERIOD_DAYS.get(period, 7)
+        df = self.bars[self.bars.index >= self.bars.index[-1] - pd.Timedelta(days=days)]
+        if interval not in ("1m", None):
+            rule = {"30m": "30min", "5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}.get(interval, "1D")
+            df = df.resample(rule).agg({"Open": "first", "High": "max", "Low": "min", "Close": "last",
+                                        "Volume": "sum"}).dropna(subset=["Close"])
+        basis = self.BASIS.get(symbol, 0.0)
+        if basis:
+            df = df.copy()
+            df[["Open", "High", "Low", "Close"]] += basis
+        return df.copy()
+
+    def ticker(self, symbol: str):
+        replay = self
+
+        class _Ticker:
+            def history(self, period="1mo", interval="1d", **kwargs):
+                replay._count("history")
+                return replay._frame(symbol, period, interval)
+        return _Ticker()
+
+    def download(self, tickers, period="1mo", interval="1d", group_by="column", **kwargs):
+        self._count("download")
+        symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+        return pd.concat({s: self._frame(s, period, interval) for s in symbols}, axis=1)
+
+    def install(self) -> None:
+        yf.Ticker = self.ticker
+        yf.download = self.download
+
+
+class RefreshCounter:
+    """
+    Stands in for ui_templates.rerun_after. Under AppTest a real st.rerun() reruns
+    inside the same run() call, so an auto-refresh loop would never return; this
+    counts the tick instead, and the driver's next run() is the rerun it asked for.
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, seconds: float) -> None:
+        with self._lock:
+            self.ticks += 1
+
+    def install(self) -> None:
+        ui_templates.rerun_after = self
+
+
+def rss_mb() -> float:
+    """Current resident set size (ru_maxrss, a lifetime peak, where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / MB if sys.platform == "darwin" else peak / 1024.0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SESSION DRIVER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _widget(seq, label_part: str):
+    return next(w for w in seq if label_part in w.label)
+
+
+def run_session(sid: int, dates: List[date], reruns: int,
+                timeout: float) -> tuple:
+    """
+    One simulated trader: first load, pick a date, press AUTO-DETECT, switch
+    on Auto-refresh, then `reruns` auto-refresh ticks through the app's own
+    refresh branch (its 30 s sleep is skipped by RefreshCounter).
+    Returns (latency of every rerun in seconds, the live AppTest).
+    """
+    rng = random.Random(sid)
+    lat = []
+
+    def timed(action):
+        t = time.perf_counter()
+        action()
+        lat.append(time.perf_counter() - t)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timed(at.run)
+    timed(lambda: _widget(at.date_input, "TRADING DATE").set_value(rng.choice(dates)).run())
+    timed(lambda: _widget(at.button, "AUTO-DETECT").click().run())
+    timed(lambda: _widget(at.checkbox, "Auto-refresh").check().run())      # first refresh tick
+    for _ in range(reruns - 1):
+        timed(at.run)
+    if at.exception:
+        raise RuntimeError(f"session {sid}: {at.exception[0].message}")
+    return lat, at
+
+
+def run_level(n_sessions: int, replay: ReplayYFinance, refresh: RefreshCounter, dates: List[date], reruns: int,
+              timeout: float) -> dict:
+    """
+    Run n_sessions concurrently from a cold cache and summarize. rss_mb is measured
+    while every session is still alive; rss_delta_mb is its growth over the level.
+    """
+    invalidate()
+    replay.calls.clear()
+    refresh.ticks = 0
+    rss0 = rss_mb()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        results = list(pool.map(lambda sid: run_session(sid, dates, reruns, timeout), range(n_sessions)))
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+    rss = rss_mb()
+    if refresh.ticks != n_sessions * reruns:
+        raise RuntimeError(f"expected {n_sessions * reruns} auto-refresh ticks, the app ran {refresh.ticks}")
+
+    lat = np.concatenate([np.asarray(r) for r, _ in results]) * 1000.0
+    del results
+    fetches = sum(replay.calls.values())
+    return {
+        "sessions": n_sessions,
+        "reruns": int(lat.size),
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "cpu_s": cpu,
+        "cpu_util": cpu / wall if wall else 0.0,
+        "rss_mb": rss,
+        "rss_delta_mb": rss - rss0,
+        "refreshes": refresh.ticks,
+        "fetches": fetches,
+        "fetches_per_session": fetches / n_sessions,
+        "cache_mb": total_bytes() / MB,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPX Prophet concurrent-session load test")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--reruns", type=int, default=5, help="auto-refresh reruns per session")
+    parser.add_argument("--bars", help="bar archive dir or 1-min CSV to replay")
+    parser.add_argument("--synthetic", action="store_true", help="replay generated random-walk bars")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-rerun AppTest timeout (s)")
+    args = parser.parse_args()
+
+    if args.reruns < 1:
+        parser.error("--reruns must be at least 1 (the Auto-refresh toggle itself is the first tick)")
+    if args.bars:
+        bars = load_bars(args.bars)
+    elif args.synthetic:
+        bars = synthetic_bars()
+    else:
+        parser.error("pass --bars PATH or --synthetic")
+
+    replay = ReplayYFinance(bars)
+    replay.install()
+    refresh = RefreshCounter()
+    refresh.install()
+    days = sorted(set(bars.index.tz_convert(CT).date))
+    dates = [d for d in days[1:] if d.weekday() < 5][-5:] or days[-1:]
+
+    header = f"{'sessions':>8} {'reruns':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu s':>7} {'cpu%':>6} {'rss MB':>7} {'ΔMB':>6} {'fetch':>6} {'f/sess':>7} {'cacheMB':>7}"
+    print(header)
+    print("─" * len(header))
+    for n in args.sessions:
+        r = run_level(n, replay, refresh, dates, args.reruns, args.timeout)
+        print(f"{r['sessions']:>8} {r['reruns']:>6} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['cpu_s']:>7.2f} {r['cpu_util'] * 100:>5.0f}% {r['rss_mb']:>7.0f} {r['rss_delta_mb']:>+6.0f} {r['fetches']:>6} {r['fetches_per_session']:>7.1f} {r['cache_mb']:>7.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
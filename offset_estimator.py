@@ -0,0 +1,110 @@
+"""
+SPX Prophet — Offset Estimator Module
+Streaming ES − SPX basis from aligned RTH 1-min bars.
+EWMA of the basis with outlier rejection, O(1) per bar.
+"""
+
+import pandas as pd
+from datetime import datetime, time as dtime
+from dataclasses import dataclass
+from typing import Optional
+import pytz
+
+from bar_normalizer import PHASE_RTH, PHASE_AFTERNOON
+
+CT = pytz.timezone("America/Chicago")
+RTH_OPEN = dtime(8, 30)
+RTH_CLOSE = dtime(15, 0)
+
+
+@dataclass
+class OffsetEstimate:
+    offset: float
+    confidence: str       # "HIGH", "MEDIUM", "LOW" or "NONE"
+    samples: int
+    dispersion: float     # EWMA of |basis − offset|
+    rejected: int
+    last_update: Optional[datetime] = None
+
+
+def _in_rth(ts: datetime) -> bool:
+    ts = ts.astimezone(CT)
+    return ts.weekday() < 5 and RTH_OPEN <= ts.time() < RTH_CLOSE
+
+
+class OffsetEstimator:
+    """
+    Incremental robust ES − SPX basis.
+    Each accepted bar moves the mean and mean-absolute-deviation EWMAs by one step.
+    Bars further than reject_k deviations from the mean are dropped; a run of
+    reset_after consecutive rejections is treated as a real jump (roll) and re-seeds.
+    """
+
+    def __init__(self, halflife_bars: int = 30, reject_k: float = 4.0, min_dev: float = 0.25,
+                 warmup: int = 10, reset_after: int = 15):
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife_bars)
+        self.reject_k = reject_k
+        self.min_dev = min_dev
+        self.warmup = warmup
+        self.reset_after = reset_after
+        self.mean: Optional[float] = None
+        self.dev = 0.0
+        self.samples = 0
+        self.rejected = 0
+        self._reject_run = 0
+        self.last_ts: Optional[datetime] = None
+
+    def update(self, ts: datetime, es_close: float, spx_close: float) -> bool:
+        """Feed one aligned bar. Returns True if it was accepted into the estimate."""
+        if self.last_ts is not None and ts <= self.last_ts:
+            return False
+        self.last_ts = ts
+        if not _in_rth(ts) or not (es_close > 0 and spx_close > 0):
+            return False
+
+        basis = es_close - spx_close
+        if self.mean is None:
+            self.mean, self.dev, self.samples = basis, 0.0, 1
+            return True
+
+        err = basis - self.mean
+        if self.samples >= self.warmup and abs(err) > self.reject_k * max(self.dev, self.min_dev):
+            self.rejected += 1
+            self._reject_run += 1
+            if self._reject_run >= self.reset_after:
+                self.mean, self.dev, self.samples, self._reject_run = basis, 0.0, 1, 0
+            return False
+
+        self._reject_run = 0
+        self.mean += self.alpha * err
+        self.dev += self.alpha * (abs(err) - self.dev)
+        self.samples += 1
+        return True
+
+    def update_frames(self, es_df: pd.DataFrame, spx_df: pd.DataFrame) -> int:
+        """Align two 1-min frames on timestamp and feed only bars newer than the last one seen."""
+        if es_df.empty or spx_df.empty:
+            return 0
+        joined = pd.concat([es_df["Close"].rename("es"), spx_df["Close"].rename("spx")], axis=1, join="inner")
+        if self.last_ts is not None:
+            joined = joined[joined.index > self.last_ts]
+        # normalized frames: skip gap-filled bars and non-RTH phases without per-row time checks
+        for df in (es_df, spx_df):
+            if "filled" in df.columns and not joined.empty:
+                tags = df[["filled", "phase"]].reindex(joined.index)
+                joined = joined[(tags["filled"] == 0) & tags["phase"].isin((PHASE_RTH, PHASE_AFTERNOON))]
+        accepted = 0
+        for ts, es, spx in zip(joined.index, joined["es"].values, joined["spx"].values):
+            accepted += self.update(ts, float(es), float(spx))
+        return accepted
+
+    def estimate(self) -> OffsetEstimate:
+        if self.mean is None:
+            return OffsetEstimate(0.0, "NONE", 0, 0.0, self.rejected, self.last_ts)
+        if self.samples >= 60 and self.dev <= 1.0:
+            conf = "HIGH"
+        elif self.samples >= 15 and self.dev <= 3.0:
+            conf = "MEDIUM"
+        else:
+            conf = "LOW"
+        return OffsetEstimate(round(self.mean, 2), conf, self.samples, self.dev, self.rejected, self.last_ts)
@@ -0,0 +1,114 @@
+"""
+SPX Prophet — Option Pricing Module
+Vectorized Black-Scholes for 0DTE SPX options: a strike ladder × underlying
+price grid × time-to-close grid priced in one broadcast. IV comes from the
+user or from realized 1-min volatility.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, date, time as dtime
+from typing import Optional, Sequence
+import pytz
+
+CT = pytz.timezone("America/Chicago")
+SPX_CLOSE = dtime(15, 0)
+MINUTES_PER_YEAR = 252 * 390          # trading-time clock: 0DTE decay happens during RTH
+MIN_MINUTES = 1.0
+HOLD_MINUTES = 30                     # assumed time for price to travel from entry to a level
+STRIKE_LADDER = (-10, -5, 0, 5, 10)   # points around the suggested strike
+IV_FLOOR, IV_CAP = 0.05, 1.50
+MULTIPLIER = 100
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Φ(x) via Abramowitz–Stegun 7.1.26 erf (|err| < 1.5e-7), fully vectorized."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def black_scholes(spot, strike, t_years, iv, is_call, rate: float = 0.0):
+    """
+    Price and delta for any broadcastable inputs (no dividend; rate ≈ 0 for 0DTE).
+    At expiry (t ≤ 0) returns intrinsic value and a 0/±1 delta.
+    """
+    spot, strike, t_years, iv = (np.asarray(a, dtype=np.float64) for a in (spot, strike, t_years, iv))
+    is_call = np.asarray(is_call, dtype=bool)
+    t = np.maximum(t_years, 0.0)
+    vol_t = iv * np.sqrt(t)
+    live = vol_t > 0
+    safe = np.where(live, vol_t, 1.0)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * iv * iv) * t) / safe
+    d2 = d1 - safe
+    disc = np.exp(-rate * t)
+    call = spot * _norm_cdf(d1) - strike * disc * _norm_cdf(d2)
+    put = call - spot + strike * disc
+    price = np.where(is_call, call, put)
+    delta = np.where(is_call, _norm_cdf(d1), _norm_cdf(d1) - 1.0)
+
+    intrinsic = np.where(is_call, np.maximum(spot - strike, 0.0), np.maximum(strike - spot, 0.0))
+    itm = np.where(is_call, spot > strike, spot < strike)
+    price = np.where(live, price, intrinsic)
+    delta = np.where(live, delta, np.where(itm, np.where(is_call, 1.0, -1.0), 0.0))
+    return price, delta
+
+
+def realized_vol(df_1min: pd.DataFrame, bars: int = 390) -> Optional[float]:
+    """Annualized close-to-close vol of the last `bars` 1-min returns, clipped to [IV_FLOOR, IV_CAP]."""
+    if df_1min is None or len(df_1min) < 30:
+        return None
+    close = df_1min["Close"].to_numpy(dtype=np.float64)[-(bars + 1):]
+    r = np.diff(np.log(close))
+    r = r[np.isfinite(r)]
+    if r.size < 20:
+        return None
+    return float(np.clip(r.std(ddof=1) * np.sqrt(MINUTES_PER_YEAR), IV_FLOOR, IV_CAP))
+
+
+def years_to_close(now: datetime, trading_date: Optional[date] = None) -> float:
+    """RTH time left until the 3:00 PM CT settlement, in trading years (never below one minute)."""
+    now = now.astimezone(CT)
+    d = trading_date or now.date()
+    close = CT.localize(datetime.combine(d, SPX_CLOSE))
+    minutes = (close - now).total_seconds() / 60.0
+    return max(min(minutes, 390.0), MIN_MINUTES) / MINUTES_PER_YEAR
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCENARIO GRID
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def price_scenarios(scenarios, t_years: float, iv: float, ladder: Sequence[float] = STRIKE_LADDER,
+                    hold_minutes: float = HOLD_MINUTES) -> None:
+    """
+    Fill premium fields on every SPX option scenario (those with a strike) from one
+    batched black_scholes call over scenarios × strike ladder × levels × (now, now + hold).
+    premium / delta are for the suggested strike at the entry level now; level_pnl is
+    $ per contract if price reaches stop / TP1-3 after hold_minutes; strike_ladder lists
+    (strike, premium at entry) around the suggestion.
+    """
+    priced = [s for s in scenarios if s.strike and s.direction in ("CALLS", "PUTS") and s.stop_loss]
+    if not priced:
+        return
+    levels = np.array([[s.entry_level, s.stop_loss, s.take_profit_1, s.take_profit_2, s.take_profit_3] for s in priced],
+                      dtype=np.float64)
+    lad = np.asarray(ladder, dtype=np.float64)
+    strikes = np.array([s.strike for s in priced], dtype=np.float64)[:, None] + lad[None, :]
+    is_call = np.array([s.direction == "CALLS" for s in priced])
+    minutes_now = t_years * MINUTES_PER_YEAR
+    t = np.array([minutes_now, max(minutes_now - hold_minutes, 0.0)]) / MINUTES_PER_YEAR
+
+    # (scenarios, strikes, levels, times)
+    price, delta = black_scholes(levels[:, None, :, None], strikes[:, :, None, None], t[None, None, None, :],
+                                 iv, is_call[:, None, None, None])
+    k0 = int(np.flatnonzero(lad == 0)[0]) if (lad == 0).any() else 0
+    for i, s in enumerate(priced):
+        s.premium = float(price[i, k0, 0, 0])
+        s.delta = float(delta[i, k0, 0, 0])
+        s.iv = iv
+        pnl = (price[i, k0, 1:, 1] - price[i, k0, 0, 0]) * MULTIPLIER
+        s.level_pnl = tuple(zip(("Stop", "TP1", "TP2", "TP3"), (float(v) for v in pnl)))
+        s.strike_ladder = tuple((int(k), float(p)) for k, p in zip(strikes[i], price[i, :, 0, 0]))
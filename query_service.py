@@ -0,0 +1,356 @@
+"""
+SPX Prophet — Query Service Module
+Local JSON/HTTP API for desk tools (execution bots, alerting) over the same
+state the dashboard shows: channel projections, 9 AM levels, zone assessment
+and the 8/50 cross monitor. Reads the shared-memory snapshot bus, so it adds
+no upstream load; each response body is built once per input version and
+served from memory (with ETag / 304) until anchors, bars or prices change.
+
+    python snapshot_bus.py feed &
+    python query_service.py serve [--bus prophet-bus] [--port 8765]
+    python query_service.py bench [--seconds 5] [--connections 4]
+
+    GET /levels                              current + 9 AM lines, ES and SPX
+    GET /projections?times=09:00,10:30       lines at given times (HH:MM on the channel date, or ISO)
+    GET /assessment?day=ascending&price=...  RTH zone / scenarios on the 9 AM SPX levels, Asian on ES now
+    GET /cross                               1/5/15-min CrossMonitorState and alignment
+    GET /health
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import asdict, replace
+from datetime import datetime, date, time as dtime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs
+import pytz
+
+from channel_builder import project_channel_values, get_channel_values_at_time, RTH_TIMES
+from snapshot_bus import SnapshotBusReader, BusSnapshot, DEFAULT_NAME, STALE_AFTER
+from trade_logic import assess_ascending_day, assess_descending_day, assess_asian_session, convert_es_to_spx
+
+CT = pytz.timezone("America/Chicago")
+DEFAULT_PORT = 8765
+MAX_CACHED = 1024          # distinct request targets kept (oldest dropped first)
+DAY_TYPES = ("ascending", "descending")
+
+
+class QueryError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(o):
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError(f"not JSON serializable: {type(o).__name__}")
+
+
+def _param(params: dict, name: str, default: Optional[str] = None) -> Optional[str]:
+    v = params.get(name)
+    return v[-1] if v else default
+
+
+def _nine_am(d: date) -> datetime:
+    return CT.localize(datetime.combine(d, dtime(9, 0)))
+
+
+def _parse_times(spec: Optional[str], d: date) -> list:
+    """'09:00,10:30' on d, or ISO datetimes; default RTH_TIMES."""
+    if not spec:
+        return [CT.localize(datetime.combine(d, t)) for _, t in RTH_TIMES]
+    out = []
+    for tok in spec.split(","):
+        tok = tok.strip()
+        try:
+            if "T" in tok or "-" in tok:
+                ts = pd.Timestamp(tok)
+                out.append(ts.tz_localize(CT) if ts.tzinfo is None else ts.tz_convert(CT))
+            else:
+                h, m = tok.split(":")
+                out.append(CT.localize(datetime.combine(d, dtime(int(h), int(m)))))
+        except (ValueError, TypeError):
+            raise QueryError(400, f"bad time '{tok}' (use HH:MM or ISO 8601)")
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINTS — each is (version key, body); the key lists exactly what the body reads,
+# so bodies carry no publish time (that is /health's "updated", keyed by seq)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _Versions:
+    """Per-snapshot input versions, computed once per bus sequence number."""
+
+    def __init__(self, snap: BusSnapshot):
+        b = snap.bars
+        self.anchors = (snap.channel_date, snap.channel_rev, snap.anchor_date, snap.slope,
+                        tuple((a.price, a.timestamp) for a in snap.anchors.values()))
+        self.bars = (len(b), b.index[-1].value, float(b["Close"].iloc[-1])) if len(b) else (0,)
+        self.offset = round(snap.offset.offset, 4)
+        self.quote = (snap.es, snap.spx)
+        self.now = tuple(snap.channels.values())
+
+
+def _require_channels(snap: BusSnapshot):
+    if snap.channel_system is None:
+        raise QueryError(404, "no channels published yet")
+    return snap.channel_system
+
+
+def _anchors_json(snap: BusSnapshot) -> dict:
+    return {r: {"price": a.price, "time": a.timestamp, "label": a.label} for r, a in snap.anchors.items()}
+
+
+def _levels(snap: BusSnapshot, v: _Versions, params: dict):
+    def body():
+        ch = _require_channels(snap)
+        v9 = get_channel_values_at_time(ch, _nine_am(snap.channel_date))
+        off = snap.offset.offset
+        return {"trading_date": snap.channel_date, "anchor_date": snap.anchor_date, "revision": snap.channel_rev,
+                "anchors": _anchors_json(snap), "slope": snap.slope,
+                "offset": {"value": off, "confidence": snap.offset.confidence},
+                "now": {"es": snap.channels, "spx": convert_es_to_spx(snap.channels, off)},
+                "nine_am": {"es": v9, "spx": convert_es_to_spx(v9, off)}}
+    return (v.anchors, v.offset, v.now), body
+
+
+def _projections(snap: BusSnapshot, v: _Versions, params: dict):
+    spec = _param(params, "times")
+    try:
+        d = date.fromisoformat(_param(params, "date")) if _param(params, "date") else snap.channel_date
+    except ValueError:
+        raise QueryError(400, "date must be YYYY-MM-DD")
+
+    def body():
+        ch = _require_channels(snap)
+        times = _parse_times(spec, d or snap.updated.date())
+        es = project_channel_values(ch, times)
+        off = snap.offset.offset
+        return {"trading_date": snap.channel_date, "revision": snap.channel_rev, "offset": off, "times": times,
+                "es": {k: None if a is None else a.tolist() for k, a in es.items()},
+                "spx": {k: None if a is None else (a - off).tolist() for k, a in es.items()}}
+    return (v.anchors, v.offset, spec, d), body
+
+
+def _assessment(snap: BusSnapshot, v: _Versions, params: dict):
+    day = _param(params, "day", "ascending").lower()
+    if day not in DAY_TYPES:
+        raise QueryError(400, f"day must be one of {', '.join(DAY_TYPES)}")
+    price_arg = _param(params, "price")
+    try:
+        price = float(price_arg) if price_arg else None
+    except ValueError:
+        raise QueryError(400, f"bad price '{price_arg}'")
+    if price is not None and not np.isfinite(price):
+        raise QueryError(400, f"price must be finite, got '{price_arg}'")
+
+    def body():
+        ch = _require_channels(snap)
+        off = snap.offset.offset
+        s9 = convert_es_to_spx(get_channel_values_at_time(ch, _nine_am(snap.channel_date)), off)
+        spx = price if price is not None else (snap.spx if snap.spx > 0 else snap.es - off)
+        rth = (assess_ascending_day if day == "ascending" else assess_descending_day)(spx, s9)
+        out = {"trading_date": snap.channel_date, "day_type": day, "spx_price": spx,
+               "offset": off, "nine_am_spx": s9, "rth": asdict(rth)}
+        if snap.es > 0 and snap.channels.get("desc_floor") is not None:
+            out["es_price"] = snap.es
+            out["asian"] = asdict(assess_asian_session(snap.es, snap.channels))
+        return out
+    return (v.anchors, v.offset, v.now, v.quote, day, price), body
+
+
+def _state_json(s) -> dict:
+    return asdict(replace(s, timeframes={}))
+
+
+def _cross(snap: BusSnapshot, v: _Versions, params: dict):
+    def body():
+        base = snap.cross_state()
+        out = _state_json(base)
+        out["timeframes"] = {tf: _state_json(s) for tf, s in base.timeframes.items()}
+        out["alignment"] = base.alignment
+        return out
+    return (v.bars, tuple(s.status for s in snap.cross.values())), body
+
+
+def _health(snap: BusSnapshot, v: _Versions, params: dict):
+    return (snap.seq,), lambda: {"seq": snap.seq, "updated": snap.updated, "bars": len(snap.bars),
+                                 "es": snap.es, "spx": snap.spx, "channels": snap.channel_system is not None}
+
+
+ROUTES: Dict[str, Callable] = {
+    "/levels": _levels,
+    "/projections": _projections,
+    "/assessment": _assessment,
+    "/cross": _cross,
+    "/health": _health,
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERVICE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class QueryService:
+    """
+    Transport-free core: get(target, if_none_match) → (status, etag, body bytes).
+    A body is rebuilt only when its version key changes; otherwise the cached
+    bytes (or a 304) are returned without touching pandas or json.
+    """
+
+    def __init__(self, reader: SnapshotBusReader, max_age: float = STALE_AFTER):
+        self.reader = reader
+        self.max_age = max_age
+        self._cache = {}                 # target → (key, etag, body)
+        self._versions = (None, None)    # (seq, _Versions)
+        self._lock = threading.Lock()
+        self.hits = self.builds = self.not_modified = 0
+
+    def _snapshot(self):
+        snap = self.reader.read(max_age=self.max_age)
+        if snap is None:
+            raise QueryError(503, "snapshot bus has no fresh data (is the feed process running?)")
+        seq, v = self._versions
+        if seq != snap.seq:
+            v = _Versions(snap)
+            self._versions = (snap.seq, v)
+        return snap, v
+
+    def get(self, target: str, if_none_match: Optional[str] = None) -> tuple:
+        path, _, query = target.partition("?")
+        route = ROUTES.get(path.rstrip("/") or "/health")
+        try:
+            if route is None:
+                raise QueryError(404, f"unknown endpoint {path}")
+            with self._lock:
+                snap, v = self._snapshot()
+                key, build = route(snap, v, parse_qs(query))
+                hit = self._cache.get(target)
+                if hit is not None and hit[0] == key:
+                    self.hits += 1
+                else:
+                    body = json.dumps(build(), default=_json_default, separators=(",", ":")).encode()
+                    hit = (key, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"', body)
+                    self._cache.pop(target, None)
+                    self._cache[target] = hit
+                    if len(self._cache) > MAX_CACHED:
+                        del self._cache[next(iter(self._cache))]
+                    self.builds += 1
+        except QueryError as e:
+            return e.status, None, json.dumps({"error": str(e)}).encode()
+        if if_none_match is not None and if_none_match == hit[1]:
+            self.not_modified += 1
+            return 304, hit[1], b""
+        return 200, hit[1], hit[2]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"        # keep-alive: one TCP connection per client, not per request
+    wbufsize = -1                        # headers + body leave in one send (flushed per request) ...
+    disable_nagle_algorithm = True       # ... and without waiting on the client's delayed ACK
+    service: QueryService = None
+
+    def do_GET(self):
+        status, etag, body = self.service.get(self.path, self.headers.get("If-None-Match"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service: QueryService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    handler = type("QueryHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def bench(host: str, port: int, seconds: float = 5.0, connections: int = 4,
+          paths=("/levels", "/cross", "/assessment?day=ascending", "/projections")) -> dict:
+    """Keep-alive clients cycling through paths, half of them revalidating with If-None-Match."""
+    counts, codes = [0] * connections, {}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def client(i):
+        conn = http.client.HTTPConnection(host, port)
+        etags = {}
+        n = 0
+        while time.perf_counter() < stop:
+            p = paths[n % len(paths)]
+            headers = {"If-None-Match": etags[p]} if (n & 1 and p in etags) else {}
+            conn.request("GET", p, headers=headers)
+            r = conn.getresponse()
+            r.read()
+            if r.getheader("ETag"):
+                etags[p] = r.getheader("ETag")
+            with lock:
+                codes[r.status] = codes.get(r.status, 0) + 1
+            n += 1
+        counts[i] = n
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(connections)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return {"requests": sum(counts), "rps": sum(counts) / elapsed, "status": codes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPX Prophet local query service")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="serve the JSON API")
+    s.add_argument("--bus", default=DEFAULT_NAME, help="snapshot bus segment name")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=DEFAULT_PORT)
+    b = sub.add_parser("bench", help="measure requests/s against a running service")
+    b.add_argument("--host", default="127.0.0.1")
+    b.add_argument("--port", type=int, default=DEFAULT_PORT)
+    b.add_argument("--seconds", type=float, default=5.0)
+    b.add_argument("--connections", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.cmd == "serve":
+        server = make_server(QueryService(SnapshotBusReader(args.bus)), args.host, args.port)
+        print(f"Serving http://{args.host}:{args.port} from snapshot bus '{args.bus}'")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+    else:
+        r = bench(args.host, args.port, args.seconds, args.connections)
+        print(f"{r['requests']:,} requests · {r['rps']:,.0f} req/s · status {r['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+SPX Prophet — Replay Module
+Drives the dashboard from a recorded session instead of the market.
+A virtual clock replaces datetime.now(CT); prices, the live 1-min frame and
+the session mode are all read at that clock, so crosses and line touches can
+be watched at 1×, 10×, 60× or as fast as the app can rerun (one bar per rerun).
+Rerun timings are kept, so a max-speed replay doubles as a soak test.
+Bars and prices go through the same bounded cache layer as the live fetchers,
+keyed on the virtual minute, so a replay exercises caching end to end.
+"""
+
+import itertools
+import os
+import time
+import weakref
+import pandas as pd
+import numpy as np
+from datetime import datetime, date, timedelta, time as dtime
+from typing import Optional
+import pytz
+
+from data_fetcher import _afternoon_slice, _prep_1min, OHLCV
+from bar_normalizer import normalize_bars, session_for
+from cache_layer import bounded_cache, LIVE, AFTERNOON, MB
+from tick_feed import LatencyStats
+
+CT = pytz.timezone("America/Chicago")
+SPEEDS = {"1×": 1.0, "10×": 10.0, "60×": 60.0, "max": 0.0}
+VISIBLE_DAYS = 2                 # same window as fetch_1min(period="2d")
+SESSION_OPEN = dtime(17, 0)      # Globex open, prior calendar day
+SESSION_CLOSE = dtime(16, 0)
+
+_SOURCES: "weakref.WeakValueDictionary[str, ReplaySession]" = weakref.WeakValueDictionary()
+_SOURCE_IDS = itertools.count(1)
+
+
+def load_bars(path: str) -> pd.DataFrame:
+    """Normalized 1-min OHLCV from a bar archive directory or a CSV with a timestamp index column."""
+    if os.path.isdir(path):
+        from bar_archive import BarArchive
+        return normalize_bars(BarArchive(path).frame())
+    df = pd.read_csv(path, index_col=0)
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True)).tz_convert(CT)
+    return normalize_bars(df)
+
+
+class VirtualClock:
+    """
+    start + elapsed wall time × speed. speed=0 is "max": the clock only moves
+    when tick() is called, one step per call.
+    """
+
+    def __init__(self, start: datetime, speed: float = 1.0, step: timedelta = timedelta(minutes=1)):
+        self.step = step
+        self._set(start, speed)
+
+    def _set(self, start: datetime, speed: float) -> None:
+        self.start = start
+        self.speed = speed
+        self._wall0 = time.monotonic()
+        self._ticks = 0
+
+    def now(self) -> datetime:
+        if self.speed <= 0:
+            return self.start + self._ticks * self.step
+        return self.start + timedelta(seconds=(time.monotonic() - self._wall0) * self.speed)
+
+    def tick(self) -> None:
+        self._ticks += 1
+
+    def set_speed(self, speed: float) -> None:
+        self._set(self.now(), speed)
+
+    def seek(self, t: datetime) -> None:
+        self._set(t, self.speed)
+
+
+class ReplaySession:
+    """
+    A recorded day served at the virtual clock. Bars are visible once closed
+    (start + 1 min ≤ now). SPX is ES − basis unless SPX bars are supplied.
+    """
+
+    def __init__(self, bars: pd.DataFrame, trading_date: date, speed: float = 60.0,
+                 start: Optional[dtime] = None, basis: float = 45.0, spx_bars: Optional[pd.DataFrame] = None):
+        self.bars = bars.sort_index()
+        self.trading_date = trading_date
+        self.basis = basis
+        self.spx_bars = spx_bars.sort_index() if spx_bars is not None else None
+        self.session_start = CT.localize(datetime.combine(trading_date - timedelta(days=1), SESSION_OPEN))
+        self.end = CT.localize(datetime.combine(trading_date, SESSION_CLOSE))
+        first = CT.localize(datetime.combine(trading_date, start)) if start else self.session_start
+        self.clock = VirtualClock(first, speed)
+        self.running = True
+        self.reruns = LatencyStats()
+        self._ts = self.bars.index.as_unit("ns").asi8
+        self.source_id = f"replay-{next(_SOURCE_IDS)}"     # cache key for this recording
+        _SOURCES[self.source_id] = self
+
+    @property
+    def speed_label(self) -> str:
+        return next((k for k, v in SPEEDS.items() if v == self.clock.speed), f"{self.clock.speed:g}×")
+
+    @property
+    def refresh_seconds(self) -> float:
+        """Rerun cadence: about one new bar per rerun, never slower than every 5 s."""
+        return 0.0 if self.clock.speed <= 0 else min(5.0, 60.0 / self.clock.speed)
+
+    def now(self) -> datetime:
+        return min(self.clock.now(), self.end)
+
+    @property
+    def finished(self) -> bool:
+        return self.now() >= self.end
+
+    def minute(self) -> pd.Timestamp:
+        """The virtual now floored to the minute: what bars are visible only changes on this."""
+        return pd.Timestamp(self.now()).floor("min")
+
+    def _cut(self, df: pd.DataFrame, ts_ns: np.ndarray, now: datetime) -> pd.DataFrame:
+        closed = pd.Timestamp(now - timedelta(minutes=1)).as_unit("ns").value
+        lo = pd.Timestamp(now - timedelta(days=VISIBLE_DAYS)).as_unit("ns").value
+        return df.iloc[np.searchsorted(ts_ns, lo, "left"):np.searchsorted(ts_ns, closed, "right")]
+
+    def _frame(self, symbol: str, minute: pd.Timestamp) -> pd.DataFrame:
+        """Closed bars at `minute`; "^GSPC" is the SPX recording, or ES − basis without one."""
+        if symbol == "^GSPC" and self.spx_bars is not None:
+            return self._cut(self.spx_bars, self.spx_bars.index.as_unit("ns").asi8, minute)[OHLCV]
+        df = self._cut(self.bars, self._ts, minute)[OHLCV]
+        if symbol == "^GSPC":
+            df = df.copy()
+            df[["Open", "High", "Low", "Close"]] -= self.basis
+        return df
+
+    def es_1min(self) -> pd.DataFrame:
+        """What fetch_es_1min() would have returned at the virtual now (EMAs included)."""
+        return replay_1min(self.source_id, "ES=F", self.minute())
+
+    def spx_1min(self) -> pd.DataFrame:
+        return replay_1min(self.source_id, "^GSPC", self.minute())
+
+    def es_price(self) -> tuple:
+        return replay_price(self.source_id, "ES=F", self.minute())
+
+    def spx_price(self) -> tuple:
+        return replay_price(self.source_id, "^GSPC", self.minute())
+
+    def afternoon(self, trading_date: date) -> tuple:
+        """The fetch_afternoon_1min equivalent from the recording (the prior session, already closed)."""
+        return replay_afternoon(self.source_id, trading_date)
+
+    def advance(self, rerun_seconds: float) -> None:
+        """Record one rerun and, in max mode, step the clock a bar."""
+        self.reruns.add(rerun_seconds)
+        if self.clock.speed <= 0:
+            self.clock.tick()
+        if self.finished:
+            self.running = False
+
+    def status(self) -> str:
+        s = self.reruns.summary()
+        lat = f" · rerun p50 {s['p50_ms']:.0f} ms p95 {s['p95_ms']:.0f} ms ({s['n']} reruns)" if s["n"] else ""
+        state = "▶" if self.running else "■"
+        return f"{state} REPLAY {self.trading_date:%b %d} {self.now():%I:%M %p} CT · {self.speed_label}{lat}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CACHED REPLAY FETCHERS (fetch_1min / fetch_price / fetch_afternoon_1min at the virtual minute)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@bounded_cache(LIVE, ttl=30, max_entries=16, max_bytes=32 * MB)
+def replay_1min(source: str, symbol: str, minute: pd.Timestamp) -> pd.DataFrame:
+    return _prep_1min(_SOURCES[source]._frame(symbol, minute), session_for(symbol))
+
+
+@bounded_cache(LIVE, ttl=30, max_entries=64, max_bytes=1 * MB)
+def replay_price(source: str, symbol: str, minute: pd.Timestamp) -> tuple:
+    df = _SOURCES[source]._frame(symbol, minute)
+    return (float(df["Close"].iloc[-1]), "replay") if not df.empty else (0.0, "replay")
+
+
+@bounded_cache(AFTERNOON, ttl=300, max_entries=32, max_bytes=8 * MB)
+def replay_afternoon(source: str, trading_date: date) -> tuple:
+    return _afternoon_slice(_SOURCES[source].bars, trading_date)
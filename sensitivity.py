@@ -0,0 +1,85 @@
+"""
+SPX Prophet — Sensitivity Module
+How far each projected line moves when the anchors are slightly wrong.
+Every anchor is perturbed over a price × time (× slope) grid and all six lines
+are evaluated at the target times in one broadcast; bands are the min/max.
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+from dataclasses import dataclass
+from typing import Dict, Sequence
+
+from channel_builder import ChannelSystem, count_blocks_array
+
+PRICE_OFFSETS = (-1.0, -0.5, -0.25, 0.0, 0.25, 0.5, 1.0)   # points
+BLOCK_OFFSETS = (-1, 0, 1)                                # 30-min blocks of anchor time
+SLOPE_OFFSETS = (0.0,)                                    # points per block, applied to |slope|
+LINE_KEYS = ("asc_extreme", "asc_ceiling", "asc_floor", "desc_ceiling", "desc_floor", "desc_extreme")
+
+
+@dataclass
+class SensitivityBands:
+    times: pd.DatetimeIndex
+    base: Dict[str, np.ndarray]
+    low: Dict[str, np.ndarray]
+    high: Dict[str, np.ndarray]
+
+    def at(self, i: int = 0, offset: float = 0.0) -> Dict[str, tuple]:
+        """{line: (low, base, high)} at the i-th time, shifted by offset (ES → SPX)."""
+        return {k: (self.low[k][i] - offset, self.base[k][i] - offset, self.high[k][i] - offset) for k in self.base}
+
+    def to_frame(self, i: int = 0, offset: float = 0.0) -> pd.DataFrame:
+        rows = [{"Line": k, "Low": lo, "Level": b, "High": hi, "Spread": hi - lo}
+                for k, (lo, b, hi) in self.at(i, offset).items()]
+        return pd.DataFrame(rows)
+
+
+def _lines(channels: ChannelSystem) -> dict:
+    return {
+        "asc_extreme": channels.ascending.extreme_line, "asc_ceiling": channels.ascending.ceiling,
+        "asc_floor": channels.ascending.floor, "desc_ceiling": channels.descending.ceiling,
+        "desc_floor": channels.descending.floor, "desc_extreme": channels.descending.extreme_line,
+    }
+
+
+def sensitivity_bands(channels: ChannelSystem, times, price_offsets: Sequence[float] = PRICE_OFFSETS,
+                      block_offsets: Sequence[int] = BLOCK_OFFSETS,
+                      slope_offsets: Sequence[float] = SLOPE_OFFSETS) -> SensitivityBands:
+    """
+    Min/max of every line at every time over all anchor perturbations.
+    Each line depends on one anchor, so a line's band is its own anchor's grid;
+    block counts are computed once per (anchor, time shift) and broadcast as
+    lines × time shifts × price offsets × slope offsets × times.
+    """
+    times = pd.DatetimeIndex(times)
+    lines = {k: ln for k, ln in _lines(channels).items() if ln is not None}
+    keys = list(lines)
+
+    cache = {}
+
+    def shifted_blocks(anchor_ts, shift):
+        if (anchor_ts, shift) not in cache:
+            cache[(anchor_ts, shift)] = count_blocks_array(anchor_ts + timedelta(minutes=30 * shift), times)
+        return cache[(anchor_ts, shift)]
+
+    blocks = np.array([[shifted_blocks(lines[k].anchor.timestamp, s) for s in block_offsets] for k in keys])
+    base_blocks = np.array([shifted_blocks(lines[k].anchor.timestamp, 0) for k in keys])
+
+    price = np.array([lines[k].anchor.price for k in keys])
+    slope = np.array([lines[k].slope for k in keys])
+    slopes = slope[:, None] + np.sign(slope)[:, None] * np.asarray(slope_offsets, dtype=np.float64)[None, :]
+    dp = np.asarray(price_offsets, dtype=np.float64)
+
+    # (lines, time shifts, price offsets, slope offsets, times)
+    grid = (price[:, None, None, None, None] + dp[None, None, :, None, None]
+            + slopes[:, None, None, :, None] * blocks[:, :, None, None, :])
+    low = grid.min(axis=(1, 2, 3))
+    high = grid.max(axis=(1, 2, 3))
+    base = price[:, None] + slope[:, None] * base_blocks
+
+    return SensitivityBands(times=times,
+                            base={k: base[i] for i, k in enumerate(keys)},
+                            low={k: low[i] for i, k in enumerate(keys)},
+                            high={k: high[i] for i, k in enumerate(keys)})
@@ -0,0 +1,248 @@
+"""
+SPX Prophet — Snapshot Module
+Pre-market channel snapshot: after the 3:05 PM CT close the job detects the
+anchors, builds the next trading day's ChannelSystem and precomputes every
+table the dashboard shows, then writes one versioned gzip JSON file the app
+restores at startup without touching the network.
+
+    python snapshot.py build [--date YYYY-MM-DD]      # one snapshot for a trading date
+    python snapshot.py schedule                       # daemon: build after every weekday close
+    python snapshot.py show snapshots/ES_2026-10-19.json.gz
+
+Cron equivalent of `schedule`:  6 15 * * 1-5  cd /app && python snapshot.py build   (CT host clock)
+"""
+
+import argparse
+import gzip
+import json
+import os
+import time
+import pandas as pd
+from datetime import datetime, date, timedelta, time as dtime
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import pytz
+
+from channel_builder import (AnchorPoint, ChannelSystem, build_channels, get_channel_values_at_time,
+                             projection_tables, rank_anchor_candidates, select_anchors, CANDIDATE_COLUMNS,
+                             ROLE_LABELS, SLOPE)
+from data_fetcher import fetch_afternoon_1min, fetch_afternoon_30min
+
+CT = pytz.timezone("America/Chicago")
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+BUILD_AFTER = dtime(15, 5)
+ROLES = ("lb", "hr", "hw", "lw")
+
+
+@dataclass
+class ChannelSnapshot:
+    trading_date: date
+    anchor_date: date
+    symbol: str
+    slope: float
+    created: datetime
+    anchors: Dict[str, AnchorPoint]
+    tables: Dict[str, pd.DataFrame]          # ES levels; RTH is shown in SPX by subtracting the offset
+    nine_am: Dict[str, Optional[float]]
+    widths: Dict[str, float]
+    candidates: Dict[str, pd.DataFrame] = field(default_factory=dict)
+
+    @property
+    def channels(self) -> ChannelSystem:
+        a = self.anchors
+        return build_channels(a["lb"], a["hr"], a["hw"], a["lw"], slope=self.slope)
+
+    def matches(self, trading_date: date, anchor_points, slope: float = SLOPE) -> bool:
+        """True when the dashboard inputs are exactly what this snapshot was built from."""
+        if trading_date != self.trading_date or abs(slope - self.slope) > 1e-12:
+            return False
+        mine = [(round(self.anchors[r].price, 2), self.anchors[r].timestamp) for r in ROLES]
+        theirs = [(round(ap.price, 2), ap.timestamp) for ap in anchor_points]
+        return mine == theirs
+
+
+def next_trading_date(d: date) -> date:
+    d += timedelta(days=1)
+    while d.weekday() >= 5:
+        d += timedelta(days=1)
+    return d
+
+
+def snapshot_path(trading_date: date, symbol: str = "ES=F", directory: str = SNAPSHOT_DIR) -> str:
+    return os.path.join(directory, f"{symbol.split('=')[0].lstrip('^')}_{trading_date.isoformat()}.json.gz")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BUILD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def build_snapshot(trading_date: date, symbol: str = "ES=F", slope: float = SLOPE) -> Optional[ChannelSnapshot]:
+    """Detect anchors from the prior session's afternoon and precompute everything the tabs display."""
+    df, anchor_date = fetch_afternoon_1min(trading_date, symbol)
+    df_30m, anchor_date_30 = fetch_afternoon_30min(trading_date, symbol)
+    anchor_date = anchor_date or anchor_date_30
+    if df.empty and df_30m.empty:
+        return None
+    candidates = rank_anchor_candidates(df, df_30m)
+    if candidates["lb"].empty or candidates["hr"].empty:
+        return None
+    anchors = select_anchors(candidates)
+    channels = build_channels(anchors["lb"], anchors["hr"], anchors["hw"], anchors["lw"], slope=slope)
+
+    v9 = get_channel_values_at_time(channels, CT.localize(datetime.combine(trading_date, dtime(9, 0))))
+    return ChannelSnapshot(
+        trading_date=trading_date, anchor_date=anchor_date, symbol=symbol, slope=slope,
+        created=datetime.now(CT), anchors=anchors,
+        tables=projection_tables(channels, trading_date, anchor_date),
+        nine_am=v9,
+        widths={"asc": abs(v9["asc_ceiling"] - v9["asc_floor"]), "desc": abs(v9["desc_ceiling"] - v9["desc_floor"])},
+        candidates=candidates,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERIALIZATION (versioned gzip JSON, columnar tables)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _table_to_json(df: pd.DataFrame) -> dict:
+    return {c: (df[c].round(2).tolist() if df[c].dtype.kind == "f" else
+                [v.isoformat() if hasattr(v, "isoformat") else v for v in df[c]]) for c in df.columns}
+
+
+def save_snapshot(snap: ChannelSnapshot, directory: str = SNAPSHOT_DIR) -> str:
+    """Write atomically (tmp + rename) so a reader never sees a partial file."""
+    os.makedirs(directory, exist_ok=True)
+    doc = {
+        "version": SNAPSHOT_VERSION,
+        "created": snap.created.isoformat(),
+        "trading_date": snap.trading_date.isoformat(),
+        "anchor_date": snap.anchor_date.isoformat(),
+        "symbol": snap.symbol,
+        "slope": snap.slope,
+        "anchors": {r: [snap.anchors[r].price, snap.anchors[r].timestamp.isoformat()] for r in ROLES},
+        "tables": {k: _table_to_json(df) for k, df in snap.tables.items()},
+        "nine_am": snap.nine_am,
+        "widths": snap.widths,
+        "candidates": {r: _table_to_json(df) for r, df in snap.candidates.items()},
+    }
+    path = snapshot_path(snap.trading_date, snap.symbol, directory)
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(doc, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def read_snapshot(path: str) -> Optional[ChannelSnapshot]:
+    """Load a snapshot file; None if missing, unreadable or from another format version."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if doc.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    def stamp(s):
+        return pd.Timestamp(s).tz_convert(CT)
+
+    def table(cols, time_cols=()):
+        df = pd.DataFrame(cols)
+        for c in time_cols:
+            if c in df.columns:
+                df[c] = pd.to_datetime(df[c], utc=True).dt.tz_convert(CT)
+        return df
+
+    return ChannelSnapshot(
+        trading_date=date.fromisoformat(doc["trading_date"]),
+        anchor_date=date.fromisoformat(doc["anchor_date"]),
+        symbol=doc["symbol"], slope=doc["slope"],
+        created=datetime.fromisoformat(doc["created"]),
+        anchors={r: AnchorPoint(p, stamp(t), ROLE_LABELS[r]) for r, (p, t) in doc["anchors"].items()},
+        tables={k: table(v) for k, v in doc["tables"].items()},
+        nine_am=doc["nine_am"], widths=doc["widths"],
+        candidates={r: table(v, ("timestamp", "detected_at")).reindex(columns=CANDIDATE_COLUMNS)
+                    for r, v in doc.get("candidates", {}).items()},
+    )
+
+
+def load_snapshot(trading_date: date, symbol: str = "ES=F", directory: str = SNAPSHOT_DIR) -> Optional[ChannelSnapshot]:
+    return read_snapshot(snapshot_path(trading_date, symbol, directory))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# JOB
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_job(trading_date: Optional[date] = None, symbol: str = "ES=F", directory: str = SNAPSHOT_DIR) -> Optional[str]:
+    """Build and save. Default target is the next trading day after today's close."""
+    trading_date = trading_date or next_trading_date(datetime.now(CT).date())
+    snap = build_snapshot(trading_date, symbol)
+    if snap is None:
+        print(f"{trading_date}: no anchors detected, snapshot not written")
+        return None
+    path = save_snapshot(snap, directory)
+    a = snap.anchors
+    print(f"{trading_date}: LB {a['lb'].price:,.2f} HR {a['hr'].price:,.2f} HW {a['hw'].price:,.2f} "
+          f"LW {a['lw'].price:,.2f} (from {snap.anchor_date}) → {path}")
+    return path
+
+
+def seconds_until_next_run(now: datetime) -> float:
+    """Seconds to a minute after BUILD_AFTER CT on the next weekday, localized per day so DST shifts are honored."""
+    now = now.astimezone(CT)
+    run_at = dtime(BUILD_AFTER.hour, BUILD_AFTER.minute + 1)
+    d = now.date()
+    while True:
+        if d.weekday() < 5:
+            target = CT.localize(datetime.combine(d, run_at))
+            if target > now:
+                return (target - now).total_seconds()
+        d += timedelta(days=1)
+
+
+def schedule(symbol: str = "ES=F", directory: str = SNAPSHOT_DIR, retries: int = 3, retry_wait: float = 300.0) -> None:
+    """Sleep until a minute after BUILD_AFTER each weekday and build; retry while data is still settling."""
+    while True:
+        time.sleep(seconds_until_next_run(datetime.now(CT)))
+        for attempt in range(retries):
+            try:
+                if run_job(symbol=symbol, directory=directory):
+                    break
+            except Exception as e:
+                print(f"snapshot attempt {attempt + 1} failed: {e}")
+            time.sleep(retry_wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPX Prophet pre-market channel snapshot")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="build one snapshot now")
+    b.add_argument("--date", type=date.fromisoformat, help="trading date (default: next trading day)")
+    b.add_argument("--symbol", default="ES=F")
+    b.add_argument("--dir", default=SNAPSHOT_DIR)
+    s = sub.add_parser("schedule", help="build after every weekday close")
+    s.add_argument("--symbol", default="ES=F")
+    s.add_argument("--dir", default=SNAPSHOT_DIR)
+    sh = sub.add_parser("show", help="print a snapshot file")
+    sh.add_argument("path")
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        run_job(args.date, args.symbol, args.dir)
+    elif args.cmd == "schedule":
+        schedule(args.symbol, args.dir)
+    else:
+        snap = read_snapshot(args.path)
+        if snap is None:
+            print("unreadable or unsupported snapshot")
+            return
+        print(f"{snap.symbol} for {snap.trading_date} (anchors {snap.anchor_date}, built {snap.created:%Y-%m-%d %H:%M %Z})")
+        for r in ROLES:
+            print(f"  {snap.anchors[r].label:<18} {snap.anchors[r].price:>10,.2f}  {snap.anchors[r].timestamp:%I:%M %p}")
+        print(f"  9 AM widths: asc {snap.widths['asc']:.2f}  desc {snap.widths['desc']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
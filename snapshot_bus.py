@@ -0,0 +1,485 @@
+"""
+SPX Prophet — Snapshot Bus Module
+One feed process polls upstream and publishes the latest prices, the 1-min
+bar ring buffer (with its EMA columns), the offset estimate, the 1/5/15-min
+8/50 cross state, the live anchors and current channel values into a single
+multiprocessing.shared_memory segment. Every Streamlit worker attaches to the
+same segment, so upstream load and feed memory stay constant however many
+app processes run.
+
+Consistency is a sequence lock: the writer makes `seq` odd, writes, then makes
+it even again; a reader that sees an odd or changed `seq` retries. A publish
+that raises leaves `seq` odd, so readers keep their last snapshot until the
+next publish completes.
+
+    python snapshot_bus.py feed [--name prophet-bus] [--interval 5]
+    python snapshot_bus.py feed --replay bars/ --date 2026-10-16 --speed 60
+    python snapshot_bus.py show [--name prophet-bus]
+    PROPHET_BUS=prophet-bus streamlit run app.py
+"""
+
+import argparse
+import os
+import threading
+import time
+import pandas as pd
+import numpy as np
+from datetime import datetime, date
+from functools import cached_property
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+import pytz
+
+from bar_store import RingBarStore, BARS_PER_SESSION, COLUMNS, frame_from_arrays
+from channel_builder import AnchorPoint, ChannelSystem, build_channels, get_channel_values_at_time, ROLE_LABELS
+from cross_detector import CrossEvent, CrossMonitorState, MultiTimeframeCrossMonitor, TIMEFRAMES
+from offset_estimator import OffsetEstimate, OffsetEstimator
+
+CT = pytz.timezone("America/Chicago")
+DEFAULT_NAME = "prophet-bus"
+BUS_ENV = "PROPHET_BUS"          # app.py reads the bus when this names a segment
+BUS_MAGIC = 0x50524F50           # "PROP"
+BUS_VERSION = 3
+STALE_AFTER = 90.0               # seconds without a publish before readers fall back to fetching
+RECENT_CROSSES = 5               # what _build_state keeps in recent_crosses
+CHANNEL_KEYS = ("asc_floor", "asc_ceiling", "asc_extreme", "desc_ceiling", "desc_floor", "desc_extreme")
+CONFIDENCE = ("NONE", "LOW", "MEDIUM", "HIGH")
+ANCHOR_ROLES = ("lb", "hr", "hw", "lw")          # build_channels argument order
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SEGMENT LAYOUT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_CROSS = np.dtype([("ts", "<i8"), ("bullish", "u1"), ("valid_div", "u1"), ("valid_timing", "u1"), ("valid", "u1"),
+                   ("nearest_hour", "S12"), ("divergence", "<f8"), ("price", "<f8"), ("ema8", "<f8"), ("ema50", "<f8")],
+                  align=True)
+_STATE = np.dtype([("ema8", "<f8"), ("ema50", "<f8"), ("price", "<f8"), ("max_div", "<f8"), ("diverged", "u1"),
+                   ("n_cross", "u1"), ("status", "S24"), ("detail", "S160"), ("crosses", _CROSS, (RECENT_CROSSES,))],
+                  align=True)
+_HEADER = np.dtype([
+    ("magic", "<u4"), ("version", "<u4"), ("seq", "<u8"),
+    ("capacity", "<u4"), ("head", "<u4"), ("size", "<u4"), ("pid", "<u4"),
+    ("updated_ns", "<i8"),
+    ("es", "<f8"), ("spx", "<f8"), ("es_src", "S16"), ("spx_src", "S16"),
+    ("offset", "<f8"), ("offset_dispersion", "<f8"), ("offset_samples", "<i8"), ("offset_rejected", "<i8"),
+    ("offset_conf", "u1"),
+    ("alignment", "S32"),
+    ("cross", _STATE, (len(TIMEFRAMES),)),
+    ("channel_date", "<i8"), ("channel_rev", "<u4"), ("channels", "<f8", (len(CHANNEL_KEYS),)),
+    ("anchor_date", "<i8"), ("slope", "<f8"),
+    ("anchor_price", "<f8", (len(ANCHOR_ROLES),)), ("anchor_ns", "<i8", (len(ANCHOR_ROLES),)),
+], align=True)
+_HEADER_BYTES = -(-_HEADER.itemsize // 64) * 64
+
+
+def segment_size(capacity: int) -> int:
+    return _HEADER_BYTES + 2 * capacity * 8 * (1 + len(COLUMNS))
+
+
+def _map(buf, capacity: int) -> tuple:
+    """(header, ts, data) numpy views on the segment; nothing is copied."""
+    header = np.ndarray((), dtype=_HEADER, buffer=buf)
+    ts = np.ndarray(2 * capacity, dtype=np.int64, buffer=buf, offset=_HEADER_BYTES)
+    data = np.ndarray((len(COLUMNS), 2 * capacity), dtype=np.float64, buffer=buf,
+                      offset=_HEADER_BYTES + 2 * capacity * 8)
+    return header, ts, data
+
+
+def _text(b) -> str:
+    return np.asarray(b).item().decode("utf-8", errors="ignore")
+
+
+def _bytes(s: str, n: int) -> bytes:
+    return s.encode("utf-8")[:n]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WRITER (the one feed process)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class SnapshotBusWriter:
+    """
+    Owns the segment. The bar ring is a RingBarStore whose arrays live in shared
+    memory, so extend_frame() writes straight into what readers map. Only one
+    writer per name: a leftover segment from a crashed feed is replaced.
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME, sessions: int = 2):
+        self.name = name
+        capacity = sessions * BARS_PER_SESSION
+        size = segment_size(capacity)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            old = shared_memory.SharedMemory(name=name)
+            old.close()
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.header, ts, data = _map(self.shm.buf, capacity)
+        self.header[()] = np.zeros((), dtype=_HEADER)
+        self.store = RingBarStore(sessions=sessions, ts=ts, data=data)
+        self.header["capacity"] = capacity
+        self.header["pid"] = os.getpid()
+        self.header["magic"] = BUS_MAGIC
+        self.header["version"] = BUS_VERSION
+
+    def publish(self, now: datetime, es_1min: pd.DataFrame, es: tuple, spx: tuple, offset: OffsetEstimate,
+                cross: Optional[CrossMonitorState], tracked=None) -> int:
+        """
+        Write one consistent update. es / spx are (price, source); cross is the
+        multi-timeframe base state; tracked is a TrackedChannels (anchors, channels,
+        trading date, revision) or None. Returns the new sequence number.
+        """
+        h = self.header
+        h["seq"] |= 1                                   # odd: readers retry until the update is complete
+        self.store.extend_frame(es_1min)
+        h["head"], h["size"] = self.store._head, self.store._size
+        h["es"], h["es_src"] = es[0], _bytes(es[1], 16)
+        h["spx"], h["spx_src"] = spx[0], _bytes(spx[1], 16)
+        h["offset"], h["offset_dispersion"] = offset.offset, offset.dispersion
+        h["offset_samples"], h["offset_rejected"] = offset.samples, offset.rejected
+        h["offset_conf"] = CONFIDENCE.index(offset.confidence) if offset.confidence in CONFIDENCE else 0
+        if cross is not None:
+            self._write_cross(cross)
+        if tracked is None:
+            h["channel_date"], h["channel_rev"], h["anchor_date"] = 0, 0, 0
+            h["channels"] = np.nan
+        else:
+            vals = get_channel_values_at_time(tracked.channels, now)
+            h["channel_date"], h["channel_rev"] = tracked.trading_date.toordinal(), tracked.revision
+            h["channels"] = [np.nan if vals.get(k) is None else vals[k] for k in CHANNEL_KEYS]
+            h["anchor_date"], h["slope"] = tracked.anchor_date.toordinal(), abs(tracked.channels.ascending.floor.slope)
+            h["anchor_price"] = [tracked.anchors[r].price for r in ANCHOR_ROLES]
+            h["anchor_ns"] = [pd.Timestamp(tracked.anchors[r].timestamp).as_unit("ns").value for r in ANCHOR_ROLES]
+        h["updated_ns"] = pd.Timestamp(now).as_unit("ns").value
+        h["seq"] += 1                                   # even only once the whole update landed
+        return int(h["seq"])
+
+    def _write_cross(self, cross: CrossMonitorState) -> None:
+        h = self.header
+        h["alignment"] = _bytes(cross.alignment, 32)
+        states = cross.timeframes or {cross.timeframe: cross}
+        for i, m in enumerate(TIMEFRAMES):
+            s = states.get(f"{m}m")
+            row = h["cross"][i]
+            if s is None:
+                row["status"], row["n_cross"] = b"NO DATA", 0
+                continue
+            row["ema8"], row["ema50"], row["price"] = s.current_ema_8, s.current_ema_50, s.current_price
+            row["max_div"], row["diverged"] = s.max_divergence, s.is_diverged_enough
+            row["status"], row["detail"] = _bytes(s.status, 24), _bytes(s.status_detail, 160)
+            recent = s.recent_crosses[-RECENT_CROSSES:]
+            row["n_cross"] = len(recent)
+            for j, cx in enumerate(recent):
+                c = row["crosses"][j]
+                c["ts"] = pd.Timestamp(cx.timestamp).as_unit("ns").value
+                c["bullish"] = cx.cross_type == "bullish"
+                c["valid_div"], c["valid_timing"], c["valid"] = cx.is_valid_divergence, cx.is_valid_timing, cx.is_valid
+                c["nearest_hour"] = _bytes(cx.nearest_hour, 12)
+                c["divergence"], c["price"], c["ema8"], c["ema50"] = cx.divergence, cx.price_at_cross, cx.ema_8, cx.ema_50
+
+    def close(self, unlink: bool = True) -> None:
+        del self.header, self.store
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# READER (every app process)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class BusSnapshot:
+    seq: int
+    updated: datetime
+    es: float
+    es_src: str
+    spx: float
+    spx_src: str
+    offset: OffsetEstimate
+    bars: pd.DataFrame                           # RingBarStore.to_frame() layout, shared by every caller
+    cross: Dict[str, CrossMonitorState] = field(default_factory=dict)
+    alignment: str = ""
+    channel_date: Optional[date] = None
+    channel_rev: int = 0
+    channels: Dict[str, Optional[float]] = field(default_factory=dict)      # at `updated`
+    anchor_date: Optional[date] = None
+    anchors: Dict[str, AnchorPoint] = field(default_factory=dict)
+    slope: float = 0.0
+
+    @cached_property
+    def channel_system(self) -> Optional[ChannelSystem]:
+        """The published anchors rebuilt into a ChannelSystem, for projections at any time."""
+        if not self.anchors:
+            return None
+        return build_channels(*(self.anchors[r] for r in ANCHOR_ROLES), slope=self.slope)
+
+    def age(self, now: datetime) -> float:
+        return (now - self.updated).total_seconds()
+
+    def cross_state(self) -> CrossMonitorState:
+        """A fresh copy of the 1-min state with the other timeframes attached (callers may mutate it)."""
+        states = {tf: _copy_state(s) for tf, s in self.cross.items()}
+        base = states.get(f"{TIMEFRAMES[0]}m") or CrossMonitorState(0, 0, 0, 0, 0, False, "NO DATA", "Waiting for ES 1-min data...")
+        base.timeframes = states
+        base.alignment = self.alignment
+        return base
+
+
+def _copy_state(s: CrossMonitorState) -> CrossMonitorState:
+    return CrossMonitorState(s.current_spread, s.current_ema_8, s.current_ema_50, s.current_price, s.max_divergence,
+                             s.is_diverged_enough, s.status, s.status_detail, s.last_cross, list(s.recent_crosses),
+                             s.timeframe)
+
+
+def _read_cross(row, tf: str) -> CrossMonitorState:
+    crosses = []
+    for c in row["crosses"][:int(row["n_cross"])]:
+        crosses.append(CrossEvent(
+            timestamp=pd.Timestamp(int(c["ts"])).tz_localize("UTC").tz_convert(CT), cross_type="bullish" if c["bullish"] else "bearish",
+            divergence=float(c["divergence"]), price_at_cross=float(c["price"]), ema_8=float(c["ema8"]), ema_50=float(c["ema50"]),
+            is_valid_divergence=bool(c["valid_div"]), is_valid_timing=bool(c["valid_timing"]), is_valid=bool(c["valid"]),
+            nearest_hour=_text(c["nearest_hour"])))
+    ema8, ema50 = float(row["ema8"]), float(row["ema50"])
+    return CrossMonitorState(ema8 - ema50, ema8, ema50, float(row["price"]), float(row["max_div"]), bool(row["diverged"]),
+                             _text(row["status"]), _text(row["detail"]), crosses[-1] if crosses else None, crosses, tf)
+
+
+class SnapshotBusReader:
+    """
+    Attaches lazily (the feed may start after the app) and re-attaches if the
+    feed restarts. read() returns the last BusSnapshot without touching the
+    segment's bars until `seq` moves; one reader per process serves every session.
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME, retries: int = 100):
+        self.name = name
+        self.retries = retries
+        self.shm = None
+        self.header = None
+        self.store: Optional[RingBarStore] = None
+        self._last: Optional[BusSnapshot] = None
+        self._lock = threading.Lock()
+
+    def _attach(self) -> bool:
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except (FileNotFoundError, ValueError):
+            return False
+        header = np.ndarray((), dtype=_HEADER, buffer=shm.buf)
+        # attaching must not register another process's segment: the tracker would unlink it when this
+        # process exits. The writer's own registration (same pid) is what unlinks it, so keep that one.
+        if header["magic"] != BUS_MAGIC or int(header["pid"]) != os.getpid():
+            resource_tracker.unregister(shm._name, "shared_memory")
+        if header["magic"] != BUS_MAGIC or header["version"] != BUS_VERSION:
+            del header
+            shm.close()
+            return False
+        capacity = int(header["capacity"])
+        self.header, ts, data = _map(shm.buf, capacity)
+        self.store = RingBarStore(sessions=1, bars_per_session=capacity, ts=ts, data=data)
+        self.shm, self._last = shm, None
+        return True
+
+    def _detach(self) -> None:
+        self.header = self.store = self._last = None
+        if self.shm is not None:
+            self.shm.close()
+        self.shm = None
+
+    def read(self, max_age: Optional[float] = None, now: Optional[datetime] = None) -> Optional[BusSnapshot]:
+        """Latest consistent snapshot, or None when there is no feed (or it is older than max_age seconds)."""
+        with self._lock:
+            snap = self._read()
+            if snap is None or max_age is None:
+                return snap
+            if snap.age(now or datetime.now(CT)) <= max_age:
+                return snap
+            self._detach()                           # a restarted feed publishes on a fresh segment
+            snap = self._read()
+        return snap if snap is not None and snap.age(now or datetime.now(CT)) <= max_age else None
+
+    def _read(self) -> Optional[BusSnapshot]:
+        if self.shm is None and not self._attach():
+            return None
+        h = self.header
+        for _ in range(self.retries):
+            s1 = int(h["seq"])
+            if s1 & 1:
+                time.sleep(0)
+                continue
+            if self._last is not None and s1 == self._last.seq:
+                return self._last
+            if s1 == 0:                              # created, nothing published yet
+                return None
+            hdr = h.copy()
+            store = self.store
+            store._head, store._size = int(hdr["head"]), int(hdr["size"])
+            w = store._window(None)
+            ts, data = store._ts[w].copy(), store._data[:, w].copy()
+            if int(h["seq"]) != s1:
+                continue
+            self._last = self._build(s1, hdr, ts, data)
+            return self._last
+        return self._last
+
+    def views(self) -> Optional[tuple]:
+        """
+        (seq, ts, data) zero-copy views of the bar window published at `seq`, without the copy
+        that read() makes. The writer may overwrite them: use them only while unchanged(seq) holds,
+        and check it again after use.
+        """
+        with self._lock:
+            snap = self._read()
+            if snap is None:
+                return None
+            w = self.store._window(None)
+            return snap.seq, self.store._ts[w], self.store._data[:, w]
+
+    def unchanged(self, seq: int) -> bool:
+        """For zero-copy users of `store`: True when nothing was written since `seq` was read."""
+        return self.header is not None and int(self.header["seq"]) == seq
+
+    @staticmethod
+    def _build(seq: int, hdr, ts: np.ndarray, data: np.ndarray) -> BusSnapshot:
+        bars = frame_from_arrays(ts, data) if len(ts) else pd.DataFrame()
+        conf = int(hdr["offset_conf"])
+        offset = OffsetEstimate(float(hdr["offset"]), CONFIDENCE[conf] if conf < len(CONFIDENCE) else "NONE",
+                                int(hdr["offset_samples"]), float(hdr["offset_dispersion"]), int(hdr["offset_rejected"]))
+        cross = {f"{m}m": _read_cross(hdr["cross"][i], f"{m}m") for i, m in enumerate(TIMEFRAMES)
+                 if _text(hdr["cross"][i]["status"])}
+        vals = [float(v) for v in hdr["channels"]]
+        anchors = {r: AnchorPoint(float(p), pd.Timestamp(int(t)).tz_localize("UTC").tz_convert(CT), ROLE_LABELS[r])
+                   for r, p, t in zip(ANCHOR_ROLES, hdr["anchor_price"], hdr["anchor_ns"])} if hdr["anchor_date"] else {}
+        return BusSnapshot(
+            seq=seq, updated=datetime.fromtimestamp(int(hdr["updated_ns"]) / 1e9, CT),
+            es=float(hdr["es"]), es_src=_text(hdr["es_src"]), spx=float(hdr["spx"]), spx_src=_text(hdr["spx_src"]),
+            offset=offset, bars=bars, cross=cross, alignment=_text(hdr["alignment"]),
+            channel_date=date.fromordinal(int(hdr["channel_date"])) if hdr["channel_date"] else None,
+            channel_rev=int(hdr["channel_rev"]),
+            channels={k: None if np.isnan(v) else v for k, v in zip(CHANNEL_KEYS, vals)},
+            anchor_date=date.fromordinal(int(hdr["anchor_date"])) if hdr["anchor_date"] else None,
+            anchors=anchors, slope=float(hdr["slope"]))
+
+    def close(self) -> None:
+        with self._lock:
+            self._detach()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FEED PROCESS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class BusFeed:
+    """
+    The upstream side: the only place that fetches. Each step pulls ES / SPX
+    bars and prices (or reads them from a ReplaySession), advances the offset
+    estimator, cross monitor and anchor tracker once, and publishes.
+    """
+
+    def __init__(self, writer: SnapshotBusWriter, replay=None):
+        from anchor_tracker import AnchorTracker
+        self.writer = writer
+        self.replay = replay
+        self.estimator = OffsetEstimator()
+        self.cross = MultiTimeframeCrossMonitor()
+        self.tracker = AnchorTracker()
+        self._snapshots = {}
+
+    def _channels(self, now: datetime):
+        """Tracker-published channels (this evening's, for the next session) or the pre-market snapshot's."""
+        from anchor_tracker import TrackedChannels
+        from snapshot import load_snapshot
+        pub = self.tracker.published
+        if pub is not None and pub.trading_date >= now.date() and pub.channels is not None:
+            return pub
+        d = now.date()
+        if d not in self._snapshots:
+            snap = load_snapshot(d)
+            self._snapshots = {d: None if snap is None else TrackedChannels(
+                d, snap.anchor_date, snap.anchors, snap.channels, snap.created, revision=0)}
+        return self._snapshots[d]
+
+    def step(self) -> int:
+        if self.replay is not None:
+            now = self.replay.now()
+            es_1min, spx_1min = self.replay.es_1min(), self.replay.spx_1min()
+            es, spx = self.replay.es_price(), self.replay.spx_price()
+        else:
+            from data_fetcher import fetch_es_1min, fetch_1min, fetch_es_price, fetch_spx_price
+            now = datetime.now(CT)
+            es_1min, spx_1min = fetch_es_1min(), fetch_1min("^GSPC")
+            es, spx = fetch_es_price(), fetch_spx_price()
+        self.estimator.update_frames(es_1min, spx_1min)
+        self.cross.extend(es_1min, now=now)
+        self.tracker.extend(es_1min, now=now)
+        return self.writer.publish(now, es_1min, es, spx, self.estimator.estimate(),
+                         self.cross.state() if self.cross.last_ts is not None else None, self._channels(now))
+
+    def run(self, interval: float = 5.0, quiet: bool = False) -> None:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                seq = self.step()
+                if not quiet:
+                    h = self.writer.header
+                    print(f"seq {seq}: {int(h['size']):,} bars · ES {float(h['es']):,.2f} · "
+                          f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+            except Exception as e:
+                print(f"feed step failed: {e}")
+            if self.replay is not None:
+                self.replay.advance(time.perf_counter() - t0)
+                if self.replay.finished:
+                    return
+                time.sleep(self.replay.refresh_seconds)
+            else:
+                time.sleep(max(0.0, interval - (time.perf_counter() - t0)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPX Prophet shared-memory snapshot bus")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("feed", help="run the feed process (the only upstream poller)")
+    f.add_argument("--name", default=DEFAULT_NAME)
+    f.add_argument("--interval", type=float, default=5.0, help="seconds between publishes")
+    f.add_argument("--replay", help="bar archive directory or CSV to play instead of fetching")
+    f.add_argument("--date", type=date.fromisoformat, help="trading date to replay")
+    f.add_argument("--speed", type=float, default=60.0)
+    f.add_argument("--quiet", action="store_true")
+    s = sub.add_parser("show", help="print the current snapshot")
+    s.add_argument("--name", default=DEFAULT_NAME)
+    args = parser.parse_args()
+
+    if args.cmd == "feed":
+        replay = None
+        if args.replay:
+            from replay import ReplaySession, load_bars
+            bars = load_bars(args.replay)
+            replay = ReplaySession(bars, args.date or bars.index[-1].date(), args.speed)
+        writer = SnapshotBusWriter(args.name)
+        print(f"Publishing to shared memory '{args.name}' ({writer.shm.size / 1024:,.0f} KiB)")
+        try:
+            BusFeed(writer, replay).run(args.interval, args.quiet)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            writer.close()
+    else:
+        snap = SnapshotBusReader(args.name).read()
+        if snap is None:
+            print(f"no feed publishing on '{args.name}'")
+            return
+        print(f"seq {snap.seq} · updated {snap.updated:%Y-%m-%d %H:%M:%S %Z} · {len(snap.bars):,} bars")
+        print(f"  ES  {snap.es:>10,.2f} ({snap.es_src})   SPX {snap.spx:>10,.2f} ({snap.spx_src})")
+        print(f"  offset {snap.offset.offset:+.2f} {snap.offset.confidence} ({snap.offset.samples} bars)")
+        for tf, st in snap.cross.items():
+            print(f"  {tf:>4} {st.status:<16} spread {st.current_spread:+.2f}  {st.status_detail}")
+        if snap.channel_date is not None:
+            print(f"  channels for {snap.channel_date} (rev {snap.channel_rev}): "
+                  + "  ".join(f"{k} {v:,.2f}" for k, v in snap.channels.items() if v is not None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from datetime import time as dtime
+
+import numpy as np
+import pandas as pd
+
+from anchor_tracker import AnchorTracker
+from channel_builder import auto_detect_anchors
+from data_fetcher import _afternoon_slice
+
+
+def _session(day: pd.Timestamp, rng) -> pd.DataFrame:
+    idx = pd.date_range(day + pd.Timedelta(hours=8, minutes=30), day + pd.Timedelta(hours=16),
+                        freq="1min", tz="America/Chicago")
+    c = np.round((5800 + np.cumsum(rng.normal(0, 1.5, len(idx)))) * 4) / 4
+    return pd.DataFrame({"Open": c, "High": c + rng.uniform(0, 1, len(c)), "Low": c - rng.uniform(0, 1, len(c)),
+                         "Close": c, "Volume": 1.0}, index=idx)
+
+
+def test_tracked_anchors_match_batch_detection_on_the_afternoon_slice():
+    rng = np.random.default_rng(42)
+    for k in range(40):
+        day = pd.Timestamp("2026-03-02") + pd.tseries.offsets.BDay(k)
+        bars = _session(day, rng)
+        afternoon, _ = _afternoon_slice(bars, (day + pd.tseries.offsets.BDay(1)).date())
+        expected = auto_detect_anchors(afternoon, pd.DataFrame())
+
+        tracker = AnchorTracker()
+        tracker.extend(bars)
+        got = tracker.anchors()
+
+        assert expected is not None
+        for role, ap in expected.items():
+            assert (got[role].price, got[role].timestamp) == (ap.price, ap.timestamp), (day.date(), role)
+    assert afternoon.index[-1].time() == dtime(15, 5)
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from tick_feed import TickBarAggregator, load_ticks
+
+
+def test_iso_tick_file_aggregates_into_its_own_minutes(tmp_path):
+    path = tmp_path / "ticks.csv"
+    pd.DataFrame({
+        "t": ["2024-01-02T15:30:05Z", "2024-01-02T15:30:40Z", "2024-01-02T15:31:10Z"],
+        "symbol": ["ES=F"] * 3,
+        "price": [4800.0, 4801.5, 4799.25],
+        "size": [1, 2, 3],
+    }).to_csv(path, index=False)
+
+    ticks = load_ticks(str(path))
+    assert ticks[0].t == 1704209405.0
+
+    bars = []
+    agg = TickBarAggregator(bars.append)
+    for tick in ticks:
+        agg.add(tick)
+    agg.flush(float("inf"))
+
+    assert [pd.Timestamp(b.timestamp).tz_convert("UTC") for b in bars] == \
+        [pd.Timestamp("2024-01-02 15:30", tz="UTC"), pd.Timestamp("2024-01-02 15:31", tz="UTC")]
+    assert (bars[0].open, bars[0].high, bars[0].close, bars[0].volume) == (4800.0, 4801.5, 4801.5, 3.0)
@@ -0,0 +1,345 @@
+"""
+SPX Prophet — Tick Feed Module
+Push-based tick stream → 1-min OHLCV bars → streaming 8/50 cross monitor.
+Wire format is newline-delimited JSON over TCP: {"s": symbol, "t": epoch_s, "p": price, "v": size}.
+A replay server streams recorded ticks so the whole path can be tested offline.
+
+    python tick_feed.py serve ticks.csv --port 9099 --speed 1 --rebase
+    python tick_feed.py listen --port 9099
+"""
+
+import json
+import socket
+import socketserver
+import threading
+import time
+import argparse
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+import pytz
+
+from cross_detector import StreamingCrossMonitor, CrossMonitorState, DIVERGENCE_THRESHOLD
+
+CT = pytz.timezone("America/Chicago")
+DEFAULT_PORT = 9099
+
+
+@dataclass
+class Tick:
+    symbol: str
+    t: float          # epoch seconds
+    price: float
+    size: float = 0.0
+
+
+@dataclass
+class Bar:
+    symbol: str
+    start: float      # epoch seconds of the minute boundary
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    @property
+    def end(self) -> float:
+        return self.start + 60.0
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.start, CT)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TICK → BAR AGGREGATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TickBarAggregator:
+    """
+    Builds 1-min bars per symbol. A bar closes on the first tick of a later minute,
+    or from flush(now) once the wall clock passes its minute boundary. Ticks for a
+    minute at or before the last closed bar are dropped so no minute is emitted twice.
+    """
+
+    def __init__(self, on_bar: Callable[[Bar], None]):
+        self.on_bar = on_bar
+        self._open: Dict[str, Bar] = {}
+        self._last_closed: Dict[str, float] = {}
+
+    def add(self, tick: Tick) -> None:
+        minute = float(int(tick.t // 60) * 60)
+        if minute <= self._last_closed.get(tick.symbol, float("-inf")):
+            return  # late tick for a bar already closed
+        bar = self._open.get(tick.symbol)
+        if bar is not None and minute > bar.start:
+            self._close(tick.symbol)
+            bar = None
+        if bar is None:
+            self._open[tick.symbol] = Bar(tick.symbol, minute, tick.price, tick.price, tick.price, tick.price, tick.size)
+            return
+        if minute < bar.start:
+            return  # late tick for a bar already closed
+        if tick.price > bar.high:
+            bar.high = tick.price
+        if tick.price < bar.low:
+            bar.low = tick.price
+        bar.close = tick.price
+        bar.volume += tick.size
+
+    def flush(self, now: float) -> None:
+        for sym in [s for s, b in self._open.items() if now >= b.end]:
+            self._close(sym)
+
+    def _close(self, symbol: str) -> None:
+        bar = self._open.pop(symbol)
+        self._last_closed[symbol] = bar.start
+        self.on_bar(bar)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAR → CROSS STATE PIPELINE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class LatencyStats:
+    samples: List[float] = field(default_factory=list)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        if len(self.samples) > 10_000:
+            del self.samples[:5_000]
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"n": 0}
+        a = np.asarray(self.samples) * 1000.0
+        return {"n": len(a), "p50_ms": float(np.percentile(a, 50)), "p95_ms": float(np.percentile(a, 95)),
+                "max_ms": float(a.max())}
+
+
+class CrossPipeline:
+    """
+    Tick aggregator wired to one StreamingCrossMonitor per symbol.
+    Latency is wall time from the bar's minute boundary to the updated
+    CrossMonitorState, so it is meaningful when tick times are wall clock
+    (a live feed, or a 1x replay with --rebase).
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None,
+                 on_state: Optional[Callable[[str, Bar, CrossMonitorState], None]] = None):
+        self.thresholds = thresholds or {}
+        self.on_state = on_state
+        self.monitors: Dict[str, StreamingCrossMonitor] = {}
+        self.states: Dict[str, CrossMonitorState] = {}
+        self.latency = LatencyStats()
+        self.aggregator = TickBarAggregator(self._on_bar)
+        self._lock = threading.Lock()
+
+    def _on_bar(self, bar: Bar) -> None:
+        mon = self.monitors.get(bar.symbol)
+        if mon is None:
+            mon = self.monitors[bar.symbol] = StreamingCrossMonitor(self.thresholds.get(bar.symbol, DIVERGENCE_THRESHOLD))
+        mon.update(bar.timestamp, bar.close)
+        state = mon.state()
+        self.states[bar.symbol] = state
+        self.latency.add(time.time() - bar.end)
+        if self.on_state:
+            self.on_state(bar.symbol, bar, state)
+
+    def add_tick(self, tick: Tick) -> None:
+        with self._lock:
+            self.aggregator.add(tick)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        with self._lock:
+            self.aggregator.flush(time.time() if now is None else now)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLIENT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TickFeedClient:
+    """
+    TCP client for the NDJSON tick protocol, run on a background thread.
+    With flush_on_clock the open bar closes as soon as the wall clock crosses the
+    minute, even if no tick arrives — disable it for faster-than-real-time replays.
+    """
+
+    def __init__(self, pipeline: CrossPipeline, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 flush_on_clock: bool = True, poll_interval: float = 0.05):
+        self.pipeline = pipeline
+        self.host, self.port = host, port
+        self.flush_on_clock = flush_on_clock
+        self.poll_interval = poll_interval
+        self.ticks = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "TickFeedClient":
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run(self) -> None:
+        with socket.create_connection((self.host, self.port)) as sock:
+            sock.settimeout(self.poll_interval)
+            buf = b""
+            while not self._stop.is_set():
+                try:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    buf += chunk
+                    *lines, buf = buf.split(b"\n")
+                    for line in lines:
+                        if line:
+                            self.pipeline.add_tick(_decode(line))
+                            self.ticks += 1
+                except socket.timeout:
+                    pass
+                if self.flush_on_clock:
+                    self.pipeline.flush()
+        if not self.flush_on_clock:
+            self.pipeline.flush(float("inf"))
+
+
+def _decode(line: bytes) -> Tick:
+    d = json.loads(line)
+    return Tick(d["s"], float(d["t"]), float(d["p"]), float(d.get("v", 0.0)))
+
+
+def _encode(tick: Tick) -> bytes:
+    return json.dumps({"s": tick.symbol, "t": tick.t, "p": tick.price, "v": tick.size}, separators=(",", ":")).encode() + b"\n"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REPLAY SERVER (local stand-in for a vendor feed)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def load_ticks(path: str) -> List[Tick]:
+    """Recorded ticks from CSV with columns t (epoch s or ISO), symbol, price[, size]."""
+    df = pd.read_csv(path)
+    t = df["t"]
+    if not pd.api.types.is_numeric_dtype(t):
+        t = pd.to_datetime(t, utc=True).dt.as_unit("ns").astype("int64") / 1e9
+    size = df["size"] if "size" in df.columns else pd.Series(0.0, index=df.index)
+    return [Tick(str(s), float(a), float(p), float(v)) for a, s, p, v in zip(t, df["symbol"], df["price"], size)]
+
+
+def ticks_from_bars(df: pd.DataFrame, symbol: str = "ES=F") -> List[Tick]:
+    """Synthesize 4 ticks per 1-min bar (O, H/L in bar direction, C) for replay testing."""
+    starts = df.index.as_unit("ns").asi8 / 1e9
+    out = []
+    for t, o, h, l, c, v in zip(starts, df["Open"].values, df["High"].values, df["Low"].values,
+                                df["Close"].values, df["Volume"].values):
+        mid = (h, l) if c >= o else (l, h)
+        for k, p in enumerate((o, mid[0], mid[1], c)):
+            out.append(Tick(symbol, float(t + 5 + k * 15), float(p), float(v) / 4))
+    return out
+
+
+class _ReusableTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+
+
+class ReplayTickServer:
+    """
+    Serves recorded ticks to every client that connects, paced at `speed` × real time
+    (speed=0 sends as fast as possible). rebase shifts tick times so the first tick
+    is "now", which keeps bar-close latency meaningful at 1×.
+    """
+
+    def __init__(self, ticks: Iterable[Tick], host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 speed: float = 1.0, rebase: bool = False):
+        self.ticks = list(ticks)
+        self.speed = speed
+        self.rebase = rebase
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._stream(self.request)
+
+        self._tcp = _ReusableTCPServer((host, port), Handler)
+        self._tcp.daemon_threads = True
+        self.address = self._tcp.server_address
+        self._thread: Optional[threading.Thread] = None
+
+    def _stream(self, conn) -> None:
+        if not self.ticks:
+            return
+        t0 = self.ticks[0].t
+        wall0 = time.time()
+        # align to the recorded second-of-minute so rebased bars keep their minute layout
+        shift = (wall0 - t0) - ((wall0 - t0) % 60) + 60 if self.rebase else 0.0
+        if self.rebase:
+            wall0 = t0 + shift
+            time.sleep(max(0.0, wall0 - time.time()))
+        try:
+            for tick in self.ticks:
+                if self.speed > 0:
+                    due = wall0 + (tick.t - t0) / self.speed
+                    delay = due - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                out = Tick(tick.symbol, tick.t + shift, tick.price, tick.size) if shift else tick
+                conn.sendall(_encode(out))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def start(self) -> "ReplayTickServer":
+        self._thread = threading.Thread(target=self._tcp.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._tcp.shutdown()
+        self._tcp.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPX Prophet tick feed")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    srv = sub.add_parser("serve", help="replay recorded ticks over TCP")
+    srv.add_argument("ticks_csv")
+    srv.add_argument("--port", type=int, default=DEFAULT_PORT)
+    srv.add_argument("--speed", type=float, default=1.0)
+    srv.add_argument("--rebase", action="store_true")
+    lst = sub.add_parser("listen", help="aggregate ticks and print cross monitor state per bar")
+    lst.add_argument("--host", default="127.0.0.1")
+    lst.add_argument("--port", type=int, default=DEFAULT_PORT)
+    lst.add_argument("--no-clock-flush", action="store_true")
+    args = parser.parse_args()
+
+    if args.cmd == "serve":
+        server = ReplayTickServer(load_ticks(args.ticks_csv), port=args.port, speed=args.speed, rebase=args.rebase)
+        print(f"Replaying {len(server.ticks):,} ticks on {server.address[0]}:{server.address[1]}")
+        server._tcp.serve_forever()
+    else:
+        def show(sym, bar, state):
+            print(f"{bar.timestamp:%H:%M} {sym} C={bar.close:,.2f} spread={state.current_spread:+.2f} {state.status}")
+        pipe = CrossPipeline(on_state=show)
+        client = TickFeedClient(pipe, args.host, args.port, flush_on_clock=not args.no_clock_flush)
+        try:
+            client.run()
+        except KeyboardInterrupt:
+            pass
+        print("latency:", pipe.latency.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+SPX Prophet — Touch Probability Module
+Monte Carlo probability that price touches each channel line before the session
+ends, that each scenario's entry fills, and that it then reaches its TPs before
+its stop (TP/stop are measured from the fill, not from now). Paths bootstrap
+recent ES 1-min point changes; chunks of paths run across a process pool.
+"""
+
+import time
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, time as dtime
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import pytz
+
+from channel_builder import project_channel_values
+
+CT = pytz.timezone("America/Chicago")
+N_PATHS = 20_000
+CHUNK_PATHS = 2_500
+HISTORY_BARS = 2_000
+MAX_HORIZON = 1_380
+RTH_CLOSE = dtime(15, 0)
+GLOBEX_CLOSE = dtime(16, 0)
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+
+
+@dataclass
+class TouchEstimate:
+    line_prob: Dict[str, float]                 # {"asc_floor": p, ...} — touched before horizon end
+    scenario_prob: List[Dict[str, float]]       # per scenario: Fill, then TPn before stop / Stop before any TP
+    paths: int
+    horizon_minutes: int
+    elapsed: float
+    start_price: float
+    horizon_end: Optional[datetime] = None
+    returns_used: int = 0
+    notes: List[str] = field(default_factory=list)
+
+
+def session_end(now: datetime) -> datetime:
+    """RTH close if before it, else the 4 PM Globex close, else tomorrow's RTH close."""
+    now = now.astimezone(CT)
+    for t in (RTH_CLOSE, GLOBEX_CLOSE):
+        end = CT.localize(datetime.combine(now.date(), t))
+        if now < end:
+            return end
+    return CT.localize(datetime.combine(now.date() + timedelta(days=1), RTH_CLOSE))
+
+
+def bootstrap_returns(df_1min: pd.DataFrame, bars: int = HISTORY_BARS) -> np.ndarray:
+    """Demeaned 1-min Close changes (points) from the last `bars` bars; the bootstrap sample pool."""
+    if df_1min is None or len(df_1min) < 30:
+        return np.empty(0)
+    d = np.diff(df_1min["Close"].to_numpy(dtype=np.float64)[-(bars + 1):])
+    d = d[np.isfinite(d)]
+    return d - d.mean() if d.size else d
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIMULATION KERNEL (runs in workers)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _first_hit(hit: np.ndarray) -> np.ndarray:
+    """Index of the first True per row, or the row length when never hit."""
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), hit.shape[1])
+
+
+def _simulate_chunk(returns: np.ndarray, lines: np.ndarray, start: float, entries: np.ndarray,
+                    targets: np.ndarray, stops: np.ndarray, n_paths: int, seed: int) -> tuple:
+    """
+    One chunk of bootstrapped paths.
+      lines:   (L, T) line values per minute (NaN = line absent)
+      entries: (S,) entry distances from start (signed; 0 = fill now)
+      targets: (S, 3) TP distances from entry (signed), stops: (S,) stop distances (signed)
+    A scenario's TP/stop clock starts the minute after its path first touches the entry;
+    paths that never fill count toward neither.
+    Returns (line touch counts (L,), fill counts (S,), TP-before-stop counts (S, 3),
+    stop-before-any-TP counts (S,)).
+    """
+    rng = np.random.default_rng(seed)
+    steps = lines.shape[1]
+    moves = np.cumsum(returns[rng.integers(0, returns.size, size=(n_paths, steps))], axis=1)
+
+    path = start + moves
+    hi, lo = path.max(), path.min()
+    line_hits = np.zeros(lines.shape[0], dtype=np.int64)
+    for i, line in enumerate(lines):
+        if np.isnan(line).all():
+            continue
+        above = line[np.isfinite(line)][0] >= start
+        if (above and hi < np.nanmin(line)) or (not above and lo > np.nanmax(line)):
+            continue
+        hit = path >= line[None, :] if above else path <= line[None, :]
+        line_hits[i] = int(hit.any(axis=1).sum())
+
+    fills = np.zeros(len(stops), dtype=np.int64)
+    tp_hits = np.zeros(targets.shape, dtype=np.int64)
+    stop_first = np.zeros(len(stops), dtype=np.int64)
+    minute = np.arange(steps)[None, :]
+    for s in range(len(stops)):
+        long = stops[s] < 0
+        e = entries[s]
+        if e == 0:
+            fill = np.full(n_paths, -1)
+        else:
+            fill = _first_hit(moves >= e if e > 0 else moves <= e)
+        fills[s] = int((fill < steps).sum())
+        live = minute > fill[:, None]
+        rel = moves - e
+        stop_hit = _first_hit(live & (rel <= stops[s] if long else rel >= stops[s]))
+        tp_first = np.full(n_paths, steps)
+        for j, tgt in enumerate(targets[s]):
+            if np.isnan(tgt):
+                continue
+            tp_hit = _first_hit(live & (rel >= tgt if long else rel <= tgt))
+            tp_hits[s, j] = int(((tp_hit < stop_hit) & (tp_hit < steps)).sum())
+            tp_first = np.minimum(tp_first, tp_hit)
+        stop_first[s] = int(((stop_hit < tp_first) & (stop_hit < steps)).sum())
+    return line_hits, fills, tp_hits, stop_first
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DRIVER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Long-lived spawn pool so dashboard reruns don't pay worker start-up each cycle."""
+    global _POOL, _POOL_WORKERS
+    if _POOL is None or _POOL_WORKERS != workers:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+        _POOL_WORKERS = workers
+    return _POOL
+
+
+def touch_probabilities(returns: np.ndarray, line_values: Dict[str, np.ndarray], start_price: float,
+                        scenarios=(), n_paths: int = N_PATHS, chunk: int = CHUNK_PATHS,
+                        workers: int = 0, seed: int = 0, horizon_end: Optional[datetime] = None,
+                        entry_offset: float = 0.0) -> TouchEstimate:
+    """
+    line_values: {line: values at each simulated minute} (same length T; None/NaN for absent lines).
+    scenarios: TradeScenario-like objects; a path fills when it first reaches entry_level + entry_offset
+    (entry_offset puts SPX scenarios on the ES price scale), and TP/stop distances are then taken
+    relative to entry_level, so they work against ES-point returns without an offset.
+    workers=0 runs the chunks in-process.
+    """
+    t0 = time.perf_counter()
+    keys = list(line_values)
+    steps = max((len(v) for v in line_values.values() if v is not None), default=0)
+    if returns.size == 0 or steps == 0:
+        return TouchEstimate({k: float("nan") for k in keys}, [], 0, steps, 0.0, start_price, horizon_end,
+                             notes=["not enough history to bootstrap"])
+    lines = np.full((len(keys), steps), np.nan)
+    for i, k in enumerate(keys):
+        if line_values[k] is not None:
+            lines[i] = np.asarray(line_values[k], dtype=np.float64)
+
+    priced = [s for s in scenarios if s.stop_loss is not None and s.take_profit_1 is not None]
+    targets = np.array([[(tp - s.entry_level) if tp is not None else np.nan
+                         for tp in (s.take_profit_1, s.take_profit_2, s.take_profit_3)] for s in priced]).reshape(-1, 3)
+    stops = np.array([s.stop_loss - s.entry_level for s in priced], dtype=np.float64)
+    entries = np.array([s.entry_level + entry_offset - start_price for s in priced], dtype=np.float64)
+
+    sizes = [min(chunk, n_paths - i) for i in range(0, n_paths, chunk)]
+    args = [(returns, lines, start_price, entries, targets, stops, n, seed + i) for i, n in enumerate(sizes)]
+    if workers > 0:
+        results = list(_pool(workers).map(_simulate_chunk, *zip(*args)))
+    else:
+        results = [_simulate_chunk(*a) for a in args]
+
+    line_hits = sum(r[0] for r in results)
+    fills = sum(r[1] for r in results)
+    tp_hits = sum(r[2] for r in results)
+    stop_first = sum(r[3] for r in results)
+    line_prob = {k: (float(line_hits[i]) / n_paths if not np.isnan(lines[i]).all() else float("nan"))
+                 for i, k in enumerate(keys)}
+    scenario_prob = [{"Fill": float(fills[s]) / n_paths, "TP1": float(tp_hits[s, 0]) / n_paths, "TP2": float(tp_hits[s, 1]) / n_paths,
+                      "TP3": float(tp_hits[s, 2]) / n_paths, "Stop": float(stop_first[s]) / n_paths}
+                     for s in range(len(priced))]
+    for s, p in zip(priced, scenario_prob):
+        s.touch_prob = p
+    return TouchEstimate(line_prob, scenario_prob, n_paths, steps, time.perf_counter() - t0, start_price,
+                         horizon_end, returns_used=int(returns.size))
+
+
+def channel_touch_estimate(channels, df_1min: pd.DataFrame, start_price: float, now: datetime,
+                           scenarios=(), n_paths: int = N_PATHS, workers: int = 0, seed: int = 0,
+                           entry_offset: float = 0.0) -> TouchEstimate:
+    """Project every line minute-by-minute from `now` to session end, then simulate."""
+    end = session_end(now)
+    minutes = int(min((end - now.astimezone(CT)).total_seconds() // 60, MAX_HORIZON))
+    times = pd.date_range(now.astimezone(CT) + timedelta(minutes=1), periods=max(minutes, 1), freq="1min")
+    line_values = project_channel_values(channels, times)
+    return touch_probabilities(bootstrap_returns(df_1min), line_values, start_price, scenarios,
+                               n_paths=n_paths, workers=workers, seed=seed, horizon_end=end, entry_offset=entry_offset)
@@ -0,0 +1,263 @@
+"""
+SPX Prophet — Trade Journal Module
+Local SQLite journal of fills and exits (manual or simulated). Running totals
+per account-day and per account are updated in the same transaction as every
+exit, so the risk panel reads one primary-key row instead of summing history;
+per-scenario and per-day reports are indexed aggregate queries.
+"""
+
+import os
+import sqlite3
+import threading
+import pandas as pd
+from datetime import datetime, date
+from typing import Optional, List
+import pytz
+
+from instruments import INSTRUMENTS
+from trade_logic import PropFirmRisk
+
+CT = pytz.timezone("America/Chicago")
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "journal", "trades.sqlite3")
+DEFAULT_ACCOUNT = "default"
+OPTION_MULTIPLIER = 100.0
+SIM_SOURCES = ("sim", "replay")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id          INTEGER PRIMARY KEY,
+    account     TEXT    NOT NULL,
+    trade_date  TEXT    NOT NULL,            -- CT session date, ISO
+    scenario    TEXT    NOT NULL DEFAULT '',
+    instrument  TEXT    NOT NULL,
+    side        INTEGER NOT NULL,            -- +1 long, -1 short
+    qty         INTEGER NOT NULL,
+    point_value REAL    NOT NULL,
+    entry_time  TEXT    NOT NULL,
+    entry_price REAL    NOT NULL,
+    stop        REAL,
+    target      REAL,
+    exit_time   TEXT,
+    exit_price  REAL,
+    fees        REAL    NOT NULL DEFAULT 0,
+    pnl         REAL,
+    source      TEXT    NOT NULL DEFAULT 'manual',
+    note        TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_trades_account_date ON trades (account, trade_date);
+CREATE INDEX IF NOT EXISTS idx_trades_account_scenario ON trades (account, scenario, trade_date);
+CREATE INDEX IF NOT EXISTS idx_trades_open ON trades (account, exit_time) WHERE exit_time IS NULL;
+
+CREATE TABLE IF NOT EXISTS daily_totals (
+    account    TEXT    NOT NULL,
+    trade_date TEXT    NOT NULL,
+    realized   REAL    NOT NULL DEFAULT 0,
+    peak       REAL    NOT NULL DEFAULT 0,   -- intraday high of cumulative realized (starts at 0)
+    max_dd     REAL    NOT NULL DEFAULT 0,   -- deepest fall from that peak
+    trades     INTEGER NOT NULL DEFAULT 0,
+    wins       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, trade_date)
+);
+
+CREATE TABLE IF NOT EXISTS account_totals (
+    account  TEXT PRIMARY KEY,
+    realized REAL    NOT NULL DEFAULT 0,
+    peak     REAL    NOT NULL DEFAULT 0,     -- equity high-water mark (trailing drawdown base)
+    max_dd   REAL    NOT NULL DEFAULT 0,
+    trades   INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Running totals: one upsert per exit, all arithmetic in SQL so it stays in the exit's transaction.
+_DAILY_UPSERT = """
+INSERT INTO daily_totals (account, trade_date, realized, peak, max_dd, trades, wins)
+VALUES (:account, :day, :pnl, MAX(:pnl, 0), MAX(-:pnl, 0), 1, :win)
+ON CONFLICT (account, trade_date) DO UPDATE SET
+    realized = realized + :pnl,
+    max_dd   = MAX(max_dd, MAX(peak, realized + :pnl) - (realized + :pnl)),
+    peak     = MAX(peak, realized + :pnl),
+    trades   = trades + 1,
+    wins     = wins + :win
+"""
+_ACCOUNT_UPSERT = """
+INSERT INTO account_totals (account, realized, peak, max_dd, trades)
+VALUES (:account, :pnl, MAX(:pnl, 0), MAX(-:pnl, 0), 1)
+ON CONFLICT (account) DO UPDATE SET
+    realized = realized + :pnl,
+    max_dd   = MAX(max_dd, MAX(peak, realized + :pnl) - (realized + :pnl)),
+    peak     = MAX(peak, realized + :pnl),
+    trades   = trades + 1
+"""
+
+
+def point_value(instrument: str) -> float:
+    """$ per point per contract: futures from INSTRUMENTS, anything else is an SPX option premium."""
+    inst = INSTRUMENTS.get(instrument.upper())
+    return inst.point_value if inst else OPTION_MULTIPLIER
+
+
+def session_date(ts: datetime) -> date:
+    return ts.astimezone(CT).date()
+
+
+class TradeJournal:
+    """
+    One SQLite file per journal; safe to share across Streamlit reruns (one
+    connection, serialized by a lock). Exits update daily_totals / account_totals
+    incrementally; rebuild_totals() recomputes them from trades if ever needed.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _tx(self):
+        """BEGIN IMMEDIATE … COMMIT/ROLLBACK around a block."""
+        journal = self
+
+        class _Tx:
+            def __enter__(self):
+                journal._lock.acquire()
+                journal._conn.execute("BEGIN IMMEDIATE")
+                return journal._conn
+
+            def __exit__(self, exc_type, exc, tb):
+                try:
+                    journal._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+                finally:
+                    journal._lock.release()
+                return False
+
+        return _Tx()
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # WRITES
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def record_fill(self, instrument: str, side: int, qty: int, price: float, ts: datetime,
+                    scenario: str = "", account: str = DEFAULT_ACCOUNT, stop: Optional[float] = None,
+                    target: Optional[float] = None, source: str = "manual", note: str = "") -> int:
+        """Open a trade. side is +1 (long / bought option) or -1 (short). Returns the trade id."""
+        with self._tx() as c:
+            cur = c.execute(
+                "INSERT INTO trades (account, trade_date, scenario, instrument, side, qty, point_value, entry_time,"
+                " entry_price, stop, target, source, note) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (account, session_date(ts).isoformat(), scenario, instrument.upper(), 1 if side > 0 else -1, int(qty),
+                 point_value(instrument), ts.astimezone(CT).isoformat(), float(price), stop, target, source, note))
+            return int(cur.lastrowid)
+
+    def record_exit(self, trade_id: int, price: float, ts: datetime, fees: float = 0.0) -> Optional[float]:
+        """Close an open trade and roll its P&L into the running totals. None if not open."""
+        with self._tx() as c:
+            row = c.execute("SELECT account, trade_date, side, qty, point_value, entry_price FROM trades"
+                            " WHERE id = ? AND exit_time IS NULL", (trade_id,)).fetchone()
+            if row is None:
+                return None
+            pnl = (float(price) - row["entry_price"]) * row["side"] * row["qty"] * row["point_value"] - fees
+            c.execute("UPDATE trades SET exit_time = ?, exit_price = ?, fees = ?, pnl = ? WHERE id = ?",
+                      (ts.astimezone(CT).isoformat(), float(price), fees, pnl, trade_id))
+            args = {"account": row["account"], "day": row["trade_date"], "pnl": pnl, "win": int(pnl > 0)}
+            c.execute(_DAILY_UPSERT, args)
+            c.execute(_ACCOUNT_UPSERT, args)
+            return pnl
+
+    def record_trade(self, instrument: str, side: int, qty: int, entry: float, entry_ts: datetime,
+                     exit_price: float, exit_ts: datetime, fees: float = 0.0, **kw) -> float:
+        """A round trip in one call (manual entry of a finished trade)."""
+        tid = self.record_fill(instrument, side, qty, entry, entry_ts, **kw)
+        return self.record_exit(tid, exit_price, exit_ts, fees)
+
+    def settle_open(self, high: float, low: float, ts: datetime, account: str = DEFAULT_ACCOUNT,
+                    sources=SIM_SOURCES) -> List[tuple]:
+        """
+        Simulator exits: close open simulated trades whose stop or target lies inside
+        the bar's [low, high]. When both do, the stop is assumed first. Returns (id, pnl).
+        """
+        placeholders = ",".join("?" * len(sources))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, side, stop, target FROM trades WHERE account = ? AND exit_time IS NULL"
+                f" AND source IN ({placeholders})", (account, *sources)).fetchall()
+        out = []
+        for r in rows:
+            hit_stop = r["stop"] is not None and low <= r["stop"] <= high
+            hit_tgt = r["target"] is not None and low <= r["target"] <= high
+            if hit_stop or hit_tgt:
+                pnl = self.record_exit(r["id"], r["stop"] if hit_stop else r["target"], ts)
+                if pnl is not None:
+                    out.append((r["id"], pnl))
+        return out
+
+    def rebuild_totals(self) -> None:
+        """Recompute both running-total tables from the closed trades, in exit order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT account, trade_date, pnl FROM trades WHERE exit_time IS NOT NULL"
+                                      " ORDER BY exit_time, id").fetchall()
+        with self._tx() as c:
+            c.execute("DELETE FROM daily_totals")
+            c.execute("DELETE FROM account_totals")
+            for r in rows:
+                args = {"account": r["account"], "day": r["trade_date"], "pnl": r["pnl"], "win": int(r["pnl"] > 0)}
+                c.execute(_DAILY_UPSERT, args)
+                c.execute(_ACCOUNT_UPSERT, args)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # READS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def _one(self, sql: str, args: tuple):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()
+
+    def _frame(self, sql: str, args: tuple) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=args)
+
+    def daily(self, day: date, account: str = DEFAULT_ACCOUNT) -> dict:
+        row = self._one("SELECT realized, peak, max_dd, trades, wins FROM daily_totals WHERE account = ? AND trade_date = ?",
+                        (account, day.isoformat()))
+        return dict(row) if row else {"realized": 0.0, "peak": 0.0, "max_dd": 0.0, "trades": 0, "wins": 0}
+
+    def account(self, account: str = DEFAULT_ACCOUNT) -> dict:
+        row = self._one("SELECT realized, peak, max_dd, trades FROM account_totals WHERE account = ?", (account,))
+        return dict(row) if row else {"realized": 0.0, "peak": 0.0, "max_dd": 0.0, "trades": 0}
+
+    def open_trades(self, account: str = DEFAULT_ACCOUNT) -> pd.DataFrame:
+        return self._frame("SELECT id, trade_date, scenario, instrument, side, qty, entry_time, entry_price, stop, target,"
+                           " source FROM trades WHERE account = ? AND exit_time IS NULL ORDER BY id", (account,))
+
+    def daily_history(self, account: str = DEFAULT_ACCOUNT, start: Optional[date] = None,
+                      end: Optional[date] = None) -> pd.DataFrame:
+        return self._frame("SELECT trade_date, realized, max_dd, trades, wins FROM daily_totals"
+                           " WHERE account = ? AND trade_date BETWEEN ? AND ? ORDER BY trade_date",
+                           (account, (start or date.min).isoformat(), (end or date.max).isoformat()))
+
+    def scenario_stats(self, account: str = DEFAULT_ACCOUNT, start: Optional[date] = None,
+                       end: Optional[date] = None) -> pd.DataFrame:
+        """Closed-trade count, win rate, total / average / best / worst P&L per scenario."""
+        return self._frame(
+            "SELECT scenario, COUNT(*) AS trades, AVG(pnl > 0) AS win_rate, SUM(pnl) AS total_pnl,"
+            " AVG(pnl) AS avg_pnl, MAX(pnl) AS best, MIN(pnl) AS worst FROM trades"
+            " WHERE account = ? AND trade_date BETWEEN ? AND ? AND exit_time IS NOT NULL"
+            " GROUP BY scenario ORDER BY total_pnl DESC",
+            (account, (start or date.min).isoformat(), (end or date.max).isoformat()))
+
+    def risk(self, day: date, account: str = DEFAULT_ACCOUNT, unrealized: float = 0.0,
+             template: Optional[PropFirmRisk] = None) -> PropFirmRisk:
+        """PropFirmRisk for a session: today's realized (+ open) P&L and drawdowns from the running totals."""
+        t = template or PropFirmRisk()
+        d = self.daily(day, account)
+        a = self.account(account)
+        return PropFirmRisk(max_es=t.max_es, max_mes=t.max_mes, daily_loss_limit=t.daily_loss_limit,
+                            current_pnl=d["realized"] + unrealized, daily_drawdown=d["max_dd"],
+                            trailing_drawdown=a["peak"] - a["realized"], trades_today=d["trades"])
@@ -8,6 +8,8 @@ from typing import Optional, List
 from datetime import datetime, date, time as dtime
 import pytz
 
+from fixed_point import to_fixed
+
 CT = pytz.timezone("America/Chicago")
 STRIKE_OFFSET = 20
 STOP_LOSS_POINTS = 6
@@ -29,6 +31,12 @@ class TradeScenario:
     take_profit_3: Optional[float] = None
     is_primary: bool = True
     strength: str = "STANDARD"
+    premium: Optional[float] = None        # est. option premium at entry (see option_pricing)
+    delta: Optional[float] = None
+    iv: Optional[float] = None
+    level_pnl: Optional[tuple] = None      # (("Stop", $), ("TP1", $), ...) per contract
+    strike_ladder: Optional[tuple] = None  # ((strike, premium), ...)
+    touch_prob: Optional[dict] = None      # {"TP1": p, ..., "Stop": p} from touch_probability
 
 
 @dataclass
@@ -47,6 +55,9 @@ class PropFirmRisk:
     max_mes: int = 40
     daily_loss_limit: float = 400.0
     current_pnl: float = 0.0
+    daily_drawdown: float = 0.0       # deepest fall from today's realized peak (trade_journal)
+    trailing_drawdown: float = 0.0    # account equity below its high-water mark
+    trades_today: int = 0
 
     @property
     def risk_pct(self):
@@ -67,7 +78,9 @@ def _find_nearest(price, lines):
     return nearest, abs(price - lines[nearest])
 
 
-def _determine_zone(price, af, ac, df_, dc, ae=None, de=None):
+def _determine_zone(price, af, ac, df_, dc, ae=None, de=None, fixed=False):
+    if fixed:   # compare in hundredths: a price sitting on a line is on it, not a float ulp away
+        price, af, ac, df_, dc, ae, de = (to_fixed(x) for x in (price, af, ac, df_, dc, ae, de))
     if ae and price > ae: return "ABOVE_ASC_EXT", "Above Ascending Extreme"
     if price > ac: return "ABOVE_ASC", "Above Ascending Channel"
     if price >= af: return "IN_ASC", "Inside Ascending Channel"
@@ -96,11 +109,11 @@ def _add_trade_details(scenarios, channel_width, is_spx=True):
             s.take_profit_3 = s.entry_level - (channel_width * TP3_PCT)
 
 
-def assess_ascending_day(price, cv) -> PositionAssessment:
+def assess_ascending_day(price, cv, fixed: bool = False) -> PositionAssessment:
     af, ac = cv["asc_floor"], cv["asc_ceiling"]
     df_, dc = cv["desc_floor"], cv["desc_ceiling"]
     ae, de = cv.get("asc_extreme"), cv.get("desc_extreme")
-    zone, zone_label = _determine_zone(price, af, ac, df_, dc, ae, de)
+    zone, zone_label = _determine_zone(price, af, ac, df_, dc, ae, de, fixed)
 
     lines = {"Asc Floor": af, "Asc Ceiling": ac, "Desc Floor": df_, "Desc Ceiling": dc}
     if ae: lines["Asc Extreme"] = ae
@@ -146,11 +159,11 @@ def assess_ascending_day(price, cv) -> PositionAssessment:
     return PositionAssessment(zone, zone_label, nearest, dist, "ascending", scenarios)
 
 
-def assess_descending_day(price, cv) -> PositionAssessment:
+def assess_descending_day(price, cv, fixed: bool = False) -> PositionAssessment:
     af, ac = cv["asc_floor"], cv["asc_ceiling"]
     df_, dc = cv["desc_floor"], cv["desc_ceiling"]
     ae, de = cv.get("asc_extreme"), cv.get("desc_extreme")
-    zone, zone_label = _determine_zone(price, af, ac, df_, dc, ae, de)
+    zone, zone_label = _determine_zone(price, af, ac, df_, dc, ae, de, fixed)
 
     lines = {"Asc Floor": af, "Asc Ceiling": ac, "Desc Floor": df_, "Desc Ceiling": dc}
     if ae: lines["Asc Extreme"] = ae
@@ -204,19 +217,20 @@ def assess_descending_day(price, cv) -> PositionAssessment:
     return PositionAssessment(zone, zone_label, nearest, dist, "descending", scenarios)
 
 
-def assess_asian_session(price, cv) -> PositionAssessment:
+def assess_asian_session(price, cv, fixed: bool = False) -> PositionAssessment:
     df_, dc = cv["desc_floor"], cv["desc_ceiling"]
     lines = {"Desc Floor": df_, "Desc Ceiling": dc}
     nearest, dist = _find_nearest(price, lines)
     scenarios = []
+    p, lo, hi = (to_fixed(price), to_fixed(df_), to_fixed(dc)) if fixed else (price, df_, dc)
 
-    if price > dc:
+    if p > hi:
         zone, label = "ABOVE_DESC", "Above Descending Channel"
         scenarios = [
             TradeScenario("LONG ES", dc, "Descending Ceiling", "Broke above — ceiling becomes support", strength="STRONG"),
             TradeScenario("SHORT ES", dc, "Descending Ceiling", "If fails, sell back to floor", df_, "Descending Floor", is_primary=False, strength="CAUTION"),
         ]
-    elif price >= df_:
+    elif p >= lo:
         zone, label = "IN_DESC", "Inside Descending Channel"
         scenarios = [
             TradeScenario("LONG ES", df_, "Descending Floor", "Buy off floor for bounce to ceiling", dc, "Descending Ceiling"),
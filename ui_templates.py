@@ -0,0 +1,270 @@
+"""
+SPX Prophet — UI Templates Module
+Card markup as precompiled format templates. Styling lives in static/prophet.css
+(served once and cached by the browser), so each rerun only ships class names
+and values. emit() tallies the HTML bytes sent per rerun.
+"""
+
+import time
+from functools import lru_cache
+import streamlit as st
+
+STYLESHEET_LINK = '<link rel="stylesheet" href="app/static/prophet.css">'
+
+LIVE_BAR = (
+    '<div class="prophet-card card-tight"><div class="row-wrap">'
+    '<span class="status-badge status-live"><span class="dot"></span>{session}</span>'
+    '<div class="live-vals">'
+    '<div><div class="card-label">ES <span class="src">({es_src})</span></div><div class="live-num c-teal">{es:,.2f}</div></div>'
+    '<div><div class="card-label">SPX</div><div class="live-num c-t1">{spx:,.2f}</div></div>'
+    '<div><div class="card-label">OFFSET</div><div class="live-num c-purple">{offset:+.1f}</div></div>'
+    '<div><div class="card-label">CT</div><div class="live-num c-t2">{now}</div></div>'
+    '</div></div></div>'
+)
+
+LEVELS_BODY = (
+    '<div class="grid-2{wide}">'
+    '<div class="side-asc"><div class="card-label c-green">ASCENDING</div>'
+    '<div class="row-between first"><span class="card-sub">Extreme</span><span class="lvl-x c-green-dim">{ae}</span></div>'
+    '<div class="row-between"><span class="card-sub">Ceiling</span><span class="lvl{big} c-green">{ac}</span></div>'
+    '<div class="row-between"><span class="card-sub">Floor</span><span class="lvl{big} c-green">{af}</span></div></div>'
+    '<div class="side-desc"><div class="card-label c-red">DESCENDING</div>'
+    '<div class="row-between first"><span class="card-sub">Ceiling</span><span class="lvl{big} c-red">{dc}</span></div>'
+    '<div class="row-between"><span class="card-sub">Floor</span><span class="lvl{big} c-red">{df}</span></div>'
+    '<div class="row-between"><span class="card-sub">Extreme</span><span class="lvl-x c-red-dim">{de}</span></div></div>'
+    '</div>'
+)
+
+CHANNEL_CARD = '<div class="prophet-card"><div class="card-label">CHANNEL LEVELS — {label}</div>' + LEVELS_BODY + '</div>'
+
+NINE_AM_CARD = (
+    '<div class="prophet-card gold-card"><div class="row-wrap">'
+    '<div class="card-label gold-head">9:00 AM CT — ENTRY LEVELS (SPX)</div>'
+    '<span class="status-badge badge-gold">INSTITUTIONAL OPEN</span></div>'
+    + LEVELS_BODY + '</div>'
+)
+
+CROSS_MONITOR = (
+    '<div class="prophet-card"><div class="card-label">8 / 50 EMA CROSS MONITOR — ES 1-MIN</div>'
+    '<div class="grid-3">'
+    '<div><div class="card-sub">Spread</div><div class="stat {sc}">{spread:+.1f}</div></div>'
+    '<div><div class="card-sub">Max Div</div><div class="stat {dc}">{max_div:.1f}</div>'
+    '<div class="risk-bar"><div class="risk-fill {fill}" style="width:{pct}%;"></div></div></div>'
+    '<div><div class="card-sub">Status</div><div class="status-txt {stc}">{status}</div></div>'
+    '</div><div class="card-foot"><div class="card-sub">{detail}</div></div></div>'
+)
+
+PROP_FIRM = (
+    '<div class="prophet-card"><div class="card-label">THE FUTURES DESK — RISK</div>'
+    '<div class="grid-3 tight">'
+    '<div><div class="card-sub">Max</div><div class="stat-sm">{max_es} ES / {max_mes} MES</div></div>'
+    '<div><div class="card-sub">Daily Limit</div><div class="stat-sm c-red">${limit:,.0f}</div></div>'
+    '<div><div class="card-sub">Risk</div><div class="stat-sm {rc}">{pct:.0f}%</div>'
+    '<div class="risk-bar"><div class="risk-fill {fill}" style="width:{pct}%;"></div></div></div></div>'
+    '<div class="card-foot"><div class="card-sub">Today <span class="mono {pc}">{pnl:+,.0f}</span> · {trades} trades'
+    ' · Day DD ${day_dd:,.0f} · Trailing DD ${trail_dd:,.0f}</div></div></div>'
+)
+VOLUME_HEAD = '<div class="card-label">VOLUME PROFILE — {inst}</div>'
+VOLUME_ROW = ('<div class="row-between"><span class="card-sub">{name}</span><span class="mono">VWAP {vwap:,.2f} ±{std:.2f}'
+              ' · POC {poc:,.2f} · VA {val:,.2f}–{vah:,.2f}</span></div>')
+VOLUME_HIT = ('<div class="list-row"><span class="{c}">{line}</span> ↔ {name} {label} {level:,.2f}'
+              ' <span class="card-sub">({dist:+.2f})</span></div>')
+JOURNAL_ROW = ('<div class="list-row"><span class="{c}">{side}</span> #{id} {qty} {instrument} @ {entry:,.2f}'
+               ' | {scenario} | SL {stop} · TG {target} | {source}</div>')
+
+WATCHLIST = (
+    '<div class="prophet-card card-compact"><div class="row-wrap">'
+    '<div><div class="card-label">{key} <span class="src">({symbol})</span></div><div class="live-num c-teal">{price:,.2f}</div></div>'
+    '<div><div class="card-sub">Spread</div><div class="mono {sc}"><b>{spread:+.1f}</b></div></div>'
+    '<div><div class="card-sub">Status</div><div class="status-txt">{status}</div></div>'
+    '<div><div class="card-sub">Basis vs {cash}</div><div class="mono">{basis}</div></div>'
+    '</div><div class="card-sub mono">{levels}</div></div>'
+)
+
+POSITION = (
+    '<div class="prophet-card"><div class="card-label">POSITION — {inst} @ {price:,.2f}</div>'
+    '<div class="zone">{zone}</div><div class="card-sub">Nearest: {nearest} ({dist:.2f} pts)</div></div>'
+)
+
+WIDTHS = (
+    '<div class="prophet-card"><div class="card-label">CHANNEL WIDTHS AT 9 AM</div><div class="widths">'
+    '<div><span class="card-sub">Ascending: </span><span class="w-val c-green">{aw:.2f} pts</span></div>'
+    '<div><span class="card-sub">Descending: </span><span class="w-val c-red">{dw:.2f} pts</span></div></div></div>'
+)
+
+SCENARIO_HEAD = (
+    '<div class="signal-card {sig}">'
+    '<div><span class="{strength_cls}">{strength}</span><span class="sig-meta">{pri}</span>{dist}</div>'
+    '<div class="sig-head"><span class="sig-dir {c}">{direction}</span><span class="sig-at">at</span></div>'
+    '<div class="sig-entry {c}">{entry:,.2f}</div>'
+    '<div class="card-sub">{entry_label}</div>'
+    '<div class="sig-why">{rationale}</div>'
+)
+SCENARIO_DIST = '<span class="dist-badge {cls}">{dist:.1f} pts away</span>'
+SCENARIO_TARGET = '<div class="sig-line first"><span class="card-sub">Target: </span><span class="mono {c}">{level:,.2f}</span><span class="card-sub"> ({label})</span></div>'
+SCENARIO_STOP = '<div class="sig-line"><span class="card-sub">Stop: </span><span class="sig-stop">{stop:,.2f}</span></div>'
+SCENARIO_TPS = (
+    '<div class="sig-tps"><div><span class="card-sub">TP1: </span><span class="sig-tp">{tp1:,.2f}</span></div>'
+    '<div><span class="card-sub">TP2: </span><span class="sig-tp">{tp2:,.2f}</span></div>'
+    '<div><span class="card-sub">TP3: </span><span class="sig-tp">{tp3:,.2f}</span></div></div>'
+)
+SCENARIO_STRIKE = '<div class="sig-strike"><span class="{cls}">{strike}{cp}</span>{premium}</div>'
+SCENARIO_PREMIUM = ('<span class="sig-prem">≈ ${premium:,.2f}</span><span class="card-sub"> Δ {delta:+.2f} · IV {iv:.0%}</span>'
+                    '<div class="sig-tps">{pnl}</div><div class="card-sub mono">{ladder}</div>')
+SCENARIO_PNL = '<div><span class="card-sub">{label}: </span><span class="mono {c}">{pnl:+,.0f}</span></div>'
+
+LABEL = '<div class="card-label {cls}">{text}</div>'
+EMPTY_CARD = (
+    '<div class="prophet-card empty-card"><div class="empty-icon">📝</div>'
+    '<div class="empty-title">ENTER CHANNEL ANCHORS</div>'
+    '<div class="card-sub">Enter Lowest Bounce and Highest Rejection above to generate projections.</div></div>'
+)
+DAY_ASC = '<div class="day-asc"><div class="card-label">TODAY\'S CHANNEL</div><div class="day-head c-green">▲ ASCENDING DAY</div></div>'
+DAY_DESC = '<div class="day-desc"><div class="card-label">TODAY\'S CHANNEL</div><div class="day-head c-red">▼ DESCENDING DAY</div></div>'
+NOTE_CARD = '<div class="prophet-card">{label}<div class="card-sub">{text}</div></div>'
+FOOTER = '<div class="footer"><div>SPX PROPHET — NEXT GEN | BUILT FOR PRECISION</div></div>'
+
+BAND_HEAD = '<div class="band-row head"><span>LINE (SPX)</span><span>LOW</span><span>LEVEL</span><span>HIGH</span><span>±</span></div>'
+BAND_ROW = ('<div class="band-row"><span class="card-sub">{label}</span><span class="mono {c}">{lo:,.2f}</span>'
+            '<span class="mono b {c}">{mid:,.2f}</span><span class="mono {c}">{hi:,.2f}</span><span class="card-sub">{half:.2f}</span></div>')
+
+PROB_HEAD = '<div class="card-label">PROBABILITY OF TOUCH — {paths:,} paths to {end} ({ms:.0f} ms)</div>'
+PROB_ROW = '<div class="prob-row"><span class="card-sub">{label}</span><span class="mono {c}">{level:,.2f}</span><span class="mono b">{p}</span></div>'
+PROB_SCENARIO = ('<div class="prob-row"><span class="card-sub">{direction} @ {entry:,.2f}</span>'
+                 '<span class="mono">Fill {fill:.0%}</span><span class="mono">{tps}</span>'
+                 '<span class="mono c-red">Stop {stop:.0%}</span></div>')
+
+CROSS_TF_HEAD = '<div class="card-label">TIMEFRAMES — <span class="{c}">{alignment}</span></div>'
+CROSS_TF_ROW = ('<div class="tf-row"><span class="card-sub">{tf}</span><span class="mono {sc}">{spread:+.1f}</span>'
+                '<span class="mono">{max_div:.1f}</span><span class="{stc}">{status}</span><span class="card-sub">{last}</span></div>')
+
+CROSS_ROW = '<div class="list-row"><span class="{c}">{arrow}</span> {time} | Div: {div:.1f} | {hour} | {mark}</div>'
+DEBUG_ROW = '<div class="dbg-row"><span class="c-teal">{label}</span> | {price:,.2f} | {when}</div>'
+DEBUG_NOTE = '<div class="dbg-note">{text}</div>'
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PAYLOAD ACCOUNTING
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def begin_rerun() -> None:
+    """Roll the payload counter: the finished rerun becomes _payload_last."""
+    if "_payload" in st.session_state:
+        st.session_state["_payload_last"] = st.session_state["_payload"]
+    st.session_state["_payload"] = {"bytes": 0, "blocks": 0}
+
+
+def emit(markup: str) -> None:
+    p = st.session_state.setdefault("_payload", {"bytes": 0, "blocks": 0})
+    p["bytes"] += len(markup.encode())
+    p["blocks"] += 1
+    st.markdown(markup, unsafe_allow_html=True)
+
+
+def last_payload() -> dict:
+    return st.session_state.get("_payload_last") or st.session_state.get("_payload", {"bytes": 0, "blocks": 0})
+
+
+def rerun_after(seconds: float) -> None:
+    """Sleep, then rerun the script: the auto-refresh and replay ticks. load_test swaps it for a counter."""
+    time.sleep(seconds)
+    st.rerun()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RENDERERS (cached on their formatted values)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _lvl(v) -> str:
+    return f"{v:,.2f}" if v else "—"
+
+
+@lru_cache(maxsize=256)
+def levels_html(label: str, af, ac, ae, df_, dc, de) -> str:
+    return CHANNEL_CARD.format(label=label, wide="", big="", ae=_lvl(ae), ac=_lvl(ac), af=_lvl(af),
+                               dc=_lvl(dc), df=_lvl(df_), de=_lvl(de))
+
+
+@lru_cache(maxsize=64)
+def nine_am_html(af, ac, ae, df_, dc, de) -> str:
+    return NINE_AM_CARD.format(wide=" wide", big=" big", ae=_lvl(ae), ac=_lvl(ac), af=_lvl(af),
+                               dc=_lvl(dc), df=_lvl(df_), de=_lvl(de))
+
+
+@lru_cache(maxsize=512)
+def scenario_html(direction, strength, is_primary, entry, entry_label, rationale, target, target_label,
+                  stop, tp1, tp2, tp3, strike, dist, premium=None, delta=None, iv=None, level_pnl=None,
+                  strike_ladder=None) -> str:
+    is_bull = direction in ("CALLS", "LONG ES")
+    sig = ("signal-calls" if direction == "CALLS" else "signal-long") if is_bull else ("signal-puts" if direction == "PUTS" else "signal-short")
+    c = "c-green" if is_bull else "c-red"
+    dist_html = SCENARIO_DIST.format(cls="dist-near" if dist < 10 else "dist-far", dist=dist) if dist is not None else ""
+    parts = [SCENARIO_HEAD.format(sig=sig, strength_cls=f"strength-{strength.lower()}", strength=strength,
+                                  pri="PRIMARY" if is_primary else "ALTERNATE", dist=dist_html, c=c,
+                                  direction=direction, entry=entry, entry_label=entry_label, rationale=rationale)]
+    if target:
+        parts.append(SCENARIO_TARGET.format(c=c, level=target, label=target_label))
+    if stop:
+        parts.append(SCENARIO_STOP.format(stop=stop))
+    if tp1:
+        parts.append(SCENARIO_TPS.format(tp1=tp1, tp2=tp2 or 0, tp3=tp3 or 0))
+    if strike and direction in ("CALLS", "PUTS"):
+        cp = "C" if direction == "CALLS" else "P"
+        prem = ""
+        if premium is not None:
+            pnl = ''.join(SCENARIO_PNL.format(label=label, pnl=v, c="c-green" if v >= 0 else "c-red") for label, v in level_pnl or ())
+            ladder = " · ".join(f"{k}{cp} {p:,.2f}" for k, p in strike_ladder or ())
+            prem = SCENARIO_PREMIUM.format(premium=premium, delta=delta, iv=iv, pnl=pnl, ladder=ladder)
+        parts.append(SCENARIO_STRIKE.format(cls="strike-call" if direction == "CALLS" else "strike-put",
+                                            strike=strike, cp=cp, premium=prem))
+    parts.append('</div>')
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=64)
+def bands_html(rows: tuple) -> str:
+    """rows: ((label, low, level, high), ...) for the sensitivity card."""
+    body = ''.join(BAND_ROW.format(label=label, lo=lo, mid=mid, hi=hi, half=(hi - lo) / 2,
+                                   c="c-green" if label.startswith("Asc") else "c-red")
+                   for label, lo, mid, hi in rows)
+    return '<div class="prophet-card card-compact">' + BAND_HEAD + body + '</div>'
+
+
+def volume_html(inst: str, rows, hits) -> str:
+    """rows: ((name, VolumeLevels), ...); hits: ((line label, name, level label, level, distance), ...)."""
+    body = ''.join(VOLUME_ROW.format(name=name, vwap=lv.vwap, std=lv.std, poc=lv.poc, val=lv.val, vah=lv.vah)
+                   for name, lv in rows)
+    body += ''.join(VOLUME_HIT.format(line=line, name=name, label=label, level=level, dist=dist,
+                                      c="c-green" if line.startswith("Asc") else "c-red")
+                    for line, name, label, level, dist in hits)
+    return '<div class="prophet-card card-compact">' + VOLUME_HEAD.format(inst=inst) + body + '</div>'
+
+
+def touch_html(est, levels: dict, labels: dict, scenarios=()) -> str:
+    """Line touch probabilities (with the current level), and fill then TP-before-stop odds per scenario."""
+    rows = [PROB_HEAD.format(paths=est.paths, end=est.horizon_end.strftime("%I:%M %p") if est.horizon_end else "—",
+                             ms=est.elapsed * 1000)]
+    for key, p in est.line_prob.items():
+        if levels.get(key) is None or p != p:
+            continue
+        rows.append(PROB_ROW.format(label=labels[key], level=levels[key], p=f"{p:.0%}",
+                                    c="c-green" if key.startswith("asc") else "c-red"))
+    for s, sp in zip([s for s in scenarios if s.touch_prob], est.scenario_prob):
+        tps = " · ".join(f"{k} {sp[k]:.0%}" for k in ("TP1", "TP2", "TP3"))
+        rows.append(PROB_SCENARIO.format(direction=s.direction, entry=s.entry_level, tps=tps, fill=sp["Fill"], stop=sp["Stop"]))
+    return '<div class="prophet-card card-compact">' + ''.join(rows) + '</div>'
+
+
+def cross_tf_html(state) -> str:
+    """Per-timeframe spread / divergence / status rows under the 1m cross monitor."""
+    c = "c-green" if state.alignment.startswith("BULL") else "c-red" if state.alignment.startswith("BEAR") else "c-gold"
+    rows = [CROSS_TF_HEAD.format(c=c, alignment=state.alignment)]
+    for tf, s in state.timeframes.items():
+        cx = s.last_cross
+        last = (f"{'▲' if cx.cross_type == 'bullish' else '▼'} {cx.timestamp:%I:%M %p} {'✅' if cx.is_valid else '❌'}"
+                if cx else "—")
+        stc = ("c-green" if "VALID" in s.status and "INVALID" not in s.status else "c-red" if "INVALID" in s.status
+               else "c-gold" if s.status == "READY" else "c-t2")
+        rows.append(CROSS_TF_ROW.format(tf=tf, sc="c-green" if s.current_spread > 0 else "c-red", spread=s.current_spread,
+                                        max_div=s.max_divergence, stc=stc, status=s.status, last=last))
+    return '<div class="prophet-card card-tight">' + "".join(rows) + "</div>"
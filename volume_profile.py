@@ -0,0 +1,203 @@
+"""
+SPX Prophet — Volume Profile Module
+Incremental session VWAP (with σ bands) and a price-bucketed volume profile
+(POC, value area, high-volume nodes) from the 1-min bars' Volume column.
+Each bar is O(1): running Σv, Σpv, Σp²v and one bucket add; the POC is
+tracked as buckets grow. Kept for the current Globex session and for each
+day's 12-3 PM anchor window, so high-volume nodes can be lined up against
+the projected channel levels.
+"""
+
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import Dict, Optional
+
+from bar_normalizer import _wall, session_dates, day_from_int, GLOBEX
+from channel_builder import ANCHOR_WINDOW, CT
+
+BUCKET = 1.0               # points per profile bucket (4 ES ticks)
+VALUE_AREA = 0.70          # share of volume in the value area
+HVN_RATIO = 1.5            # a node holds ≥ this × the mean non-empty bucket volume
+MAX_NODES = 5
+CONFLUENCE_PTS = 2.0       # a line within this of a node / POC / VA edge "lines up"
+KEEP = 3                   # sessions / anchor windows retained
+_MIN_NS = 60_000_000_000
+_WIN_LO = ANCHOR_WINDOW[0].hour * 60 + ANCHOR_WINDOW[0].minute
+_WIN_HI = ANCHOR_WINDOW[1].hour * 60 + ANCHOR_WINDOW[1].minute
+
+
+@dataclass
+class VolumeLevels:
+    vwap: float
+    std: float
+    upper_1: float
+    lower_1: float
+    upper_2: float
+    lower_2: float
+    poc: float
+    vah: float
+    val: float
+    volume: float
+    bars: int
+    nodes: tuple               # high-volume node prices, heaviest first
+    start: datetime
+    end: datetime
+
+    def shifted(self, offset: float) -> "VolumeLevels":
+        """Same levels in another instrument (ES → SPX: offset = basis)."""
+        s = lambda x: x - offset
+        return VolumeLevels(s(self.vwap), self.std, s(self.upper_1), s(self.lower_1), s(self.upper_2), s(self.lower_2),
+                            s(self.poc), s(self.vah), s(self.val), self.volume, self.bars,
+                            tuple(s(n) for n in self.nodes), self.start, self.end)
+
+
+class VolumeWindow:
+    """VWAP accumulators plus the bucket histogram for one session or window."""
+
+    __slots__ = ("v", "pv", "p2v", "buckets", "poc", "bars", "start_ns", "end_ns")
+
+    def __init__(self):
+        self.v = self.pv = self.p2v = 0.0
+        self.buckets: Dict[int, float] = {}
+        self.poc: Optional[int] = None
+        self.bars = 0
+        self.start_ns = self.end_ns = None
+
+    def push(self, ts_ns: int, high: float, low: float, close: float, volume: float) -> None:
+        self.bars += 1
+        if self.start_ns is None:
+            self.start_ns = ts_ns
+        self.end_ns = ts_ns
+        if not volume > 0:
+            return
+        tp = (high + low + close) / 3.0
+        self.v += volume
+        self.pv += tp * volume
+        self.p2v += tp * tp * volume
+        b = int(round(tp / BUCKET))
+        vol = self.buckets.get(b, 0.0) + volume
+        self.buckets[b] = vol
+        if self.poc is None or vol > self.buckets[self.poc] or (vol == self.buckets[self.poc] and b < self.poc):
+            self.poc = b
+
+    def value_area(self) -> tuple:
+        """(val, vah) bucket indices: grow from the POC toward the heavier neighbour until VALUE_AREA is covered."""
+        lo_b, hi_b = min(self.buckets), max(self.buckets)
+        dense = np.zeros(hi_b - lo_b + 1)
+        for b, vol in self.buckets.items():
+            dense[b - lo_b] = vol
+        lo = hi = self.poc - lo_b
+        covered, target = dense[lo], VALUE_AREA * self.v
+        while covered < target and (lo > 0 or hi < len(dense) - 1):
+            below = dense[lo - 1] if lo > 0 else -1.0
+            above = dense[hi + 1] if hi < len(dense) - 1 else -1.0
+            if above >= below:
+                hi += 1
+                covered += above
+            else:
+                lo -= 1
+                covered += below
+        return lo + lo_b, hi + lo_b
+
+    def nodes(self) -> tuple:
+        """High-volume nodes: local maxima at ≥ HVN_RATIO × the mean bucket, heaviest first."""
+        if not self.buckets:
+            return ()
+        floor = HVN_RATIO * self.v / len(self.buckets)
+        get = self.buckets.get
+        peaks = [(vol, b) for b, vol in self.buckets.items()
+                 if vol >= floor and vol >= get(b - 1, 0.0) and vol >= get(b + 1, 0.0)]
+        return tuple(b * BUCKET for _, b in sorted(peaks, reverse=True)[:MAX_NODES])
+
+    def levels(self) -> Optional[VolumeLevels]:
+        if self.v <= 0:
+            return None
+        vwap = self.pv / self.v
+        std = float(np.sqrt(max(self.p2v / self.v - vwap * vwap, 0.0)))
+        val, vah = self.value_area()
+        stamp = lambda ns: pd.Timestamp(ns).tz_localize("UTC").tz_convert(CT).to_pydatetime()
+        return VolumeLevels(vwap, std, vwap + std, vwap - std, vwap + 2 * std, vwap - 2 * std,
+                            self.poc * BUCKET, vah * BUCKET, val * BUCKET, self.v, self.bars, self.nodes(),
+                            stamp(self.start_ns), stamp(self.end_ns))
+
+
+class VolumeTracker:
+    """
+    Push closed 1-min bars in order. Every bar feeds its Globex session's window;
+    bars from 12:00 to 3:00 PM CT also feed that day's anchor window. The last
+    KEEP sessions and anchor windows are kept.
+    """
+
+    def __init__(self, keep: int = KEEP):
+        self.keep = keep
+        self.sessions: "OrderedDict[date, VolumeWindow]" = OrderedDict()
+        self.windows: "OrderedDict[date, VolumeWindow]" = OrderedDict()
+        self.last_ns: Optional[int] = None
+
+    @staticmethod
+    def _window_for(store: OrderedDict, d: date, keep: int) -> VolumeWindow:
+        w = store.get(d)
+        if w is None:
+            w = store[d] = VolumeWindow()
+            while len(store) > keep:
+                store.popitem(last=False)
+        return w
+
+    def extend(self, df: pd.DataFrame, now: Optional[datetime] = None) -> int:
+        """Push the rows of a 1-min frame newer than the last bar seen (and closed by `now`, if given)."""
+        if df is None or df.empty:
+            return 0
+        utc = df.index.as_unit("ns").asi8
+        start = 0 if self.last_ns is None else int(np.searchsorted(utc, self.last_ns, side="right"))
+        end = len(utc) if now is None else int(np.searchsorted(utc, pd.Timestamp(now).as_unit("ns").value - _MIN_NS, side="right"))
+        if start >= end:
+            return 0
+        utc = utc[start:end]
+        day, mod, wd = _wall(utc)
+        sess = (df["session_date"].to_numpy()[start:end] if "session_date" in df.columns
+                else session_dates(day, mod, wd, GLOBEX))
+        in_win = (mod >= _WIN_LO) & (mod < _WIN_HI)
+        h, l, c = (df[k].to_numpy(dtype=np.float64)[start:end] for k in ("High", "Low", "Close"))
+        v = df["Volume"].to_numpy(dtype=np.float64)[start:end] if "Volume" in df.columns else np.zeros(len(utc))
+        cur_s = cur_w = None
+        for i in range(len(utc)):
+            ts = int(utc[i])
+            s = int(sess[i])
+            if cur_s is None or cur_s[0] != s:
+                cur_s = (s, self._window_for(self.sessions, day_from_int(s), self.keep))
+            cur_s[1].push(ts, h[i], l[i], c[i], v[i])
+            if in_win[i]:
+                d = int(day[i])
+                if cur_w is None or cur_w[0] != d:
+                    cur_w = (d, self._window_for(self.windows, day_from_int(d), self.keep))
+                cur_w[1].push(ts, h[i], l[i], c[i], v[i])
+        self.last_ns = int(utc[-1])
+        return len(utc)
+
+    def session(self, trading_date: date) -> Optional[VolumeLevels]:
+        w = self.sessions.get(trading_date)
+        return w.levels() if w is not None else None
+
+    def anchor_window(self, anchor_date: date) -> Optional[VolumeLevels]:
+        w = self.windows.get(anchor_date)
+        return w.levels() if w is not None else None
+
+
+def line_confluence(levels: Optional[VolumeLevels], lines: Dict[str, Optional[float]],
+                    tol: float = CONFLUENCE_PTS) -> Dict[str, tuple]:
+    """{line: (volume level label, level price, distance)} for lines within tol of a node, the POC or a VA edge."""
+    if levels is None:
+        return {}
+    marks = [("POC", levels.poc), ("VAH", levels.vah), ("VAL", levels.val), ("VWAP", levels.vwap)]
+    marks += [("HVN", n) for n in levels.nodes]
+    out = {}
+    for key, price in lines.items():
+        if price is None:
+            continue
+        label, level = min(marks, key=lambda m: abs(m[1] - price))
+        if abs(level - price) <= tol:
+            out[key] = (label, level, price - level)
+    return out